@@ -48,6 +48,8 @@ bibtex_bibfiles = [
     "./api_reference/givenness_ref.bib",
     "./api_reference/lexico_ref.bib",
     "./api_reference/ttr.bib",
+    "./api_reference/readability.bib",
+    "./api_reference/cohesion.bib",
 ]
 
 # Add any paths that contain templates here, relative to this directory.
@@ -3,7 +3,7 @@ Setup script for TRUNAJOD.
 
 This is the setup.py script for TRUNAJOD, to build and package TRUNAJOD.
 """
-from distutils.core import setup
+from setuptools import setup
 
 
 long_description = open("README.md", "r", encoding="utf-8").read()
@@ -47,8 +47,13 @@ setup(
         "Operating System :: Microsoft :: Windows",
     ],
     install_requires=[
-        "spacy>=2.3.2",
+        "numpy",
+        "spacy>=3",
     ],
+    entry_points={
+        "console_scripts": ["trunajod=TRUNAJOD.cli:main"],
+        "spacy_factories": ["trunajod=TRUNAJOD.component:make_trunajod"],
+    },
     project_urls={
         "Documentation": "https://trunajod20.readthedocs.io/en/latest/",
         "Source Code": "https://github.com/dpalmasan/TRUNAJOD2.0",
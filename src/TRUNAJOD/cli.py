@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""TRUNAJOD command line interface.
+
+Installing TRUNAJOD provides the ``trunajod`` command. The ``serve``
+subcommand starts the feature extraction service of
+:mod:`TRUNAJOD.server`::
+
+    trunajod serve --model es_core_news_sm --port 8000 --max-latency 10
+
+The ``equivalence`` subcommand compares reference and optimized metric
+implementations on CoNLL-U fixtures (see :mod:`TRUNAJOD.equivalence`),
+exiting with status 1 if they do not match::
+
+    trunajod equivalence tests/fixtures --recorded outputs.json
+
+Run ``trunajod serve --help`` or ``trunajod equivalence --help`` to see all
+the options.
+"""
+import argparse
+import json
+from typing import List
+from typing import Optional
+
+import spacy
+from TRUNAJOD import equivalence
+from TRUNAJOD.features import available_features
+from TRUNAJOD.planner import plan_pipeline
+from TRUNAJOD.server import run
+
+
+def _comma_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of the ``trunajod`` command.
+
+    :return: Argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="trunajod",
+        description="TRUNAJOD: A text complexity library for text analysis.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    serve = subparsers.add_parser(
+        "serve", help="Start the feature extraction HTTP service."
+    )
+    serve.add_argument(
+        "--model",
+        default="es_core_news_sm",
+        help="spaCy model to load (default: %(default)s)",
+    )
+    serve.add_argument(
+        "--disable",
+        type=_comma_list,
+        default=["ner", "textcat"],
+        help="Comma separated pipeline components to disable "
+        "(default: ner,textcat)",
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    serve.add_argument("--port", type=int, default=8000, help="Port to bind")
+    serve.add_argument(
+        "--features",
+        type=_comma_list,
+        default=None,
+        help="Comma separated features computed by default (default: all)",
+    )
+    serve.add_argument(
+        "--plan-pipeline",
+        action="store_true",
+        help="Disable the components not needed by the served features "
+        "(requests for other features may fail)",
+    )
+    serve.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="Maximum number of texts per batch (default: %(default)s)",
+    )
+    serve.add_argument(
+        "--max-latency",
+        type=float,
+        default=10.0,
+        help="Maximum milliseconds a text waits for its batch "
+        "(default: %(default)s)",
+    )
+    serve.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes parsing texts and computing "
+        "features (default: number of CPUs)",
+    )
+
+    check = subparsers.add_parser(
+        "equivalence",
+        help="Compare reference and optimized metric implementations.",
+    )
+    check.add_argument(
+        "fixtures",
+        nargs="+",
+        help="CoNLL-U files, or directories of .conllu files",
+    )
+    check.add_argument(
+        "--engines",
+        type=_comma_list,
+        default=None,
+        help="Comma separated engines to compare (default: all)",
+    )
+    check.add_argument(
+        "--recorded",
+        default=None,
+        help="JSON file with recorded outputs to compare against",
+    )
+    check.add_argument(
+        "--record",
+        default=None,
+        help="Write outputs of the reference implementations to this file",
+    )
+    check.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of timed runs per engine (default: %(default)s)",
+    )
+    return parser
+
+
+def _equivalence(args: argparse.Namespace) -> None:
+    vocab = spacy.blank("es").vocab
+    docs = [
+        doc
+        for path in args.fixtures
+        for doc in equivalence.load_fixtures(path, vocab)
+    ]
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as record:
+            json.dump(
+                equivalence.record_outputs(docs, args.engines),
+                record,
+                indent=1,
+            )
+        return
+    recorded = None
+    if args.recorded:
+        recorded = equivalence.load_recorded(args.recorded)
+    comparisons = equivalence.run(docs, args.engines, recorded, args.repeat)
+    print(equivalence.format_report(comparisons))
+    if any(comparison.mismatches for comparison in comparisons):
+        raise SystemExit(1)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the ``trunajod`` command.
+
+    :param argv: Command line arguments, defaults to None (``sys.argv``)
+    :type argv: List of str, optional
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == "equivalence":
+        _equivalence(args)
+    elif args.command == "serve":
+        nlp = spacy.load(args.model, disable=args.disable)
+        if args.plan_pipeline:
+            features = args.features or available_features()
+            for name in plan_pipeline(nlp, features).disable:
+                nlp.disable_pipe(name)
+        run(
+            nlp,
+            host=args.host,
+            port=args.port,
+            features=args.features,
+            max_batch_size=args.batch_size,
+            max_latency=args.max_latency / 1000,
+            workers=args.workers,
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+"""Lexical cohesion module.
+
+Lexical overlap features measure how much sentences share their lemmas,
+as in TAACO :cite:`crossley2016tool` and Coh-Metrix
+:cite:`mcnamara2014automated`. For each lemma category (nouns, verbs,
+content words, etc.) a binary ``sentences x lemmas`` incidence matrix
+:math:`B` is built from a :class:`TRUNAJOD.lemmas.LemmaTable`, in CSR
+format. The number of lemmas shared by each pair of sentences is then the
+sparse product :math:`S = BB^T`, from which overlaps between adjacent
+sentences, sentences two ahead, and all pairs of sentences (global) are read
+at once, instead of intersecting sets for each pair of sentences:
+
+.. code-block:: python
+
+    from TRUNAJOD.cohesion import lexical_overlap
+    from TRUNAJOD.lemmas import sentence_lemma_table
+
+    table = sentence_lemma_table(doc.sents, lemma_dict, stopwords)
+    overlap = lexical_overlap(table)
+    overlap["adjacent_noun_overlap"]
+    overlap["global_argument_overlap_binary"]
+
+Only NumPy is needed: :class:`TRUNAJOD.cohesion.IncidenceMatrix` is a
+minimal CSR matrix implementing the products used here.
+"""
+from math import nan
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from TRUNAJOD.lemmas import LemmaCategory
+from TRUNAJOD.lemmas import LemmaTable
+
+# Lemma categories of each overlap feature
+OVERLAP_CATEGORIES = {
+    "noun": (LemmaCategory.NOUN,),
+    "verb": (LemmaCategory.VERB,),
+    "adjective": (LemmaCategory.ADJECTIVE,),
+    "adverb": (LemmaCategory.ADVERB,),
+    "pronoun": (LemmaCategory.PRONOUN,),
+    "function": (LemmaCategory.FUNCTION,),
+    "content": (LemmaCategory.CONTENT,),
+    # Nouns and pronouns, as Coh-Metrix argument overlap
+    "argument": (LemmaCategory.NOUN, LemmaCategory.PRONOUN),
+}
+
+# Distance between the sentences of each pair, None for all pairs
+OVERLAP_SPANS = {"adjacent": 1, "two_ahead": 2, "global": None}
+
+
+class IncidenceMatrix(object):
+    """Binary matrix in compressed sparse row (CSR) format.
+
+    Columns of row ``i`` are ``indices[indptr[i]:indptr[i + 1]]``, sorted
+    and without duplicates. Use
+    :meth:`TRUNAJOD.cohesion.IncidenceMatrix.from_pairs` to build it.
+
+    :param indptr: Offsets of each row in ``indices``
+    :type indptr: numpy.ndarray
+    :param indices: Column of each nonzero entry
+    :type indices: numpy.ndarray
+    :param shape: Number of rows and columns
+    :type shape: Tuple[int, int]
+    """
+
+    def __init__(
+        self, indptr: np.ndarray, indices: np.ndarray, shape: Tuple[int, int]
+    ):
+        """Initialize matrix from its CSR arrays."""
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.shape = (int(shape[0]), int(shape[1]))
+
+    @classmethod
+    def from_pairs(
+        cls, rows: np.ndarray, columns: np.ndarray, shape: Tuple[int, int]
+    ) -> "IncidenceMatrix":
+        """Build a matrix with ones at the given (row, column) pairs.
+
+        Repeated pairs are counted once.
+
+        :param rows: Row of each pair
+        :type rows: numpy.ndarray
+        :param columns: Column of each pair
+        :type columns: numpy.ndarray
+        :param shape: Number of rows and columns
+        :type shape: Tuple[int, int]
+        :return: Incidence matrix
+        :rtype: IncidenceMatrix
+        """
+        n_rows, n_columns = shape
+        keys = np.unique(
+            np.asarray(rows, dtype=np.int64) * n_columns
+            + np.asarray(columns, dtype=np.int64)
+        )
+        counts = np.bincount(keys // max(n_columns, 1), minlength=n_rows)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return cls(indptr, keys % max(n_columns, 1), shape)
+
+    @property
+    def nnz(self) -> int:
+        """Number of nonzero entries.
+
+        :rtype: int
+        """
+        return len(self.indices)
+
+    def row_ids(self) -> np.ndarray:
+        """Return the row of each nonzero entry.
+
+        :rtype: numpy.ndarray
+        """
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def toarray(self) -> np.ndarray:
+        """Return the matrix as a dense array.
+
+        :rtype: numpy.ndarray
+        """
+        dense = np.zeros(self.shape, dtype=np.int64)
+        dense[self.row_ids(), self.indices] = 1
+        return dense
+
+    def dot_transpose(
+        self, other: Optional["IncidenceMatrix"] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute the product of the matrix and another one, transposed.
+
+        Entry ``(i, j)`` of the product is the number of columns that row
+        ``i`` of the matrix and row ``j`` of ``other`` have in common. All
+        the products of each column are generated at once, so the cost is
+        the sum over columns of the product of their nonzero entries in
+        both matrices.
+
+        :param other: Matrix with the same columns, defaults to None (the
+            matrix itself)
+        :type other: IncidenceMatrix, optional
+        :raises ValueError: If the matrices do not have the same columns
+        :return: Row, column and value of the nonzero entries of the
+            product (coordinate format), sorted by row and column
+        :rtype: Tuple of numpy.ndarray
+        """
+        other = self if other is None else other
+        if self.shape[1] != other.shape[1]:
+            raise ValueError(
+                "Matrices have {} and {} columns".format(
+                    self.shape[1], other.shape[1]
+                )
+            )
+        # Rows of other, grouped by column (CSC)
+        order = np.argsort(other.indices, kind="stable")
+        other_rows = other.row_ids()[order]
+        column_counts = np.bincount(other.indices, minlength=other.shape[1])
+        column_starts = np.cumsum(column_counts) - column_counts
+
+        # Pair each entry (i, c) with every row of other having column c
+        repeats = column_counts[self.indices]
+        total = int(repeats.sum())
+        left = np.repeat(self.row_ids(), repeats)
+        within = np.arange(total) - np.repeat(
+            np.cumsum(repeats) - repeats, repeats
+        )
+        right = other_rows[
+            np.repeat(column_starts[self.indices], repeats) + within
+        ]
+        keys, values = np.unique(
+            left * other.shape[0] + right, return_counts=True
+        )
+        return (
+            keys // max(other.shape[0], 1),
+            keys % max(other.shape[0], 1),
+            values,
+        )
+
+
+def incidence_matrix(
+    table: LemmaTable, categories: Iterable[LemmaCategory]
+) -> IncidenceMatrix:
+    """Build the sentence x lemma incidence matrix of lemma categories.
+
+    :param table: Lemma table of a text
+    :type table: LemmaTable
+    :param categories: Lemma categories to include
+    :type categories: Iterable of LemmaCategory
+    :return: Matrix with a one where a lemma of the categories appears in a
+        sentence, columns being lemma codes
+    :rtype: IncidenceMatrix
+    """
+    codes = []
+    sentences = []
+    for category in categories:
+        category_codes, category_sentences, _ = table.category(category)
+        codes.append(category_codes)
+        sentences.append(category_sentences)
+    return IncidenceMatrix.from_pairs(
+        np.concatenate(sentences),
+        np.concatenate(codes),
+        (table.n_sentences, len(table.vocabulary)),
+    )
+
+
+def _span_pairs(
+    rows: np.ndarray, columns: np.ndarray, n_sentences: int, distance
+) -> Tuple[np.ndarray, int]:
+    """Select the pairs of a span, and count the pairs it has."""
+    if distance is None:
+        return columns > rows, n_sentences * (n_sentences - 1) // 2
+    return columns - rows == distance, n_sentences - distance
+
+
+def lexical_overlap(
+    table: LemmaTable, names: Optional[Sequence[str]] = None
+) -> Dict[str, float]:
+    r"""Compute lexical overlap between sentences.
+
+    For each category in ``OVERLAP_CATEGORIES`` and each span in
+    ``OVERLAP_SPANS`` (adjacent sentences, sentences two ahead, and all
+    pairs of sentences) two features are computed over the pairs
+    :math:`P` of sentences of the span:
+
+    * ``<span>_<category>_overlap``: average number of lemmas shared by a
+      pair, :math:`\frac{1}{|P|}\sum_{(i, j) \in P} S_{ij}`. For adjacent
+      sentences, this is :func:`TRUNAJOD.semantic_measures.overlap` without
+      synonyms.
+    * ``<span>_<category>_overlap_binary``: proportion of pairs sharing at
+      least one lemma.
+
+    Besides, ``<span>_stem_overlap_binary`` is the proportion of pairs where
+    a noun of one sentence is a content word of the other (Coh-Metrix stem
+    overlap, with lemmas as stems).
+
+    Features are NaN if the text has no pairs of sentences in the span
+    (e.g. one-sentence texts).
+
+    :param table: Lemma table of a text
+    :type table: LemmaTable
+    :param names: Categories to compute (keys of ``OVERLAP_CATEGORIES``, or
+        ``stem``), defaults to None (all)
+    :type names: Sequence of str, optional
+    :raises KeyError: If a category does not exist
+    :return: Overlap features
+    :rtype: dict
+    """
+    names = list(OVERLAP_CATEGORIES) + ["stem"] if names is None else names
+    n_sentences = table.n_sentences
+    features: Dict[str, float] = {}
+    for name in names:
+        if name == "stem":
+            nouns = incidence_matrix(table, [LemmaCategory.NOUN])
+            content = incidence_matrix(table, [LemmaCategory.CONTENT])
+            rows, columns, _ = nouns.dot_transpose(content)
+            # Either direction, once per pair
+            keys = np.unique(
+                np.minimum(rows, columns) * n_sentences
+                + np.maximum(rows, columns)
+            )
+            rows = keys // max(n_sentences, 1)
+            columns = keys % max(n_sentences, 1)
+            # Only the binary feature is defined
+            values = None
+        else:
+            matrix = incidence_matrix(table, OVERLAP_CATEGORIES[name])
+            rows, columns, values = matrix.dot_transpose()
+        for span, distance in OVERLAP_SPANS.items():
+            selected, n_pairs = _span_pairs(
+                rows, columns, n_sentences, distance
+            )
+            prefix = "{}_{}_overlap".format(span, name)
+            if values is not None:
+                features[prefix] = (
+                    float(values[selected].sum()) / n_pairs
+                    if n_pairs > 0
+                    else nan
+                )
+            features[prefix + "_binary"] = (
+                float(selected.sum()) / n_pairs if n_pairs > 0 else nan
+            )
+    return features
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""spaCy pipeline component for TRUNAJOD.
+
+Adding the ``trunajod`` component to a spaCy pipeline gives every processed
+``Doc`` a ``doc._.trunajod`` accessor, from which the features of
+:mod:`TRUNAJOD.features` can be read:
+
+.. code-block:: python
+
+    import spacy
+    import TRUNAJOD.component  # noqa: F401 (registers the factory)
+
+    nlp = spacy.load("es_core_news_sm", disable=["ner", "textcat"])
+    nlp.add_pipe("trunajod")
+    doc = nlp(text)
+    doc._.trunajod["lexical_density"]
+    doc._.trunajod.average_word_length
+    doc._.trunajod.to_dict()  # All the features
+
+Features are computed lazily on first access and cached in
+``doc.user_data``, so they travel with the Doc when it is serialized.
+They are computed through the metric dependency graph (see
+:mod:`TRUNAJOD.graph`), whose intermediates (words, characters, syllables,
+PoS counts, sentences, etc.) are cached with them, so features built from
+the same counts share a single pass over the text, even when they are
+accessed one at a time.
+
+Features listed in the ``features`` setting of the component are computed
+when the Doc goes through the pipeline. Combined with
+``nlp.pipe(texts, n_process=...)``, this computes them in the worker
+processes:
+
+.. code-block:: python
+
+    nlp.add_pipe("trunajod", config={"features": ["lexical_density"]})
+    for doc in nlp.pipe(texts, n_process=4):
+        print(doc._.trunajod["lexical_density"])
+
+When TRUNAJOD is installed, the factory is also registered through the
+``spacy_factories`` entry point, so importing this module is not needed.
+"""
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from spacy.language import Language
+from spacy.tokens import Doc
+from TRUNAJOD.features import extract_features
+from TRUNAJOD.features import FEATURES
+from TRUNAJOD.features import resolve_features
+from TRUNAJOD.graph import GRAPH
+
+USER_DATA_KEY = "trunajod"
+
+
+class FeatureAccessor(object):
+    """Lazy, cached access to the TRUNAJOD features of a Doc.
+
+    It is returned by ``doc._.trunajod``. Features are read as items
+    (``doc._.trunajod["word_count"]``) or attributes
+    (``doc._.trunajod.word_count``), and features that are not defined for
+    the text are NaN, as in :func:`TRUNAJOD.features.extract_features`.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    """
+
+    def __init__(self, doc: Doc):
+        """Initialize accessor, cache lives in ``doc.user_data``."""
+        self.__doc = doc
+        cache = doc.user_data.get(USER_DATA_KEY)
+        if cache is None:
+            cache = doc.user_data[USER_DATA_KEY] = {"features": {}}
+        # Memo of the intermediates of the metric dependency graph
+        cache.setdefault("graph", {})
+        self.__cache = cache
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Counts shared by the derived features.
+
+        :return: Number of words, characters, syllables, sentences, lexical
+            words, verbs and nouns
+        :rtype: dict
+        """
+        nodes = GRAPH.evaluate(
+            self.__doc,
+            ["words", "chars", "syllables", "sentences", "lexical_words"]
+            + ["verbs", "nouns"],
+            self.__cache["graph"],
+        )
+        return {
+            "words": nodes["words"],
+            "chars": nodes["chars"],
+            "syllables": nodes["syllables"],
+            "sentences": nodes["sentences"],
+            "lexical": nodes["lexical_words"],
+            "verbs": nodes["verbs"],
+            "nouns": nodes["nouns"],
+        }
+
+    def __getitem__(self, name: str) -> float:
+        """Get a feature, computing it if needed."""
+        features = self.__cache["features"]
+        if name in features:
+            return features[name]
+        if name not in FEATURES:
+            raise KeyError("Unknown feature: {}".format(name))
+
+        value = extract_features(self.__doc, [name], self.__cache["graph"])
+        features[name] = value[name]
+        return value[name]
+
+    def __getattr__(self, name: str) -> float:
+        """Get a feature as an attribute."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __contains__(self, name: str) -> bool:
+        """Return ``True`` if the feature is already computed."""
+        return name in self.__cache["features"]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the computed features."""
+        return iter(list(self.__cache["features"]))
+
+    def compute(self, names: Optional[Iterable[str]] = None) -> None:
+        """Compute features, so they are cached in the Doc.
+
+        :param names: Features to compute, defaults to None (all features)
+        :type names: Iterable of str, optional
+        :raises KeyError: If a feature is not registered
+        """
+        for name in resolve_features(names):
+            self[name]
+
+    def to_dict(
+        self, names: Optional[Iterable[str]] = None
+    ) -> Dict[str, float]:
+        """Get several features.
+
+        :param names: Features to get, defaults to None (all features)
+        :type names: Iterable of str, optional
+        :raises KeyError: If a feature is not registered
+        :return: Value of each feature
+        :rtype: dict
+        """
+        return {name: self[name] for name in resolve_features(names)}
+
+
+class TrunajodComponent(object):
+    """spaCy pipeline component adding the ``doc._.trunajod`` accessor.
+
+    :param features: Features computed when a Doc goes through the
+        pipeline, defaults to None (features are only computed on access)
+    :type features: List of str, optional
+    """
+
+    def __init__(self, features: Optional[List[str]] = None):
+        """Initialize component, registering the Doc extension."""
+        self.features = (
+            resolve_features(features) if features is not None else []
+        )
+        register_extension()
+
+    def __call__(self, doc: Doc) -> Doc:
+        """Compute the eager features of a Doc."""
+        if self.features:
+            doc._.trunajod.compute(self.features)
+        return doc
+
+
+def register_extension(force: bool = False) -> None:
+    """Register the ``doc._.trunajod`` extension.
+
+    :param force: Whether to replace an existing extension, defaults to
+        False
+    :type force: bool, optional
+    """
+    if force or not Doc.has_extension("trunajod"):
+        Doc.set_extension("trunajod", getter=FeatureAccessor, force=True)
+
+
+def make_trunajod(
+    nlp: Language, name: str, features: Optional[List[str]]
+) -> TrunajodComponent:
+    """Create the ``trunajod`` pipeline component.
+
+    :param nlp: Pipeline the component is added to
+    :type nlp: spacy.language.Language
+    :param name: Name of the component in the pipeline
+    :type name: str
+    :param features: Features computed when a Doc goes through the
+        pipeline, None to only compute them on access
+    :type features: List of str, optional
+    :return: The component
+    :rtype: TrunajodComponent
+    """
+    return TrunajodComponent(features)
+
+
+if hasattr(Language, "factory"):  # spaCy >= 3
+    Language.factory(
+        "trunajod",
+        default_config={"features": None},
+        func=make_trunajod,
+    )
+register_extension()
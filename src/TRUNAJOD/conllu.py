@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""CoNLL-U reader module.
+
+Texts that are already parsed (e.g. Universal Dependencies treebanks, or the
+output of another parser) can be analyzed without loading a spaCy model.
+:func:`TRUNAJOD.conllu.read_conllu` streams a CoNLL-U file and builds a
+spaCy ``Doc`` per document, with the forms, lemmas, PoS tags, morphological
+features, heads, dependency labels and sentence boundaries of the file, so
+every TRUNAJOD metric can be computed on it:
+
+.. code-block:: python
+
+    from TRUNAJOD.conllu import read_conllu
+    from TRUNAJOD.features import extract_features
+
+    for doc in read_conllu("es_ancora-ud-test.conllu"):
+        print(doc.user_data["conllu_doc_id"], extract_features(doc))
+
+Documents start at ``# newdoc`` comments (or every sentence is a document,
+with ``doc_boundary="sentence"``). Only one document is kept in memory at a
+time. Following spaCy conventions:
+
+* The dependency label of sentence roots is ``ROOT``, and their head is
+  themselves.
+* Multiword tokens (``1-2 del``) are represented by their syntactic words
+  (``de`` and ``el``, without whitespace between them), and empty nodes
+  (``8.1``) are skipped.
+* Whitespace comes from ``SpaceAfter=No`` in the ``MISC`` column.
+* Unspecified values (``_``) are left empty. Heads are only set if all the
+  words of the document have one.
+"""
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Union
+
+import spacy
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+# Key of the ``# newdoc id`` of a document in ``doc.user_data``
+DOC_ID_KEY = "conllu_doc_id"
+
+DOC_BOUNDARIES = ("newdoc", "sentence")
+
+N_COLUMNS = 10
+
+UNSPECIFIED = "_"
+
+
+class _DocumentBuilder(object):
+    """Columns of the words of a document being read."""
+
+    def __init__(self, doc_id: Optional[str] = None):
+        self.doc_id = doc_id
+        self.words: List[str] = []
+        self.spaces: List[bool] = []
+        self.lemmas: List[str] = []
+        self.pos: List[str] = []
+        self.tags: List[str] = []
+        self.morphs: List[str] = []
+        self.heads: List[Optional[int]] = []
+        self.deps: List[str] = []
+        self.sent_starts: List[bool] = []
+        self.sentence_start = 0
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add_word(self, columns: List[str], space_after: bool) -> None:
+        _, form, lemma, upos, xpos, feats, head, deprel = columns[:8]
+        self.sent_starts.append(len(self.words) == self.sentence_start)
+        self.words.append(form)
+        self.spaces.append(space_after)
+        self.lemmas.append("" if lemma == UNSPECIFIED else lemma)
+        self.pos.append("" if upos == UNSPECIFIED else upos)
+        self.tags.append("" if xpos == UNSPECIFIED else xpos)
+        self.morphs.append("" if feats == UNSPECIFIED else feats)
+        if head == UNSPECIFIED:
+            self.heads.append(None)
+        else:
+            head = int(head)
+            # Heads are 1-based within the sentence, 0 being the root
+            self.heads.append(
+                self.sentence_start + head - 1 if head else len(self.words) - 1
+            )
+        self.deps.append("ROOT" if deprel == "root" else deprel)
+
+    def end_sentence(self) -> None:
+        self.sentence_start = len(self.words)
+
+    def build(self, vocab: Vocab) -> Doc:
+        if self.spaces:
+            self.spaces[-1] = False
+        parsed = all(head is not None for head in self.heads)
+        doc = Doc(
+            vocab,
+            words=self.words,
+            spaces=self.spaces,
+            lemmas=self.lemmas,
+            pos=self.pos,
+            tags=self.tags,
+            morphs=self.morphs,
+            heads=self.heads if parsed else None,
+            deps=self.deps if parsed else None,
+            sent_starts=self.sent_starts,
+        )
+        if self.doc_id is not None:
+            doc.user_data[DOC_ID_KEY] = self.doc_id
+        return doc
+
+
+def _space_after(misc: str) -> bool:
+    return "SpaceAfter=No" not in misc.split("|")
+
+
+def _lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as conllu_file:
+            yield from conllu_file
+    else:
+        yield from source
+
+
+def read_conllu(
+    source: Union[str, Iterable[str]],
+    vocab: Optional[Vocab] = None,
+    doc_boundary: str = "newdoc",
+) -> Iterator[Doc]:
+    """Read the documents of a CoNLL-U file.
+
+    :param source: Path of the file, or its lines
+    :type source: str or Iterable of str
+    :param vocab: Vocabulary of the documents, defaults to None (the
+        vocabulary of a blank Spanish pipeline)
+    :type vocab: spacy.vocab.Vocab, optional
+    :param doc_boundary: ``newdoc`` (documents start at ``# newdoc``
+        comments) or ``sentence`` (each sentence is a document), defaults to
+        ``newdoc``
+    :type doc_boundary: str, optional
+    :raises ValueError: If a line is not valid CoNLL-U, or the document
+        boundary is unknown
+    :return: Documents, in file order
+    :rtype: Iterator of Spacy Doc
+    """
+    if doc_boundary not in DOC_BOUNDARIES:
+        raise ValueError(
+            "Unknown document boundary {}, expected one of {}".format(
+                doc_boundary, DOC_BOUNDARIES
+            )
+        )
+    if vocab is None:
+        vocab = spacy.blank("es").vocab
+
+    document = _DocumentBuilder()
+    # Last word index, and space after, of the multiword token being read
+    multiword_end = 0
+    multiword_space = True
+    for line_number, line in enumerate(_lines(source), 1):
+        line = line.rstrip("\r\n")
+        if not line:
+            document.end_sentence()
+            multiword_end = 0
+            if doc_boundary == "sentence" and len(document):
+                yield document.build(vocab)
+                document = _DocumentBuilder()
+            continue
+        if line.startswith("#"):
+            key, _, value = line[1:].partition("=")
+            if key.strip().startswith("newdoc") and doc_boundary == "newdoc":
+                if len(document):
+                    yield document.build(vocab)
+                document = _DocumentBuilder(value.strip() or None)
+            continue
+
+        columns = line.split("\t")
+        if len(columns) != N_COLUMNS:
+            raise ValueError(
+                "Line {}: expected {} columns, found {}".format(
+                    line_number, N_COLUMNS, len(columns)
+                )
+            )
+        word_id = columns[0]
+        try:
+            if "-" in word_id:
+                multiword_end = int(word_id.split("-")[1])
+                multiword_space = _space_after(columns[9])
+                continue
+            if "." in word_id:
+                continue
+            index = int(word_id)
+            if index < multiword_end:
+                space_after = False
+            elif index == multiword_end:
+                space_after = multiword_space
+            else:
+                space_after = _space_after(columns[9])
+            document.add_word(columns, space_after)
+        except ValueError:
+            raise ValueError(
+                "Line {}: invalid word index or head".format(line_number)
+            ) from None
+
+    if len(document):
+        yield document.build(vocab)
@@ -0,0 +1,441 @@
+#!/usr/bin/env python
+"""Memory-mapped corpus module.
+
+Extracting features in worker processes usually means pickling each ``Doc``
+to send it to a worker, which can cost more than computing its features. A
+:class:`TRUNAJOD.corpus.Corpus` stores processed documents in a directory
+as flat arrays of integer coded token attributes (the spaCy hashes of
+forms, lemmas, tags, morphological analyses and dependency labels, PoS
+symbols, relative heads, whitespace and sentence starts), and an index with
+the token offsets of each document. Workers open the corpus by its path and
+memory map the arrays, so only the path and a range of documents are sent
+to each of them:
+
+.. code-block:: python
+
+    from TRUNAJOD.corpus import Corpus
+    from TRUNAJOD.corpus import corpus_features
+
+    corpus = Corpus("parsed_corpus")
+    for doc_id, doc in zip(ids, nlp.pipe(texts)):
+        corpus.append(doc, doc_id)
+
+    corpus["post-42"]  # Random access by document id
+    matrix, columns = corpus_features("parsed_corpus", n_jobs=8)
+
+A corpus is append-only. Token attributes are written first, and the index
+entry of a document last, so readers never see partial documents
+(:meth:`TRUNAJOD.corpus.Corpus.refresh` maps documents appended since the
+corpus was opened). Each document is written right after the documents
+indexed in ``docs.bin``, so data left by an interrupted append is
+overwritten by the next one. The files of a corpus are:
+
+* ``tokens.bin``: token attributes, a ``uint64`` matrix with one row per
+  token and one column per attribute in ``ATTRS``.
+* ``docs.bin``: start and end token of each document (``int64``).
+* ``ids.jsonl``: id of each document.
+* ``strings.jsonl``: strings needed to decode the hashes.
+* ``meta.json``: language of the vocabulary and stored attributes.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import numpy as np
+import spacy
+from spacy.attrs import DEP
+from spacy.attrs import HEAD
+from spacy.attrs import LEMMA
+from spacy.attrs import MORPH
+from spacy.attrs import ORTH
+from spacy.attrs import POS
+from spacy.attrs import SENT_START
+from spacy.attrs import SPACY
+from spacy.attrs import TAG
+from spacy.tokens import Doc
+from TRUNAJOD.features import extract_features
+from TRUNAJOD.features import resolve_features
+
+# Stored token attributes, in column order
+ATTRS = ["ORTH", "SPACY", "LEMMA", "POS", "TAG", "MORPH", "HEAD", "DEP"]
+ATTRS += ["SENT_START"]
+ATTR_IDS = [ORTH, SPACY, LEMMA, POS, TAG, MORPH, HEAD, DEP, SENT_START]
+
+# Columns holding string hashes
+STRING_COLUMNS = [
+    ATTRS.index(name) for name in ("ORTH", "LEMMA", "TAG", "MORPH", "DEP")
+]
+
+# Columns restored with Doc.from_array, for parsed and unparsed documents
+PARSED_COLUMNS = [ATTRS.index(name) for name in ATTRS[2:8]]
+UNPARSED_COLUMNS = [ATTRS.index(name) for name in ATTRS[2:6]] + [8]
+
+TOKENS_FILE = "tokens.bin"
+DOCS_FILE = "docs.bin"
+IDS_FILE = "ids.jsonl"
+STRINGS_FILE = "strings.jsonl"
+META_FILE = "meta.json"
+
+# Bytes of the index entry of a document, and of the attributes of a token
+OFFSETS_SIZE = 16
+TOKEN_SIZE = 8 * len(ATTRS)
+
+
+def _read_jsonl(path: str, limit: Optional[int] = None) -> Tuple[List, int]:
+    """Read the first complete lines, and count their bytes."""
+    values = []
+    size = 0
+    if not os.path.exists(path):
+        return values, size
+    with open(path, "rb") as jsonl_file:
+        for line in jsonl_file:
+            # A line being written (or left by an interrupted append)
+            if not line.endswith(b"\n") or len(values) == limit:
+                break
+            values.append(json.loads(line))
+            size += len(line)
+    return values, size
+
+
+def _write_at(path: str, offset: int, data: bytes) -> None:
+    """Write data at an offset, dropping what follows it."""
+    mode = "r+b" if os.path.exists(path) else "wb"
+    with open(path, mode) as data_file:
+        data_file.seek(offset)
+        data_file.write(data)
+        data_file.truncate()
+
+
+def _write_jsonl(path: str, offset: int, values: Iterable) -> int:
+    """Write JSON lines at an offset, and return the new size."""
+    data = "".join(json.dumps(value) + "\n" for value in values)
+    encoded = data.encode("utf-8")
+    _write_at(path, offset, encoded)
+    return offset + len(encoded)
+
+
+class Corpus(object):
+    """Append-only corpus of processed documents, memory mapped.
+
+    :param path: Directory of the corpus, created if it does not exist
+    :type path: str
+    :param lang: Language of the vocabulary of new corpora, defaults to
+        ``es``
+    :type lang: str, optional
+    """
+
+    def __init__(self, path: str, lang: str = "es"):
+        """Open a corpus, creating it if needed."""
+        self.path = path
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            if meta["attrs"] != ATTRS:
+                raise ValueError(
+                    "Unsupported corpus attributes: {}".format(meta["attrs"])
+                )
+        else:
+            os.makedirs(path, exist_ok=True)
+            meta = {"lang": lang, "attrs": ATTRS}
+            with open(meta_path, "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file)
+        self.lang = meta["lang"]
+        self.vocab = spacy.blank(self.lang).vocab
+        self.ids: List[str] = []
+        self.__positions: Dict[str, int] = {}
+        self.__hashes: Set[int] = set()
+        self.__n_strings = 0
+        self.__n_tokens = 0
+        # Bytes of complete lines of strings.jsonl, and of indexed ids
+        self.__strings_size = 0
+        self.__ids_size = 0
+        self.__arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.refresh()
+
+    def __file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def __add_strings(self, strings: List[str]) -> None:
+        for string in strings:
+            self.__hashes.add(self.vocab.strings.add(string))
+        self.__n_strings += len(strings)
+
+    def __add_ids(self, doc_ids: List[str]) -> None:
+        for doc_id in doc_ids:
+            self.__positions[doc_id] = len(self.ids)
+            self.ids.append(doc_id)
+
+    def refresh(self) -> None:
+        """Read the documents appended since the corpus was opened."""
+        # Documents are indexed after their strings and ids are written
+        docs_path = self.__file(DOCS_FILE)
+        n_docs = 0
+        if os.path.exists(docs_path):
+            n_docs = os.path.getsize(docs_path) // OFFSETS_SIZE
+        strings, self.__strings_size = _read_jsonl(self.__file(STRINGS_FILE))
+        self.__add_strings(strings[self.__n_strings :])
+        ids, self.__ids_size = _read_jsonl(self.__file(IDS_FILE), n_docs)
+        self.__add_ids(ids[len(self) :])
+        self.__arrays = None
+        self.__n_tokens = int(self.offsets[-1, 1]) if len(self) else 0
+
+    def __map(self, name: str, dtype, shape: Tuple[int, int]) -> np.ndarray:
+        if not shape[0]:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.__file(name), dtype=dtype, mode="r", shape=shape)
+
+    def __mapped(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.__arrays is None:
+            offsets = self.__map(DOCS_FILE, np.int64, (len(self), 2))
+            n_tokens = int(offsets[-1, 1]) if len(self) else 0
+            tokens = self.__map(TOKENS_FILE, np.uint64, (n_tokens, len(ATTRS)))
+            self.__arrays = (offsets, tokens)
+        return self.__arrays
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Start and end token of each document.
+
+        :return: Memory mapped offsets, one row per document
+        :rtype: numpy.ndarray of int64
+        """
+        return self.__mapped()[0]
+
+    @property
+    def tokens(self) -> np.ndarray:
+        """Token attributes of all the documents.
+
+        :return: Memory mapped attributes, one row per token and one column
+            per attribute in ``ATTRS``
+        :rtype: numpy.ndarray of uint64
+        """
+        return self.__mapped()[1]
+
+    def __len__(self) -> int:
+        """Return number of documents."""
+        return len(self.ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        """Return ``True`` if a document id is in the corpus."""
+        return doc_id in self.__positions
+
+    def __getitem__(self, doc_id: str) -> Doc:
+        """Get a document by its id."""
+        return self.doc(self.position(doc_id))
+
+    def __iter__(self) -> Iterator[Doc]:
+        """Iterate over the documents."""
+        return self.docs()
+
+    def position(self, doc_id: str) -> int:
+        """Return the position of a document.
+
+        :param doc_id: Id of the document
+        :type doc_id: str
+        :raises KeyError: If the document is not in the corpus
+        :return: Position of the document
+        :rtype: int
+        """
+        return self.__positions[doc_id]
+
+    def append(self, doc: Doc, doc_id: Optional[str] = None) -> str:
+        """Append a document.
+
+        :param doc: Processed text
+        :type doc: Spacy Doc
+        :param doc_id: Id of the document, defaults to None (its position)
+        :type doc_id: str, optional
+        :raises ValueError: If there is a document with the same id
+        :return: Id of the document
+        :rtype: str
+        """
+        doc_id = str(len(self)) if doc_id is None else doc_id
+        if doc_id in self:
+            raise ValueError("Duplicate document id: {}".format(doc_id))
+
+        array = doc.to_array(ATTR_IDS).reshape(-1, len(ATTRS))
+        hashes = set(np.unique(array[:, STRING_COLUMNS]).tolist())
+        new_strings = [
+            doc.vocab.strings[key]
+            for key in sorted(hashes - self.__hashes - {0})
+        ]
+        # Data after the indexed documents is left by interrupted appends
+        strings_size = _write_jsonl(
+            self.__file(STRINGS_FILE), self.__strings_size, new_strings
+        )
+        _write_at(
+            self.__file(TOKENS_FILE),
+            self.__n_tokens * TOKEN_SIZE,
+            np.ascontiguousarray(array, dtype=np.uint64).tobytes(),
+        )
+        ids_size = _write_jsonl(
+            self.__file(IDS_FILE), self.__ids_size, [doc_id]
+        )
+        # The index entry commits the document
+        offsets = [self.__n_tokens, self.__n_tokens + len(array)]
+        _write_at(
+            self.__file(DOCS_FILE),
+            len(self) * OFFSETS_SIZE,
+            np.array(offsets, dtype=np.int64).tobytes(),
+        )
+
+        self.__strings_size = strings_size
+        self.__ids_size = ids_size
+        self.__add_strings(new_strings)
+        self.__add_ids([doc_id])
+        self.__n_tokens = offsets[1]
+        self.__arrays = None
+        return doc_id
+
+    def extend(
+        self, docs: Iterable[Doc], doc_ids: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """Append documents.
+
+        :param docs: Processed texts
+        :type docs: Iterable of Spacy Doc
+        :param doc_ids: Ids of the documents, defaults to None (their
+            positions)
+        :type doc_ids: Iterable of str, optional
+        :raises ValueError: If there is a document with the same id
+        :return: Ids of the documents
+        :rtype: List of str
+        """
+        if doc_ids is None:
+            return [self.append(doc) for doc in docs]
+        return [self.append(doc, doc_id) for doc, doc_id in zip(docs, doc_ids)]
+
+    def token_attrs(self, position: int) -> np.ndarray:
+        """Return the token attributes of a document, without copying them.
+
+        :param position: Position of the document
+        :type position: int
+        :return: View of the memory mapped attributes, one row per token and
+            one column per attribute in ``ATTRS``
+        :rtype: numpy.ndarray of uint64
+        """
+        start, end = self.offsets[position]
+        return self.tokens[start:end]
+
+    def doc(self, position: int) -> Doc:
+        """Build a document from its token attributes.
+
+        :param position: Position of the document
+        :type position: int
+        :return: The document
+        :rtype: Spacy Doc
+        """
+        array = self.token_attrs(position)
+        strings = self.vocab.strings
+        doc = Doc(
+            self.vocab,
+            words=[strings[key] for key in array[:, 0].tolist()],
+            spaces=array[:, 1].astype(bool).tolist(),
+        )
+        # Heads and sentence starts cannot be set together
+        if array[:, ATTRS.index("DEP")].any():
+            columns = PARSED_COLUMNS
+        else:
+            columns = UNPARSED_COLUMNS
+        doc.from_array(
+            [ATTR_IDS[column] for column in columns],
+            np.ascontiguousarray(array[:, columns]),
+        )
+        return doc
+
+    def docs(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Doc]:
+        """Iterate over a range of documents.
+
+        :param start: First position, defaults to 0
+        :type start: int, optional
+        :param stop: Last position (excluded), defaults to None (the end)
+        :type stop: int, optional
+        :return: Documents
+        :rtype: Iterator of Spacy Doc
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for position in range(start, stop):
+            yield self.doc(position)
+
+
+# Corpora opened by this process, reused by the tasks of workers
+_CORPORA: Dict[str, Corpus] = {}
+
+
+def _score_range(
+    path: str, start: int, stop: int, names: List[str]
+) -> np.ndarray:
+    corpus = _CORPORA.get(path)
+    if corpus is None:
+        corpus = _CORPORA[path] = Corpus(path)
+    if stop > len(corpus):
+        corpus.refresh()
+    rows = [
+        [features[name] for name in names]
+        for features in (
+            extract_features(doc, names) for doc in corpus.docs(start, stop)
+        )
+    ]
+    return np.array(rows, dtype=np.float64).reshape(-1, len(names))
+
+
+def corpus_features(
+    path: str,
+    names: Optional[Iterable[str]] = None,
+    n_jobs: Optional[int] = None,
+    chunk_size: int = 256,
+) -> Tuple[np.ndarray, List[str]]:
+    """Extract features of the documents of a corpus in worker processes.
+
+    Each worker maps the corpus and computes the features of ranges of
+    ``chunk_size`` documents, so documents are never pickled. Features are
+    looked up in the registry of the workers, so features registered at
+    runtime are only available with the ``fork`` start method.
+
+    :param path: Directory of the corpus
+    :type path: str
+    :param names: Features to compute, defaults to None (all features)
+    :type names: Iterable of str, optional
+    :param n_jobs: Number of worker processes, -1 for all the CPUs,
+        defaults to None (no workers)
+    :type n_jobs: int, optional
+    :param chunk_size: Documents per task, defaults to 256
+    :type chunk_size: int, optional
+    :raises KeyError: If a feature is not registered
+    :return: Matrix of shape (documents, features), in corpus order, and the
+        name of each column
+    :rtype: Tuple[numpy.ndarray of float64, List of str]
+    """
+    names = resolve_features(names)
+    n_docs = len(Corpus(path))
+    ranges = [
+        (start, min(start + chunk_size, n_docs))
+        for start in range(0, n_docs, chunk_size)
+    ]
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+
+    if not n_jobs or n_jobs == 1 or len(ranges) < 2:
+        blocks = [
+            _score_range(path, start, stop, names) for start, stop in ranges
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(_score_range, path, start, stop, names)
+                for start, stop in ranges
+            ]
+            blocks = [future.result() for future in futures]
+    if not blocks:
+        return np.zeros((0, len(names))), names
+    return np.concatenate(blocks), names
@@ -54,6 +54,7 @@ import re
 from typing import List
 
 from spacy.tokens import Doc
+from TRUNAJOD.instrumentation import instrument
 
 CAUSE_DISCOURSE_MARKERS = {
     "dado que",
@@ -197,6 +198,7 @@ def find_matches(text: str, list: List[str]) -> int:
     return counter
 
 
+@instrument
 def get_cause_dm_count(text: Doc) -> float:
     """Count discourse markers associated with cause.
 
@@ -212,6 +214,7 @@ def get_cause_dm_count(text: Doc) -> float:
     return sum(sentences) / len(sentences)
 
 
+@instrument
 def get_closed_class_vague_meaning_count(text: Doc) -> float:
     """Count words that have vague meaning.
 
@@ -227,6 +230,7 @@ def get_closed_class_vague_meaning_count(text: Doc) -> float:
     return sum(sentences) / len(sentences)
 
 
+@instrument
 def get_context_dm_count(text: Doc) -> float:
     """Count discourse markers associated with context.
 
@@ -242,6 +246,7 @@ def get_context_dm_count(text: Doc) -> float:
     return sum(sentences) / len(sentences)
 
 
+@instrument
 def get_equality_dm_count(text: Doc) -> float:
     """Count discourse markers associated with equality.
 
@@ -257,6 +262,7 @@ def get_equality_dm_count(text: Doc) -> float:
     return sum(sentences) / len(sentences)
 
 
+@instrument
 def get_polysemic_dm_count(text: Doc) -> float:
     """Count discourse markers that are highly polysemic.
 
@@ -272,6 +278,7 @@ def get_polysemic_dm_count(text: Doc) -> float:
     return sum(sentences) / len(sentences)
 
 
+@instrument
 def get_overall_markers(text: Doc) -> float:  # pragma: no cover
     """Count all types of discourse markers.
 
@@ -313,6 +320,7 @@ def get_overall_markers(text: Doc) -> float:  # pragma: no cover
     return sum(sentences) / len(sentences)
 
 
+@instrument
 def get_revision_dm_count(text: Doc) -> float:
     """Count discourse markers associated with revisions.
 
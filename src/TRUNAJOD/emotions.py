@@ -16,9 +16,22 @@ from typing import Dict
 from typing import Optional
 
 from spacy.tokens import Doc
+from TRUNAJOD.instrumentation import instrument
+from TRUNAJOD.profiles import lexicon_profile
+from TRUNAJOD.profiles import SentenceProfile
 from TRUNAJOD.spanish_emotion_lexicon import SPANISH_EMOTION_LEXICON
 from TRUNAJOD.utils import lemmatize
 
+EMOTIONS = ["alegria", "enojo", "miedo", "repulsion", "sorpresa", "tristeza"]
+LEXICON_EMOTIONS = {
+    "Alegría": "alegria",
+    "Enojo": "enojo",
+    "Miedo": "miedo",
+    "Repulsión": "repulsion",
+    "Sorpresa": "sorpresa",
+    "Tristeza": "tristeza",
+}
+
 
 class Emotions(object):
     """Compute emotions from SPANISH EMOTION LEXICON :cite:`rangel2014creacion`.
@@ -33,7 +46,13 @@ class Emotions(object):
     - Averaging over emotions and not the total count?
     """
 
-    def __init__(self, doc: Doc, lemmatizer: Optional[Dict[str, str]] = None):
+    @instrument(name="emotions.Emotions", doc_arg=1)
+    def __init__(
+        self,
+        doc: Doc,
+        lemmatizer: Optional[Dict[str, str]] = None,
+        sentence_profile: bool = False,
+    ):
         """Initialize emotions class.
 
         Average over number of tokens.
@@ -42,6 +61,10 @@ class Emotions(object):
         :type doc: Spacy Doc
         :param lemmatizer: Lematizador a utilizar, defaults to None
         :type lemmatizer: Python dict, optional
+        :param sentence_profile: Whether to also compute emotions of each
+            sentence (see :meth:`Emotions.get_sentence_profile`), defaults
+            to False
+        :type sentence_profile: bool, optional
         """
         alegria = 0
         enojo = 0
@@ -103,6 +126,10 @@ class Emotions(object):
             self.__sorpresa /= count
             self.__tristeza /= count
 
+        self.__profile = None
+        if sentence_profile:
+            self.__profile = emotions_profile(doc, lemmatizer)
+
     def get_alegria(self) -> float:
         """Get alegria.
 
@@ -150,3 +177,50 @@ class Emotions(object):
         :rtype: float
         """
         return self.__tristeza
+
+    def get_sentence_profile(self) -> SentenceProfile:
+        """Get emotions of each sentence.
+
+        Columns of the profile are the emotions in ``EMOTIONS`` order:
+        alegria, enojo, miedo, repulsion, sorpresa and tristeza.
+
+        :raises ValueError: If ``sentence_profile`` was not requested
+        :return: Sentence profile of emotions
+        :rtype: SentenceProfile
+        """
+        if self.__profile is None:
+            raise ValueError(
+                "Sentence profile was not computed, use "
+                "Emotions(doc, sentence_profile=True)"
+            )
+        return self.__profile
+
+
+@instrument
+def emotions_profile(
+    doc: Doc, lemmatizer: Optional[Dict[str, str]] = None
+) -> SentenceProfile:
+    """Compute emotions of each sentence of a text.
+
+    Values are computed as in :class:`Emotions`, but averaged over the
+    words of each sentence found in the lexicon.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :param lemmatizer: Lemmatizer, defaults to None
+    :type lemmatizer: Python dict, optional
+    :return: Sentence profile, with one column per emotion
+    :rtype: SentenceProfile
+    """
+
+    def lookup(word):
+        if word not in SPANISH_EMOTION_LEXICON and lemmatizer:
+            word = lemmatize(lemmatizer, word)
+        if word not in SPANISH_EMOTION_LEXICON:
+            return None
+        pfa, emotion = SPANISH_EMOTION_LEXICON[word]
+        values = [0.0] * len(EMOTIONS)
+        values[EMOTIONS.index(LEXICON_EMOTIONS.get(emotion, "tristeza"))] = pfa
+        return values
+
+    return lexicon_profile(doc, EMOTIONS, lookup)
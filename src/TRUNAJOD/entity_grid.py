@@ -18,6 +18,7 @@ It is also worth noting, that we consider an entity grid of two-sentence
 sequence and the API currently does not provide any hyper-parameter tunning to
 change this.
 """
+from TRUNAJOD.instrumentation import instrument
 from TRUNAJOD.utils import SupportedModels
 
 UNIVERSAL_NOUN_TAGS = set([u"NOUN", u"PRON", u"PROPN"])
@@ -78,6 +79,7 @@ class EntityGrid(object):
     module. It only supports 2-transitions entity grid.
     """
 
+    @instrument(name="entity_grid.EntityGrid", doc_arg=1)
     def __init__(self, doc, model_name="spacy"):
         """Construct EntityGrid object."""
         # Initialization
@@ -362,6 +364,7 @@ def weighting_syntactic_role(entity_role: str) -> int:
     return 0
 
 
+@instrument
 def get_local_coherence(egrid: EntityGrid) -> [float, float, float, float]:
     """Get local coherence from entity grid.
 
@@ -0,0 +1,824 @@
+#!/usr/bin/env python
+"""Reference vs optimized equivalence harness.
+
+Faster implementations of TRUNAJOD metrics (the metric graph, sentence
+matrices, compiled tables, vectorized lexical diversity, etc.) must return
+the values of the implementations they replace. This module runs both on
+the same documents and reports, for each metric, the maximum absolute and
+relative errors, the number of values that do not match, and the speedup
+of the optimized implementation:
+
+.. code-block:: python
+
+    from TRUNAJOD.equivalence import format_report
+    from TRUNAJOD.equivalence import load_fixtures
+    from TRUNAJOD.equivalence import run
+
+    docs = load_fixtures("tests/fixtures")
+    print(format_report(run(docs)))
+
+Each :class:`TRUNAJOD.equivalence.Engine` pairs a reference implementation
+with an accelerated one (``ENGINES`` holds the built-in pairs, and
+:func:`TRUNAJOD.equivalence.register_engine` adds new ones). Engines
+without an accelerated implementation are compared against outputs
+recorded with :func:`TRUNAJOD.equivalence.record_outputs`, so changes to
+the reference implementations themselves are caught too.
+
+Documents are read from CoNLL-U files (see :mod:`TRUNAJOD.conllu`), so the
+harness runs offline and without spaCy models. Metrics raising
+``ZeroDivisionError`` are NaN, as in
+:func:`TRUNAJOD.features.extract_features`. The same command is available
+as ``trunajod equivalence tests/fixtures``.
+"""
+import glob
+import json
+import os
+import time
+from math import factorial
+from math import nan
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+import spacy
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+from TRUNAJOD import entity_grid
+from TRUNAJOD import lexico_semantic_norms
+from TRUNAJOD import semantic_measures
+from TRUNAJOD import ttr
+from TRUNAJOD.cohesion import lexical_overlap
+from TRUNAJOD.cohesion import OVERLAP_CATEGORIES
+from TRUNAJOD.cohesion import OVERLAP_SPANS
+from TRUNAJOD.conllu import DOC_ID_KEY
+from TRUNAJOD.conllu import read_conllu
+from TRUNAJOD.emotions import EMOTIONS
+from TRUNAJOD.emotions import Emotions
+from TRUNAJOD.emotions import emotions_profile
+from TRUNAJOD.graph import GRAPH
+from TRUNAJOD.lemmas import LemmaCategory
+from TRUNAJOD.lemmas import LemmaTable
+from TRUNAJOD.lemmas import sentence_lemma_table
+from TRUNAJOD.lexicosemantic_norms_espal import LEXICOSEMANTIC_ESPAL
+from TRUNAJOD.lexicosemantic_norms_espal import LSNorm
+from TRUNAJOD.profiles import SentenceProfile
+from TRUNAJOD.sentence_matrix import FEATURE_FUNCTIONS
+from TRUNAJOD.sentence_matrix import sentence_feature_matrix
+from TRUNAJOD.spanish_emotion_lexicon import SPANISH_EMOTION_LEXICON
+from TRUNAJOD.utils import is_word
+
+# Lexical diversity parameters of the ttr engines, small enough for short
+# texts to have several windows
+TTR_WINDOW = 4
+D_ESTIMATE_RANGE = (2, 4)
+D_ESTIMATE_SEED = 0
+
+# Norms and synonyms of some lemmas of the fixtures, for the engines of
+# metrics taking a lexicon. They are made up, synonyms relate lemmas of
+# adjacent sentences so that overlaps are found.
+NORM_DICT = {
+    "alegre": {
+        "arousal": 5.5,
+        "concreteness": 3.2,
+        "context_availability": 6.1,
+        "familiarity": 6.4,
+        "imageability": 5.0,
+        "valence": 7.9,
+    },
+    "casa": {
+        "arousal": 3.1,
+        "concreteness": 6.6,
+        "context_availability": 6.7,
+        "familiarity": 6.8,
+        "imageability": 6.6,
+        "valence": 6.6,
+    },
+    "lluvia": {
+        "arousal": 4.2,
+        "concreteness": 6.1,
+        "context_availability": 6.3,
+        "familiarity": 6.2,
+        "imageability": 6.4,
+        "valence": 5.2,
+    },
+    "madre": {
+        "arousal": 5.8,
+        "concreteness": 5.9,
+        "context_availability": 6.6,
+        "familiarity": 6.9,
+        "imageability": 6.3,
+        "valence": 8.1,
+    },
+    "miedo": {
+        "arousal": 7.3,
+        "concreteness": 3.0,
+        "context_availability": 6.0,
+        "familiarity": 6.1,
+        "imageability": 4.8,
+        "valence": 2.0,
+    },
+}
+SYNSETS = {
+    "alegre": {"alegre", "contento", "feliz"},
+    "claro": {"claro", "sí"},
+    "feliz": {"alegre", "contento", "feliz"},
+    "lluvia": {"lluvia", "noche"},
+    "miedo": {"miedo", "temor"},
+    "niño": {"chico", "niño"},
+    "sí": {"claro", "sí"},
+}
+
+
+class Engine(object):
+    """Reference implementation of a metric, and its optimized version.
+
+    :param name: Name of the metric
+    :type name: str
+    :param reference: Reference implementation, taking a Doc
+    :type reference: Callable
+    :param candidate: Optimized implementation, taking a Doc, defaults to
+        None (only compared against recorded outputs)
+    :type candidate: Callable, optional
+    """
+
+    def __init__(
+        self,
+        name: str,
+        reference: Callable[[Doc], Any],
+        candidate: Optional[Callable[[Doc], Any]] = None,
+    ):
+        """Initialize engine."""
+        self.name = name
+        self.reference = reference
+        self.candidate = candidate
+
+    def __repr__(self) -> str:
+        """Return representation of the engine."""
+        return "Engine({})".format(self.name)
+
+
+class Comparison(object):
+    """Differences between a reference and a candidate on some documents.
+
+    Errors are computed over the values both implementations agree are
+    defined: NaN values match each other, and values of different shapes,
+    different exceptions or NaN against a number are counted as
+    ``mismatches``, as are values farther apart than the tolerance.
+
+    :param name: Name of the metric
+    :type name: str
+    :param documents: Number of documents compared
+    :type documents: int
+    :param max_abs_error: Maximum absolute error
+    :type max_abs_error: float
+    :param max_rel_error: Maximum relative error (to the reference value)
+    :type max_rel_error: float
+    :param mismatches: Number of values that do not match
+    :type mismatches: int
+    :param reference_time: Seconds taken by the reference
+    :type reference_time: float
+    :param candidate_time: Seconds taken by the candidate, NaN if compared
+        against recorded outputs
+    :type candidate_time: float
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documents: int,
+        max_abs_error: float,
+        max_rel_error: float,
+        mismatches: int,
+        reference_time: float,
+        candidate_time: float,
+    ):
+        """Initialize comparison."""
+        self.name = name
+        self.documents = documents
+        self.max_abs_error = max_abs_error
+        self.max_rel_error = max_rel_error
+        self.mismatches = mismatches
+        self.reference_time = reference_time
+        self.candidate_time = candidate_time
+
+    def __repr__(self) -> str:
+        """Return representation of the comparison."""
+        return "Comparison({}, mismatches={})".format(
+            self.name, self.mismatches
+        )
+
+    @property
+    def speedup(self) -> float:
+        """Reference time divided by candidate time.
+
+        :rtype: float
+        """
+        if not self.candidate_time > 0:
+            return nan
+        return self.reference_time / self.candidate_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the comparison as a dict.
+
+        :rtype: dict
+        """
+        return {
+            "name": self.name,
+            "documents": self.documents,
+            "max_abs_error": self.max_abs_error,
+            "max_rel_error": self.max_rel_error,
+            "mismatches": self.mismatches,
+            "reference_time": self.reference_time,
+            "candidate_time": self.candidate_time,
+            "speedup": self.speedup,
+        }
+
+
+ENGINES: Dict[str, Engine] = {}
+
+
+def register_engine(
+    name: str,
+    reference: Callable[[Doc], Any],
+    candidate: Optional[Callable[[Doc], Any]] = None,
+) -> Engine:
+    """Register a metric to be checked by the harness.
+
+    Registering an existing name replaces its engine.
+
+    :param name: Name of the metric
+    :type name: str
+    :param reference: Reference implementation, taking a Doc
+    :type reference: Callable
+    :param candidate: Optimized implementation, taking a Doc, defaults to
+        None (only compared against recorded outputs)
+    :type candidate: Callable, optional
+    :return: Registered engine
+    :rtype: Engine
+    """
+    ENGINES[name] = Engine(name, reference, candidate)
+    return ENGINES[name]
+
+
+def _evaluate(func: Callable[[Doc], Any], doc: Doc) -> Any:
+    """Compute a metric, as a float64 array or the name of its error."""
+    try:
+        value = func(doc)
+    except ZeroDivisionError:
+        value = nan
+    except Exception as error:
+        return type(error).__name__
+    if isinstance(value, SentenceProfile):
+        value = value.matrix
+    elif isinstance(value, dict):
+        value = [value[key] for key in sorted(value)]
+    return np.asarray(value, dtype=np.float64)
+
+
+def _to_output(value: Any) -> Any:
+    """Convert an evaluated metric to a JSON serializable output."""
+    if isinstance(value, str):
+        return {"error": value}
+    return {"shape": list(value.shape), "values": value.ravel().tolist()}
+
+
+def _from_output(output: Any) -> Any:
+    """Convert a recorded output to an evaluated metric."""
+    if "error" in output:
+        return output["error"]
+    values = np.array(output["values"], dtype=np.float64)
+    return values.reshape(output["shape"])
+
+
+def _timed(func: Callable[[Doc], Any], docs: Sequence[Doc], repeat: int):
+    """Evaluate a metric on documents, with the best total time."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        values = [_evaluate(func, doc) for doc in docs]
+        best = min(best, time.perf_counter() - start)
+    return values, best
+
+
+def compare(
+    name: str,
+    reference: Callable[[Doc], Any],
+    candidate: Union[Callable[[Doc], Any], Sequence[Any]],
+    docs: Sequence[Doc],
+    repeat: int = 1,
+    rtol: float = 1e-5,
+    atol: float = 1e-8,
+) -> Comparison:
+    """Compare a reference implementation and a candidate on documents.
+
+    Values match if ``|candidate - reference| <= atol + rtol * |reference|``
+    (as in ``numpy.isclose``). The tolerance allows for implementations
+    computing with ``float32``.
+
+    :param name: Name of the metric
+    :type name: str
+    :param reference: Reference implementation, taking a Doc
+    :type reference: Callable
+    :param candidate: Optimized implementation taking a Doc, or outputs
+        recorded with :func:`record_outputs`, one per document
+    :type candidate: Callable or Sequence
+    :param docs: Documents
+    :type docs: Sequence of Doc
+    :param repeat: Number of timed runs (the fastest is kept), defaults
+        to 1
+    :type repeat: int, optional
+    :param rtol: Relative tolerance, defaults to 1e-5
+    :type rtol: float, optional
+    :param atol: Absolute tolerance, defaults to 1e-8
+    :type atol: float, optional
+    :raises ValueError: If there is not one recorded output per document
+    :return: Comparison of the implementations
+    :rtype: Comparison
+    """
+    docs = list(docs)
+    expected, reference_time = _timed(reference, docs, repeat)
+    if callable(candidate):
+        actual, candidate_time = _timed(candidate, docs, repeat)
+    else:
+        if len(candidate) != len(docs):
+            raise ValueError(
+                "{}: {} recorded outputs for {} documents".format(
+                    name, len(candidate), len(docs)
+                )
+            )
+        actual = [_from_output(output) for output in candidate]
+        candidate_time = nan
+
+    max_abs = max_rel = 0.0
+    mismatches = 0
+    for reference_value, candidate_value in zip(expected, actual):
+        if isinstance(reference_value, str) or isinstance(
+            candidate_value, str
+        ):
+            # Both implementations should raise the same error
+            mismatches += not (
+                isinstance(reference_value, str)
+                and isinstance(candidate_value, str)
+                and reference_value == candidate_value
+            )
+            continue
+        if reference_value.shape != candidate_value.shape:
+            mismatches += 1
+            continue
+        reference_nan = np.isnan(reference_value)
+        candidate_nan = np.isnan(candidate_value)
+        mismatches += int((reference_nan != candidate_nan).sum())
+        defined = ~(reference_nan | candidate_nan)
+        a = reference_value[defined]
+        b = candidate_value[defined]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Infinite values match if they are equal
+            abs_error = np.where(a == b, 0.0, np.abs(a - b))
+            rel_error = np.where(abs_error == 0, 0.0, abs_error / np.abs(a))
+        mismatches += int((~(abs_error <= atol + rtol * np.abs(a))).sum())
+        if len(a):
+            max_abs = max(max_abs, float(abs_error.max()))
+            max_rel = max(max_rel, float(rel_error.max()))
+    return Comparison(
+        name,
+        len(docs),
+        max_abs,
+        max_rel,
+        mismatches,
+        reference_time,
+        candidate_time,
+    )
+
+
+def run(
+    docs: Sequence[Doc],
+    names: Optional[Iterable[str]] = None,
+    recorded: Optional[Dict[str, Any]] = None,
+    repeat: int = 1,
+) -> List[Comparison]:
+    """Compare registered engines on documents.
+
+    Engines with a candidate are compared against it. If ``recorded``
+    outputs are given, reference implementations are also compared against
+    them, as ``<name> (recorded)``.
+
+    :param docs: Documents
+    :type docs: Sequence of Doc
+    :param names: Engines to compare, defaults to None (all)
+    :type names: Iterable of str, optional
+    :param recorded: Outputs recorded with :func:`record_outputs` on the
+        same documents, defaults to None
+    :type recorded: dict, optional
+    :param repeat: Number of timed runs, defaults to 1
+    :type repeat: int, optional
+    :raises KeyError: If an engine is not registered
+    :raises ValueError: If recorded outputs are of other documents
+    :return: One comparison per engine (and recording)
+    :rtype: List of Comparison
+    """
+    docs = list(docs)
+    names = list(ENGINES if names is None else names)
+    engines = [ENGINES[name] for name in names]
+    outputs: Dict[str, Any] = {}
+    if recorded is not None:
+        if recorded["documents"] != _doc_ids(docs):
+            raise ValueError("Recorded outputs are of other documents")
+        outputs = recorded["outputs"]
+    comparisons = []
+    for engine in engines:
+        if engine.candidate is not None:
+            comparisons.append(
+                compare(
+                    engine.name,
+                    engine.reference,
+                    engine.candidate,
+                    docs,
+                    repeat,
+                )
+            )
+        if engine.name in outputs:
+            comparisons.append(
+                compare(
+                    "{} (recorded)".format(engine.name),
+                    engine.reference,
+                    outputs[engine.name],
+                    docs,
+                    repeat,
+                )
+            )
+    return comparisons
+
+
+def _doc_ids(docs: Sequence[Doc]) -> List[str]:
+    return [
+        str(doc.user_data.get(DOC_ID_KEY, index))
+        for index, doc in enumerate(docs)
+    ]
+
+
+def record_outputs(
+    docs: Sequence[Doc], names: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Record outputs of the reference implementations.
+
+    The result can be saved as JSON, and given to :func:`run` to check
+    later versions against it.
+
+    :param docs: Documents
+    :type docs: Sequence of Doc
+    :param names: Engines to record, defaults to None (all)
+    :type names: Iterable of str, optional
+    :raises KeyError: If an engine is not registered
+    :return: Document ids (``documents``) and outputs of each engine
+        (``outputs``), one per document
+    :rtype: dict
+    """
+    docs = list(docs)
+    names = list(ENGINES if names is None else names)
+    return {
+        "documents": _doc_ids(docs),
+        "outputs": {
+            name: [
+                _to_output(_evaluate(ENGINES[name].reference, doc))
+                for doc in docs
+            ]
+            for name in names
+        },
+    }
+
+
+def load_fixtures(path: str, vocab: Optional[Vocab] = None) -> List[Doc]:
+    """Read fixture documents from CoNLL-U files.
+
+    :param path: CoNLL-U file, or directory whose ``.conllu`` files are
+        read in name order
+    :type path: str
+    :param vocab: Vocab of the documents, defaults to None (the vocabulary
+        of a blank Spanish pipeline)
+    :type vocab: Vocab, optional
+    :return: Documents
+    :rtype: List of Doc
+    """
+    vocab = spacy.blank("es").vocab if vocab is None else vocab
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(glob.glob(os.path.join(path, "*.conllu")))
+    return [doc for path in paths for doc in read_conllu(path, vocab)]
+
+
+def load_recorded(path: str) -> Dict[str, Any]:
+    """Read outputs recorded with :func:`record_outputs` from JSON.
+
+    :param path: JSON file
+    :type path: str
+    :rtype: dict
+    """
+    with open(path, encoding="utf-8") as recorded:
+        return json.load(recorded)
+
+
+def _format_number(template: str, value: float) -> str:
+    # Times and speedups are not defined against recorded outputs
+    return "-" if value != value else template.format(value)
+
+
+def format_report(comparisons: Iterable[Comparison]) -> str:
+    """Format comparisons as a text table.
+
+    :param comparisons: Comparisons
+    :type comparisons: Iterable of Comparison
+    :rtype: str
+    """
+    rows = [
+        (
+            "metric",
+            "docs",
+            "max abs err",
+            "max rel err",
+            "mismatches",
+            "ref ms",
+            "opt ms",
+            "speedup",
+        )
+    ]
+    for comparison in comparisons:
+        rows.append(
+            (
+                comparison.name,
+                str(comparison.documents),
+                "{:.3g}".format(comparison.max_abs_error),
+                "{:.3g}".format(comparison.max_rel_error),
+                str(comparison.mismatches),
+                "{:.3f}".format(comparison.reference_time * 1000),
+                _format_number("{:.3f}", comparison.candidate_time * 1000),
+                _format_number("{:.2f}x", comparison.speedup),
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in rows
+    )
+
+
+# Reference implementations replaced by faster ones
+
+
+def _binomial(n: int, k: int) -> int:
+    # Exact binomial coefficient, as math.comb (Python 3.8+)
+    if k < 0 or k > n:
+        return 0
+    return factorial(n) // (factorial(k) * factorial(n - k))
+
+
+def _reference_diversity(doc: Doc) -> Dict[str, float]:
+    # MATTR, MSTTR and HD-D from their definitions, window by window
+    lemmas = [token.lemma_ for token in doc if is_word(token)]
+    n_words = len(lemmas)
+    if n_words <= TTR_WINDOW:
+        mattr = ttr.type_token_ratio(lemmas)
+    else:
+        windows = range(n_words - TTR_WINDOW + 1)
+        mattr = sum(
+            ttr.type_token_ratio(lemmas[i : i + TTR_WINDOW]) for i in windows
+        ) / len(windows)
+    segments = range(0, n_words - TTR_WINDOW + 1, TTR_WINDOW)
+    if not segments:
+        msttr = ttr.type_token_ratio(lemmas)
+    else:
+        msttr = sum(
+            ttr.type_token_ratio(lemmas[i : i + TTR_WINDOW]) for i in segments
+        ) / len(segments)
+    sample = min(TTR_WINDOW, n_words)
+    hdd = sum(
+        1
+        - _binomial(n_words - lemmas.count(lemma), sample)
+        / _binomial(n_words, sample)
+        for lemma in set(lemmas)
+    )
+    return {"hdd": hdd / sample, "mattr": mattr, "msttr": msttr}
+
+
+def _words(doc: Doc) -> List[str]:
+    return [token.lemma_ for token in doc if is_word(token)]
+
+
+def _lemmatizer(doc: Doc) -> Dict[str, str]:
+    return {token.lower_: token.lemma_ for token in doc}
+
+
+def _d_estimate(doc: Doc) -> float:
+    # Seeded, d_estimate samples words at random
+    state = np.random.get_state()
+    np.random.seed(D_ESTIMATE_SEED)
+    try:
+        return ttr.d_estimate(doc, *D_ESTIMATE_RANGE)
+    finally:
+        np.random.set_state(state)
+
+
+def _word_variation_index(doc: Doc) -> float:
+    # Not defined (log 1 = 0) for texts of a single word
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ttr.word_variation_index(doc)
+
+
+def _reference_emotions(doc: Doc) -> List[List[float]]:
+    # Emotions of each sentence on its own. Emotions are 0 for sentences
+    # without words in the lexicon, where the profile is not defined (NaN).
+    rows = []
+    for sent in doc.sents:
+        if not any(
+            token.text.lower() in SPANISH_EMOTION_LEXICON for token in sent
+        ):
+            rows.append([nan] * len(EMOTIONS))
+            continue
+        emotions = Emotions(sent)
+        rows.append(
+            [
+                emotions.get_alegria(),
+                emotions.get_enojo(),
+                emotions.get_miedo(),
+                emotions.get_repulsion(),
+                emotions.get_sorpresa(),
+                emotions.get_tristeza(),
+            ]
+        )
+    return rows
+
+
+def _reference_conc_imag_familiarity(doc: Doc) -> List[float]:
+    # Dict lookups, before norms were compiled into a table
+    n_found_tokens = 0
+    lsnorm_total = [0.0, 0.0, 0.0]
+    for token in doc:
+        if token.pos_ == "NOUN" and token.lemma_ in LEXICOSEMANTIC_ESPAL:
+            norms = LEXICOSEMANTIC_ESPAL[token.lemma_]
+            n_found_tokens += 1
+            for norm in LSNorm:
+                lsnorm_total[norm] += norms[norm]
+    return [total / n_found_tokens for total in lsnorm_total]
+
+
+def _sentence_lemmas(doc: Doc) -> List[List[str]]:
+    return [
+        [token.lemma_ for token in sent if is_word(token)]
+        for sent in doc.sents
+    ]
+
+
+def _lemma_table(doc: Doc) -> LemmaTable:
+    # Lemmas of the Doc, without stopwords
+    return sentence_lemma_table(doc.sents, _lemmatizer(doc))
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else nan
+
+
+def _reference_overlap(doc: Doc) -> Dict[str, float]:
+    # Set intersections for each pair of sentences
+    table = _lemma_table(doc)
+    n_sentences = table.n_sentences
+    sets = {
+        name: [
+            [set(table.lemmas(category, i)) for category in categories]
+            for i in range(n_sentences)
+        ]
+        for name, categories in OVERLAP_CATEGORIES.items()
+    }
+    nouns = [
+        set(table.lemmas(LemmaCategory.NOUN, i)) for i in range(n_sentences)
+    ]
+    content = [
+        set(table.lemmas(LemmaCategory.CONTENT, i)) for i in range(n_sentences)
+    ]
+    features = {}
+    for name in list(OVERLAP_CATEGORIES) + ["stem"]:
+        for span, distance in OVERLAP_SPANS.items():
+            pairs = [
+                (i, j)
+                for i in range(n_sentences)
+                for j in range(i + 1, n_sentences)
+                if distance is None or j - i == distance
+            ]
+            if name == "stem":
+                shared = [
+                    len(nouns[i] & content[j]) + len(content[i] & nouns[j])
+                    for i, j in pairs
+                ]
+            else:
+                shared = [
+                    len(set.union(*sets[name][i]) & set.union(*sets[name][j]))
+                    for i, j in pairs
+                ]
+                features["{}_{}_overlap".format(span, name)] = _mean(shared)
+            features["{}_{}_overlap_binary".format(span, name)] = _mean(
+                [count > 0 for count in shared]
+            )
+    return features
+
+
+def _reference_sentence_matrix(doc: Doc) -> np.ndarray:
+    # Each metric called on each sentence Span
+    rows = []
+    for sent in doc.sents:
+        row = []
+        for func in FEATURE_FUNCTIONS.values():
+            try:
+                row.append(float(func(sent)))
+            except ZeroDivisionError:
+                row.append(nan)
+        rows.append(row)
+    return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURE_FUNCTIONS))
+
+
+for _name, _node in GRAPH.nodes.items():
+    if _node.implements is not None:
+        register_engine(
+            "graph.{}".format(_name),
+            _node.implements,
+            lambda doc, _name=_name: GRAPH.evaluate(doc, [_name])[_name],
+        )
+register_engine(
+    "sentence_matrix.sentence_feature_matrix",
+    _reference_sentence_matrix,
+    lambda doc: sentence_feature_matrix(doc, list(FEATURE_FUNCTIONS))[0],
+)
+register_engine(
+    "ttr.moving_window_diversity",
+    _reference_diversity,
+    lambda doc: ttr.moving_window_diversity(
+        doc, TTR_WINDOW, TTR_WINDOW, TTR_WINDOW
+    ),
+)
+register_engine(
+    "ttr.moving_average_ttr",
+    lambda doc: _reference_diversity(doc)["mattr"],
+    lambda doc: ttr.moving_average_ttr(doc, TTR_WINDOW),
+)
+register_engine(
+    "ttr.mean_segmental_ttr",
+    lambda doc: _reference_diversity(doc)["msttr"],
+    lambda doc: ttr.mean_segmental_ttr(doc, TTR_WINDOW),
+)
+register_engine(
+    "ttr.hdd",
+    lambda doc: _reference_diversity(doc)["hdd"],
+    lambda doc: ttr.hdd(doc, TTR_WINDOW),
+)
+register_engine(
+    "ttr.type_token_ratio", lambda doc: ttr.type_token_ratio(_words(doc))
+)
+register_engine("ttr.lexical_diversity_mtld", ttr.lexical_diversity_mtld)
+register_engine(
+    "ttr.one_side_lexical_diversity_mtld",
+    lambda doc: ttr.one_side_lexical_diversity_mtld(_words(doc)),
+)
+register_engine("ttr.yule_k", ttr.yule_k)
+register_engine("ttr.d_estimate", _d_estimate)
+register_engine("ttr.word_variation_index", _word_variation_index)
+register_engine(
+    "emotions.emotions_profile",
+    _reference_emotions,
+    lambda doc: emotions_profile(doc).matrix,
+)
+register_engine(
+    "lexico_semantic_norms.get_conc_imag_familiarity",
+    _reference_conc_imag_familiarity,
+    lexico_semantic_norms.get_conc_imag_familiarity,
+)
+register_engine(
+    "lexico_semantic_norms.LexicoSemanticNorm",
+    lambda doc: lexico_semantic_norms.LexicoSemanticNorm(
+        doc, NORM_DICT, _lemmatizer(doc)
+    ).get_norms(),
+)
+register_engine(
+    "lexico_semantic_norms.norms_profile",
+    lambda doc: lexico_semantic_norms.norms_profile(
+        doc, NORM_DICT, _lemmatizer(doc)
+    ),
+)
+register_engine(
+    "cohesion.lexical_overlap",
+    _reference_overlap,
+    lambda doc: lexical_overlap(_lemma_table(doc)),
+)
+register_engine(
+    "entity_grid.get_local_coherence",
+    lambda doc: entity_grid.get_local_coherence(entity_grid.EntityGrid(doc)),
+)
+register_engine(
+    "semantic_measures.overlap",
+    lambda doc: semantic_measures.overlap(_sentence_lemmas(doc), SYNSETS),
+)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""Feature registry module.
+
+Most TRUNAJOD metrics only need a processed document to be computed. This
+module keeps a registry of those metrics by name, so that a set of features
+can be extracted from a ``Doc`` in one call, without having to know where
+each metric lives:
+
+.. code-block:: python
+
+    from TRUNAJOD.features import extract_features
+
+    features = extract_features(doc, ["lexical_density", "yule_k"])
+
+Metrics that need external resources (e.g. lexicons or frequency lists) can
+be added to the registry with :func:`TRUNAJOD.features.register_feature`.
+"""
+from math import nan
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import numpy as np
+from spacy.tokens import Doc
+from TRUNAJOD import givenness
+from TRUNAJOD import readability
+from TRUNAJOD import surface_proxies
+from TRUNAJOD import ttr
+from TRUNAJOD.graph import GRAPH
+
+FeatureFunction = Callable[[Doc], float]
+
+FEATURES: Dict[str, FeatureFunction] = {
+    "average_dependency_depth": surface_proxies.average_dependency_depth,
+    "average_dependency_distance": (
+        surface_proxies.average_dependency_distance
+    ),
+    "average_sentence_length": surface_proxies.average_sentence_length,
+    "average_word_length": surface_proxies.average_word_length,
+    "connection_words_ratio": surface_proxies.connection_words_ratio,
+    "crawford": readability.crawford,
+    "fernandez_huerta": readability.fernandez_huerta,
+    "gutierrez_de_polini": readability.gutierrez_de_polini,
+    "hdd": ttr.hdd,
+    "first_second_person_density": (
+        surface_proxies.first_second_person_density
+    ),
+    "lexical_density": surface_proxies.lexical_density,
+    "lexical_diversity_mtld": ttr.lexical_diversity_mtld,
+    "max_dependency_depth": surface_proxies.max_dependency_depth,
+    "mean_segmental_ttr": ttr.mean_segmental_ttr,
+    "moving_average_ttr": ttr.moving_average_ttr,
+    "mu_legibility": readability.mu_legibility,
+    "negation_density": surface_proxies.negation_density,
+    "noun_phrase_density": surface_proxies.noun_phrase_density,
+    "pos_dissimilarity": surface_proxies.pos_dissimilarity,
+    "pronoun_density": givenness.pronoun_density,
+    "pronoun_noun_ratio": givenness.pronoun_noun_ratio,
+    "sentence_count": surface_proxies.sentence_count,
+    "syllable_word_ratio": surface_proxies.syllable_word_ratio,
+    "szigriszt_pazos": readability.szigriszt_pazos,
+    "syntactic_similarity": surface_proxies.syntactic_similarity,
+    "verb_noun_ratio": surface_proxies.verb_noun_ratio,
+    "word_count": surface_proxies.word_count,
+    "word_variation_index": ttr.word_variation_index,
+    "words_before_root": surface_proxies.words_before_root,
+    "yule_k": ttr.yule_k,
+}
+
+
+def register_feature(
+    name: str, func: Optional[FeatureFunction] = None
+) -> Callable:
+    """Add a feature to the registry.
+
+    It can be used either as ``register_feature("name", func)`` or as a
+    decorator ``@register_feature("name")``. An existing feature with the
+    same name is replaced.
+
+    :param name: Name of the feature
+    :type name: str
+    :param func: Function computing the feature from a Doc
+    :type func: Callable
+    :return: The registered function
+    :rtype: Callable
+    """
+
+    def decorator(func: FeatureFunction) -> FeatureFunction:
+        FEATURES[name] = func
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def available_features() -> List[str]:
+    """Return the names of the registered features.
+
+    :return: Feature names, sorted alphabetically
+    :rtype: List of str
+    """
+    return sorted(FEATURES)
+
+
+def resolve_features(names: Optional[Iterable[str]] = None) -> List[str]:
+    """Check feature names, defaulting to all the registered features.
+
+    :param names: Feature names, defaults to None (all features)
+    :type names: Iterable of str, optional
+    :raises KeyError: If a feature is not registered
+    :return: Feature names
+    :rtype: List of str
+    """
+    if names is None:
+        return available_features()
+    names = list(names)
+    unknown = [name for name in names if name not in FEATURES]
+    if unknown:
+        raise KeyError("Unknown features: {}".format(", ".join(unknown)))
+    return names
+
+
+def extract_features(
+    doc: Doc,
+    names: Optional[Iterable[str]] = None,
+    memo: Optional[Dict[str, Any]] = None,
+) -> Dict[str, float]:
+    """Compute features of a document.
+
+    Features are computed through the metric dependency graph
+    (:data:`TRUNAJOD.graph.GRAPH`), so intermediates shared by several
+    features (such as the word count) are computed once. Features that are
+    not defined for the document (e.g. ratios over an empty text, which
+    raise ``ZeroDivisionError``) are returned as NaN.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :param names: Features to compute, defaults to None (all features)
+    :type names: Iterable of str, optional
+    :param memo: Intermediates already computed for the document, updated
+        with the computed ones (see
+        :meth:`TRUNAJOD.graph.FeatureGraph.evaluate`), defaults to None
+    :type memo: dict, optional
+    :raises KeyError: If a feature is not registered
+    :return: Value of each feature
+    :rtype: dict
+    """
+    names = resolve_features(names)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        computed = GRAPH.evaluate(
+            doc,
+            [name for name in names if GRAPH.implements(name, FEATURES[name])],
+            memo,
+        )
+        features = {}
+        for name in names:
+            if name in computed:
+                features[name] = float(computed[name])
+                continue
+            try:
+                features[name] = float(FEATURES[name](doc))
+            except ZeroDivisionError:
+                features[name] = nan
+    return features
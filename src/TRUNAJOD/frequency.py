@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+"""Compact word frequency store for TRUNAJOD.
+
+Frequency based indices (such as
+:func:`TRUNAJOD.surface_proxies.frequency_index`) require a word frequency
+list, for example CREA or SUBTLEX-ESP for Spanish. These lists have millions
+of entries, and keeping them as a Python ``dict`` is expensive in memory,
+especially when several worker processes load their own copy.
+
+:class:`TRUNAJOD.frequency.FrequencyStore` keeps the list as two flat
+arrays: the sorted 64-bit hashes of the words (the same hashes spaCy uses
+in its ``StringStore``, so a token can be looked up by ``token.lower``
+without building any string) and the ``log10`` of their frequencies as
+``float32``. The arrays can be saved to disk and memory-mapped, so that all
+the processes in a machine share the same pages:
+
+.. code-block:: python
+
+    from TRUNAJOD.frequency import FrequencyStore
+    from TRUNAJOD import surface_proxies
+
+    FrequencyStore.from_dict(crea_frequency).save("crea_store")
+    store = FrequencyStore.load("crea_store")
+    surface_proxies.frequency_index(doc, store)
+"""
+import os
+from typing import Dict
+from typing import Iterable
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from spacy.attrs import LOWER
+from spacy.attrs import POS
+from spacy.strings import hash_string
+from spacy.symbols import PUNCT
+from spacy.symbols import SPACE
+from spacy.symbols import SYM
+from spacy.tokens import Doc
+from TRUNAJOD.utils import is_word
+
+KEYS_FILE = "keys.npy"
+LOG_FREQUENCIES_FILE = "log_frequencies.npy"
+
+# Same tags excluded by TRUNAJOD.utils.is_word
+_NON_WORD_POS = (PUNCT, SYM, SPACE)
+
+
+class FrequencyStore(object):
+    """Word frequency store backed by sorted hash and frequency arrays.
+
+    Only words with a positive frequency are stored. Lookups are done with a
+    binary search over the hashes, so they are ``O(log n)`` and can be
+    vectorized over all the tokens of a text.
+
+    :param keys: Sorted word hashes
+    :type keys: numpy.ndarray of uint64
+    :param log_frequencies: ``log10`` frequency of each word
+    :type log_frequencies: numpy.ndarray of float32
+    """
+
+    def __init__(self, keys: np.ndarray, log_frequencies: np.ndarray):
+        """Initialize the store from its arrays."""
+        if len(keys) != len(log_frequencies):
+            raise ValueError(
+                "keys and log_frequencies should have the same length, "
+                "found {} and {}".format(len(keys), len(log_frequencies))
+            )
+        self.keys = keys
+        self.log_frequencies = log_frequencies
+
+    @classmethod
+    def from_items(
+        cls, items: Iterable[Tuple[str, float]]
+    ) -> "FrequencyStore":
+        """Build a store from ``(word, frequency)`` pairs.
+
+        Words are hashed as given, so they should be lowercased just like
+        the keys of the ``frequency_dict`` given to
+        :func:`TRUNAJOD.surface_proxies.frequency_index`.
+
+        :param items: Word and frequency pairs
+        :type items: Iterable of (str, float)
+        :return: Frequency store
+        :rtype: FrequencyStore
+        """
+        keys = []
+        frequencies = []
+        for word, frequency in items:
+            if frequency > 0:
+                keys.append(hash_string(word))
+                frequencies.append(frequency)
+
+        keys = np.array(keys, dtype=np.uint64)
+        log_frequencies = np.log10(np.array(frequencies, dtype=np.float64))
+        keys, first = np.unique(keys, return_index=True)
+        return cls(keys, log_frequencies[first].astype(np.float32))
+
+    @classmethod
+    def from_dict(cls, frequency_dict: Dict[str, float]) -> "FrequencyStore":
+        """Build a store from a word frequency dict.
+
+        :param frequency_dict: Frequency of each word
+        :type frequency_dict: dict
+        :return: Frequency store
+        :rtype: FrequencyStore
+        """
+        return cls.from_items(frequency_dict.items())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "FrequencyStore":
+        """Load a store saved with :meth:`FrequencyStore.save`.
+
+        :param path: Directory containing the store
+        :type path: str
+        :param mmap: Whether to memory-map the arrays instead of reading them
+            into memory, defaults to True
+        :type mmap: bool, optional
+        :return: Frequency store
+        :rtype: FrequencyStore
+        """
+        mmap_mode = "r" if mmap else None
+        return cls(
+            np.load(os.path.join(path, KEYS_FILE), mmap_mode=mmap_mode),
+            np.load(
+                os.path.join(path, LOG_FREQUENCIES_FILE), mmap_mode=mmap_mode
+            ),
+        )
+
+    def save(self, path: str) -> None:
+        """Save the store arrays into a directory.
+
+        :param path: Directory to store the arrays, created if needed
+        :type path: str
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, KEYS_FILE), self.keys)
+        np.save(os.path.join(path, LOG_FREQUENCIES_FILE), self.log_frequencies)
+
+    def __len__(self) -> int:
+        """Return number of words in the store."""
+        return len(self.keys)
+
+    def __contains__(self, word: str) -> bool:
+        """Return ``True`` if the word is in the store."""
+        return not np.isnan(self.log_frequency(word))
+
+    def log_frequency(self, word: Union[str, int]) -> float:
+        """Get ``log10`` frequency of a word.
+
+        :param word: Word or its hash
+        :type word: str or int
+        :return: Log frequency, NaN if the word is not in the store
+        :rtype: float
+        """
+        if isinstance(word, str):
+            word = hash_string(word)
+        return float(self.lookup(np.array([word], dtype=np.uint64))[0])
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """Get ``log10`` frequencies of an array of word hashes.
+
+        :param hashes: Word hashes (e.g. ``token.lower`` values)
+        :type hashes: numpy.ndarray of uint64
+        :return: Log frequencies, NaN for words not in the store
+        :rtype: numpy.ndarray of float32
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        result = np.full(len(hashes), np.nan, dtype=np.float32)
+        if not len(self.keys):
+            return result
+        positions = np.searchsorted(self.keys, hashes)
+        positions[positions == len(self.keys)] = 0
+        found = self.keys[positions] == hashes
+        result[found] = self.log_frequencies[positions[found]]
+        return result
+
+
+def _sentence_log_frequencies(doc: Doc, store: FrequencyStore):
+    """Return word log frequencies and the start of each sentence."""
+    if isinstance(doc, Doc):
+        lower, pos = doc.to_array([LOWER, POS]).T
+        words = ~np.isin(pos, _NON_WORD_POS)
+        # Position of each sentence start among the words of the document
+        words_before = np.concatenate(([0], np.cumsum(words)))
+        starts = [int(words_before[sent.start]) for sent in doc.sents]
+        return store.lookup(lower[words]), starts
+
+    starts = []
+    hashes = []
+    for sent in doc.sents:
+        starts.append(len(hashes))
+        hashes.extend(token.lower for token in sent if is_word(token))
+    return store.lookup(np.array(hashes, dtype=np.uint64)), starts
+
+
+def sentence_frequency_indices(
+    doc: Doc,
+    store: FrequencyStore,
+    statistic: Union[str, float] = "min",
+) -> np.ndarray:
+    """Compute a frequency index for each sentence.
+
+    For each sentence, the ``log10`` frequencies of its words found in the
+    store are aggregated by ``statistic``: ``"min"`` (frequency of the rarest
+    word, as in :func:`TRUNAJOD.surface_proxies.frequency_index`), ``"mean"``
+    or ``"median"``, or a number between 0 and 100 to get that percentile.
+
+    :param doc: Tokenized text
+    :type doc: Spacy Doc
+    :param store: Frequency store
+    :type store: FrequencyStore
+    :param statistic: Aggregation over the words of a sentence,
+        defaults to ``"min"``
+    :type statistic: str or float, optional
+    :raises ValueError: If the statistic is not supported
+    :return: Index of each sentence, NaN for sentences without known words
+    :rtype: numpy.ndarray of float
+    """
+    values, starts = _sentence_log_frequencies(doc, store)
+    counts = np.diff(starts + [len(values)])
+    result = np.full(len(starts), np.nan)
+    if statistic in {"min", "mean"}:
+        # Sentences without words are left out of the reductions, which
+        # are computed for all the sentences at once.
+        has_words = counts > 0
+        offsets = np.array(starts, dtype=np.int64)[has_words]
+        if not len(offsets):
+            return result
+        if statistic == "min":
+            result[has_words] = np.fmin.reduceat(values, offsets)
+        else:
+            known = ~np.isnan(values)
+            sums = np.add.reduceat(
+                np.where(known, values, 0).astype(np.float64), offsets
+            )
+            n_known = np.add.reduceat(known, offsets)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result[has_words] = sums / n_known
+        return result
+
+    if statistic == "median":
+        percentile = 50.0
+    elif isinstance(statistic, (int, float)):
+        percentile = statistic
+    else:
+        raise ValueError(
+            "Unsupported statistic {!r}, use 'min', 'mean', 'median' or a "
+            "percentile".format(statistic)
+        )
+    for index, start in enumerate(starts):
+        sentence_values = values[start : start + counts[index]]
+        sentence_values = sentence_values[~np.isnan(sentence_values)]
+        if len(sentence_values):
+            result[index] = np.percentile(
+                sentence_values.astype(np.float64), percentile
+            )
+    return result
@@ -6,6 +6,9 @@ successive constituents :cite:`hempelmann2005using`. Givenness is can be used
 as a proxy of text complexity.
 """
 from spacy.tokens import Doc
+from TRUNAJOD.instrumentation import instrument
+from TRUNAJOD.morphology import MorphFlag
+from TRUNAJOD.morphology import token_flags
 from TRUNAJOD.utils import is_noun
 from TRUNAJOD.utils import is_pronoun
 from TRUNAJOD.utils import is_word
@@ -14,6 +17,11 @@ from TRUNAJOD.utils import is_word
 THIRD_PERSON_LABEL = "Person=3"
 
 
+def _is_third_person(token) -> bool:
+    return bool(token_flags(token) & MorphFlag.THIRD_PERSON)
+
+
+@instrument
 def pronoun_density(doc: Doc) -> float:
     """Compute pronoun density.
 
@@ -33,12 +41,13 @@ def pronoun_density(doc: Doc) -> float:
     for token in doc:
         if is_word(token):
             word_counter += 1
-            if is_pronoun(token) and THIRD_PERSON_LABEL in token.tag_:
+            if is_pronoun(token) and _is_third_person(token):
                 third_person_pronouns += 1
 
     return float(third_person_pronouns) / word_counter
 
 
+@instrument
 def pronoun_noun_ratio(doc: Doc) -> float:
     """Compute Pronoun Noun ratio.
 
@@ -57,7 +66,7 @@ def pronoun_noun_ratio(doc: Doc) -> float:
     for token in doc:
         if is_noun(token):
             noun_counter += 1
-        if is_pronoun(token) and THIRD_PERSON_LABEL in token.tag_:
+        if is_pronoun(token) and _is_third_person(token):
             third_person_pronouns += 1
 
     return float(third_person_pronouns) / noun_counter
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""Metric dependency graph module.
+
+Many metrics are built from the same intermediate results: the number of
+words is the denominator of most ratios, ``lexical_density`` and
+``verb_noun_ratio`` are ratios of the same PoS counts, and readability
+indices share word, syllable and sentence counts. Calling the metrics one
+by one computes those intermediates once per metric.
+
+This module declares metrics and their intermediates as the nodes of a
+directed acyclic graph, where each node is computed from the nodes it
+depends on. :meth:`TRUNAJOD.graph.FeatureGraph.evaluate` computes the nodes
+needed by a set of features in topological order, each of them once, and
+keeps them in a memo that can be reused by later evaluations of the same
+document:
+
+.. code-block:: python
+
+    from TRUNAJOD.graph import GRAPH
+
+    memo = {}
+    GRAPH.evaluate(doc, ["average_word_length", "lexical_density"], memo)
+    memo["token_counts"]  # Computed once, shared by both features
+    GRAPH.evaluate(doc, ["verb_noun_ratio"], memo)  # Reuses token_counts
+
+:func:`TRUNAJOD.features.extract_features` and the ``doc._.trunajod``
+accessor (see :mod:`TRUNAJOD.component`) evaluate features through
+``GRAPH``. Intermediates are plain numbers, lists and dicts, so memos can be
+kept in ``doc.user_data`` and serialized with the ``Doc``.
+"""
+from math import nan
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from spacy.tokens import Doc
+from TRUNAJOD import readability
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.utils import is_word
+
+# Name of the node holding the document
+DOC = "doc"
+
+LEXICAL_TAGS = ("VERB", "AUX", "ADJ", "NOUN", "PROPN", "ADV")
+VERB_TAGS = ("VERB", "AUX")
+NOUN_TAGS = ("NOUN", "PROPN")
+
+
+class Node(object):
+    """Node of a feature graph.
+
+    :param name: Name of the node
+    :type name: str
+    :param func: Function computing the node from the values of its
+        dependencies, in order
+    :type func: Callable
+    :param deps: Names of the nodes it depends on
+    :type deps: Sequence of str
+    :param implements: Metric function computing the same value from a
+        Doc, if the node is a feature
+    :type implements: Callable, optional
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        deps: Sequence[str],
+        implements: Optional[Callable] = None,
+    ):
+        """Initialize node."""
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.implements = implements
+
+    def __repr__(self) -> str:
+        """Return representation of the node."""
+        return "Node({}, deps={})".format(self.name, self.deps)
+
+
+class FeatureGraph(object):
+    """Directed acyclic graph of features and their intermediates."""
+
+    def __init__(self):
+        """Initialize graph, with the document as its only source."""
+        self.nodes: Dict[str, Node] = {}
+
+    def __contains__(self, name: str) -> bool:
+        """Return ``True`` if the graph has a node."""
+        return name in self.nodes
+
+    def add(
+        self,
+        name: str,
+        deps: Sequence[str] = (DOC,),
+        implements: Optional[Callable] = None,
+    ) -> Callable:
+        """Add a node to the graph, decorating the function computing it.
+
+        :param name: Name of the node
+        :type name: str
+        :param deps: Names of the nodes it depends on, defaults to the
+            document
+        :type deps: Sequence of str, optional
+        :param implements: Metric function computing the same value from a
+            Doc, if the node is a feature, defaults to None
+        :type implements: Callable, optional
+        :return: Decorator adding the function
+        :rtype: Callable
+        """
+
+        def decorator(func: Callable) -> Callable:
+            self.nodes[name] = Node(name, func, deps, implements)
+            return func
+
+        return decorator
+
+    def implements(self, name: str, func: Callable) -> bool:
+        """Return ``True`` if a node computes the same as a metric function.
+
+        Features replaced with :func:`TRUNAJOD.features.register_feature`
+        are not computed by the graph.
+
+        :param name: Name of the feature
+        :type name: str
+        :param func: Registered metric function of the feature
+        :type func: Callable
+        :rtype: bool
+        """
+        node = self.nodes.get(name)
+        return node is not None and node.implements is func
+
+    def order(self, names: Iterable[str]) -> List[str]:
+        """Return the nodes needed by a set of nodes, in topological order.
+
+        :param names: Names of the nodes
+        :type names: Iterable of str
+        :raises KeyError: If a node is not in the graph
+        :raises ValueError: If the graph has a cycle
+        :return: Names of the needed nodes, dependencies first (the document
+            is not included)
+        :rtype: List of str
+        """
+        order: List[str] = []
+        visited = {DOC}
+        for name in names:
+            # Iterative depth-first search, nodes are added after their deps
+            stack = [(name, False)]
+            path = set()
+            while stack:
+                node, expanded = stack.pop()
+                if expanded:
+                    path.discard(node)
+                    order.append(node)
+                    continue
+                if node in visited:
+                    if node in path:
+                        raise ValueError("Cycle in graph at {}".format(node))
+                    continue
+                if node not in self.nodes:
+                    raise KeyError("Unknown graph node: {}".format(node))
+                visited.add(node)
+                path.add(node)
+                stack.append((node, True))
+                for dep in reversed(self.nodes[node].deps):
+                    stack.append((dep, False))
+        return order
+
+    def evaluate(
+        self,
+        doc: Doc,
+        names: Iterable[str],
+        memo: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Compute nodes of the graph for a document.
+
+        Each needed node is computed at most once: nodes in the memo are not
+        computed again, and computed nodes are added to it. Nodes raising
+        ``ZeroDivisionError`` are NaN.
+
+        :param doc: Processed text
+        :type doc: Spacy Doc
+        :param names: Names of the nodes
+        :type names: Iterable of str
+        :param memo: Values of already computed nodes of this document,
+            updated with the computed ones, defaults to None
+        :type memo: dict, optional
+        :raises KeyError: If a node is not in the graph
+        :raises ValueError: If the graph has a cycle
+        :return: Value of each requested node
+        :rtype: dict
+        """
+        names = list(names)
+        memo = {} if memo is None else memo
+        values = {DOC: doc}
+        for name in self.order(names):
+            if name not in memo:
+                node = self.nodes[name]
+                args = [
+                    values[dep] if dep == DOC else memo[dep]
+                    for dep in node.deps
+                ]
+                try:
+                    memo[name] = node.func(*args)
+                except ZeroDivisionError:
+                    memo[name] = nan
+        return {name: memo[name] for name in names}
+
+
+GRAPH = FeatureGraph()
+
+# Intermediates
+
+
+@GRAPH.add("token_counts")
+def _token_counts(doc: Doc) -> Dict[str, Any]:
+    # Words, characters and PoS histogram of words, in a single pass
+    counts: Dict[str, Any] = {"words": 0, "chars": 0, "pos": {}}
+    pos_counts = counts["pos"]
+    for token in doc:
+        pos = token.pos_
+        if pos not in {"PUNCT", "SPACE"}:
+            counts["chars"] += len(token.lower_)
+        if is_word(token):
+            counts["words"] += 1
+            pos_counts[pos] = pos_counts.get(pos, 0) + 1
+    return counts
+
+
+@GRAPH.add("dependency_depth_stats")
+def _dependency_depth_stats(doc: Doc) -> Dict[str, int]:
+    # Sum and maximum of the depths of words
+    words = np.array([is_word(token) for token in doc], dtype=bool)
+    depths = surface_proxies.dependency_depths(doc)[words]
+    return {
+        "sum": int(depths.sum()),
+        "max": int(depths.max()) if len(depths) else 0,
+    }
+
+
+GRAPH.add("readability_totals")(
+    lambda doc: readability.readability_counts(doc).totals()
+)
+
+
+def _pos_count(token_counts: Dict[str, Any], tags: Sequence[str]) -> int:
+    pos_counts = token_counts["pos"]
+    return sum(pos_counts.get(tag, 0) for tag in tags)
+
+
+# Counts, the inputs of COUNT_FEATURES
+
+GRAPH.add("words", ["token_counts"])(lambda counts: counts["words"])
+GRAPH.add("chars", ["token_counts"])(lambda counts: counts["chars"])
+GRAPH.add("lexical_words", ["token_counts"])(
+    lambda counts: _pos_count(counts, LEXICAL_TAGS)
+)
+GRAPH.add("verbs", ["token_counts"])(
+    lambda counts: _pos_count(counts, VERB_TAGS)
+)
+GRAPH.add("nouns", ["token_counts"])(
+    lambda counts: _pos_count(counts, NOUN_TAGS)
+)
+GRAPH.add("sentences")(lambda doc: len(list(doc.sents)))
+GRAPH.add("syllables")(surface_proxies.syllable_count)
+GRAPH.add("connections")(
+    lambda doc: surface_proxies.CONNECTION_LEXICON.count(doc, attr="lemma")
+)
+GRAPH.add("negations")(
+    lambda doc: surface_proxies.NEGATION_LEXICON.count(doc, attr="lemma")
+)
+GRAPH.add("first_second_person")(surface_proxies.first_second_person_count)
+GRAPH.add("depths", ["dependency_depth_stats"])(lambda stats: stats["sum"])
+GRAPH.add("max_depths", ["dependency_depth_stats"])(lambda stats: stats["max"])
+
+# Features computed from counts, as the functions of
+# TRUNAJOD.surface_proxies they implement: names of the counts, and formula
+# computing the feature from them. Formulas work on the counts of a
+# document, and on arrays of counts per sentence (see
+# TRUNAJOD.sentence_matrix).
+COUNT_FEATURES: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+    "average_dependency_depth": (
+        ("depths", "words"),
+        lambda depths, words: depths / words,
+    ),
+    "average_sentence_length": (
+        ("words", "sentences"),
+        lambda words, sentences: words / sentences,
+    ),
+    "average_word_length": (
+        ("chars", "words"),
+        lambda chars, words: chars / words,
+    ),
+    "connection_words_ratio": (
+        ("connections", "words"),
+        lambda connections, words: connections / words,
+    ),
+    "first_second_person_density": (
+        ("first_second_person", "words"),
+        lambda persons, words: persons / words,
+    ),
+    "lexical_density": (
+        ("lexical_words", "words"),
+        lambda lexical_words, words: lexical_words / words,
+    ),
+    "max_dependency_depth": (("max_depths",), lambda max_depths: max_depths),
+    "negation_density": (
+        ("negations", "words"),
+        lambda negations, words: negations / words,
+    ),
+    "sentence_count": (("sentences",), lambda sentences: sentences),
+    "syllable_word_ratio": (
+        ("syllables", "words"),
+        lambda syllables, words: syllables / words,
+    ),
+    # Ratio of the PoS ratios, as TRUNAJOD.surface_proxies.verb_noun_ratio
+    "verb_noun_ratio": (
+        ("verbs", "nouns", "words"),
+        lambda verbs, nouns, words: (verbs / words) / (nouns / words),
+    ),
+    "word_count": (("words",), lambda words: words),
+}
+
+# Features
+
+for _name, (_counts, _formula) in COUNT_FEATURES.items():
+    GRAPH.add(_name, _counts, getattr(surface_proxies, _name))(_formula)
+for _index in (
+    "crawford",
+    "fernandez_huerta",
+    "gutierrez_de_polini",
+    "mu_legibility",
+    "szigriszt_pazos",
+):
+    GRAPH.add(_index, ["readability_totals"], getattr(readability, _index))(
+        lambda totals, _index=_index: readability.readability_indices(
+            totals, [_index]
+        )[_index]
+    )
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+"""Incremental document module.
+
+When giving live feedback on a text that is being written (e.g. successive
+drafts of an essay), most of the text does not change from one version to
+the next. :class:`TRUNAJOD.incremental.IncrementalDocument` keeps a
+document as a sequence of sentences and, on each new version, diffs the new
+sentences against the previous ones. Only the sentences that changed are
+parsed again, and the document level features are updated from cached
+per-sentence (and per sentence pair) accumulators, so the cost of an update
+is proportional to the size of the edit:
+
+.. code-block:: python
+
+    import spacy
+    from TRUNAJOD.incremental import IncrementalDocument
+
+    nlp = spacy.load("es_core_news_sm", disable=["ner", "textcat"])
+    document = IncrementalDocument(nlp, first_draft)
+    document.update(second_draft)  # Only edited sentences are parsed
+    print(document.lexical_density(), document.syntactic_similarity())
+
+Sentences are split with a simple punctuation based heuristic (see
+:func:`TRUNAJOD.raw_text.split_sentences`) before parsing, and each of
+them is parsed on its own. Features are computed as in
+:mod:`TRUNAJOD.surface_proxies` and :mod:`TRUNAJOD.entity_grid`, over the
+sentences found by the parser.
+"""
+from collections import Counter
+from difflib import SequenceMatcher
+from math import nan
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from spacy.language import Language
+from spacy.tokens import Span
+from TRUNAJOD.entity_grid import dependency_mapping
+from TRUNAJOD.entity_grid import ordered_transitions
+from TRUNAJOD.entity_grid import UNIVERSAL_NOUN_TAGS
+from TRUNAJOD.raw_text import split_sentences
+from TRUNAJOD.surface_proxies import _compile_tree
+from TRUNAJOD.surface_proxies import _tree_similarity
+from TRUNAJOD.utils import is_word
+
+LEXICAL_TAGS = {"VERB", "AUX", "ADJ", "NOUN", "PROPN", "ADV"}
+VERB_TAGS = {"VERB", "AUX"}
+NOUN_TAGS = {"NOUN", "PROPN"}
+
+_ROLE_PRIORITY = {"S": 3, "O": 2, "X": 1}
+
+
+class _Sentence(object):
+    """Accumulators of a parsed sentence."""
+
+    __slots__ = (
+        "n_tokens",
+        "n_words",
+        "n_chars",
+        "n_lexical",
+        "n_verbs",
+        "n_nouns",
+        "pos_counts",
+        "tree",
+        "entities",
+    )
+
+    def __init__(self, sent: Span):
+        self.n_tokens = len(sent)
+        self.n_words = 0
+        self.n_chars = 0
+        self.n_lexical = 0
+        self.n_verbs = 0
+        self.n_nouns = 0
+        self.pos_counts = Counter()
+        self.entities = {}
+        for token in sent:
+            pos = token.pos_
+            self.pos_counts[pos] += 1
+            if pos not in {"PUNCT", "SPACE"}:
+                self.n_chars += len(token.lower_)
+            if is_word(token):
+                self.n_words += 1
+                self.n_lexical += pos in LEXICAL_TAGS
+                self.n_verbs += pos in VERB_TAGS
+                self.n_nouns += pos in NOUN_TAGS
+            if pos in UNIVERSAL_NOUN_TAGS:
+                # An entity keeps its most salient role: S > O > X
+                entity = token.text.upper()
+                role = dependency_mapping(token.dep_)
+                current = self.entities.get(entity)
+                if (
+                    current is None
+                    or _ROLE_PRIORITY[role] > _ROLE_PRIORITY[current]
+                ):
+                    self.entities[entity] = role
+        self.tree = _compile_tree(sent.root)
+
+
+class _SentencePair(object):
+    """Accumulators of two adjacent sentences."""
+
+    __slots__ = ("pos_dissimilarity", "syntactic_similarity", "transitions")
+
+    def __init__(self, first: _Sentence, second: _Sentence):
+        tags = set(first.pos_counts) | set(second.pos_counts)
+        difference = sum(
+            abs(first.pos_counts[tag] - second.pos_counts[tag]) for tag in tags
+        )
+        self.pos_dissimilarity = difference / (
+            first.n_tokens + second.n_tokens
+        )
+
+        common_nodes = _tree_similarity(second.tree, first.tree, True)
+        self.syntactic_similarity = common_nodes / (
+            first.n_tokens + second.n_tokens - common_nodes
+        )
+
+        # Only transitions of entities present in one of the sentences,
+        # "--" transitions depend on the whole document.
+        self.transitions = Counter(
+            first.entities.get(entity, "-") + second.entities.get(entity, "-")
+            for entity in set(first.entities) | set(second.entities)
+        )
+
+
+class IncrementalDocument(object):
+    """Document whose features are updated incrementally between versions.
+
+    :param nlp: spaCy pipeline used to parse sentences (anything with a
+        ``pipe`` method returning parsed Docs)
+    :type nlp: spacy.language.Language
+    :param text: Initial text, defaults to None
+    :type text: str, optional
+    """
+
+    def __init__(self, nlp: Language, text: Optional[str] = None):
+        """Initialize an empty document, and add the text if given."""
+        self.nlp = nlp
+        self.__texts: List[str] = []
+        self.__chunks: List[List[_Sentence]] = []
+        self.__totals = Counter()
+        self.__entities = Counter()
+        self.__pairs: Dict[tuple, _SentencePair] = {}
+        self.__pair_totals = Counter()
+        self.__transitions = Counter()
+        if text is not None:
+            self.update(text)
+
+    @property
+    def sentences(self) -> List[str]:
+        """Sentences of the current version, as split before parsing.
+
+        :return: Sentences of the text
+        :rtype: List of str
+        """
+        return list(self.__texts)
+
+    def update(self, text: str) -> int:
+        """Replace the text of the document with a new version.
+
+        :param text: New version of the text
+        :type text: str
+        :return: Number of sentences that had to be parsed
+        :rtype: int
+        """
+        texts = split_sentences(text)
+        old_chunks = self.__chunks
+        opcodes = SequenceMatcher(
+            None, self.__texts, texts, autojunk=False
+        ).get_opcodes()
+        changed = [
+            sentence
+            for tag, _, _, j1, j2 in opcodes
+            if tag != "equal"
+            for sentence in texts[j1:j2]
+        ]
+        docs = iter(self.nlp.pipe(changed))
+
+        chunks = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                chunks.extend(old_chunks[i1:i2])
+                continue
+            removed = [s for chunk in old_chunks[i1:i2] for s in chunk]
+            added_chunks = [_sentences(next(docs)) for _ in range(j2 - j1)]
+            added = [s for chunk in added_chunks for s in chunk]
+            chunks.extend(added_chunks)
+
+            # Neighbours are in unchanged chunks, shared by both versions
+            previous = _last_sentence(old_chunks, i1)
+            following = _first_sentence(old_chunks, i2)
+            for sentence in removed:
+                self.__remove_sentence(sentence)
+            for sentence in added:
+                self.__add_sentence(sentence)
+            for pair in _pairs(previous, removed, following):
+                self.__remove_pair(pair)
+            for pair in _pairs(previous, added, following):
+                self.__add_pair(pair)
+
+        self.__texts = texts
+        self.__chunks = chunks
+        return len(changed)
+
+    def __add_sentence(self, sentence: _Sentence) -> None:
+        self.__totals["sentences"] += 1
+        self.__totals["tokens"] += sentence.n_tokens
+        self.__totals["words"] += sentence.n_words
+        self.__totals["chars"] += sentence.n_chars
+        self.__totals["lexical"] += sentence.n_lexical
+        self.__totals["verbs"] += sentence.n_verbs
+        self.__totals["nouns"] += sentence.n_nouns
+        self.__entities.update(sentence.entities.keys())
+
+    def __remove_sentence(self, sentence: _Sentence) -> None:
+        self.__totals["sentences"] -= 1
+        self.__totals["tokens"] -= sentence.n_tokens
+        self.__totals["words"] -= sentence.n_words
+        self.__totals["chars"] -= sentence.n_chars
+        self.__totals["lexical"] -= sentence.n_lexical
+        self.__totals["verbs"] -= sentence.n_verbs
+        self.__totals["nouns"] -= sentence.n_nouns
+        self.__entities.subtract(sentence.entities.keys())
+        for entity in sentence.entities:
+            if self.__entities[entity] <= 0:
+                del self.__entities[entity]
+
+    def __add_pair(self, pair: tuple) -> None:
+        accumulators = self.__pairs[pair] = _SentencePair(*pair)
+        self.__pair_totals["pos"] += accumulators.pos_dissimilarity
+        self.__pair_totals["syntactic"] += accumulators.syntactic_similarity
+        self.__transitions.update(accumulators.transitions)
+
+    def __remove_pair(self, pair: tuple) -> None:
+        accumulators = self.__pairs.pop(pair)
+        self.__pair_totals["pos"] -= accumulators.pos_dissimilarity
+        self.__pair_totals["syntactic"] -= accumulators.syntactic_similarity
+        self.__transitions.subtract(accumulators.transitions)
+
+    def sentence_count(self) -> int:
+        """Return number of (parsed) sentences.
+
+        :return: Number of sentences
+        :rtype: int
+        """
+        return self.__totals["sentences"]
+
+    def word_count(self) -> int:
+        """Return number of words.
+
+        :return: Word count
+        :rtype: int
+        """
+        return self.__totals["words"]
+
+    def average_sentence_length(self) -> float:
+        """Return average sentence length.
+
+        See :func:`TRUNAJOD.surface_proxies.average_sentence_length`.
+
+        :return: Average sentence length
+        :rtype: float
+        """
+        return self.__totals["words"] / self.__totals["sentences"]
+
+    def average_word_length(self) -> float:
+        """Return average word length.
+
+        See :func:`TRUNAJOD.surface_proxies.average_word_length`.
+
+        :return: Average word length
+        :rtype: float
+        """
+        return self.__totals["chars"] / self.__totals["words"]
+
+    def lexical_density(self) -> float:
+        """Return lexical density.
+
+        See :func:`TRUNAJOD.surface_proxies.lexical_density`.
+
+        :return: Lexical density
+        :rtype: float
+        """
+        return self.__totals["lexical"] / self.__totals["words"]
+
+    def verb_noun_ratio(self) -> float:
+        """Return Verb/Noun ratio.
+
+        See :func:`TRUNAJOD.surface_proxies.verb_noun_ratio`.
+
+        :return: Verb Noun ratio
+        :rtype: float
+        """
+        words = self.__totals["words"]
+        return (self.__totals["verbs"] / words) / (
+            self.__totals["nouns"] / words
+        )
+
+    def pos_dissimilarity(self) -> float:
+        """Return Part of Speech dissimilarity of adjacent sentences.
+
+        See :func:`TRUNAJOD.surface_proxies.pos_dissimilarity`.
+
+        :return: Part of Speech dissimilarity
+        :rtype: float
+        """
+        return self.__pair_totals["pos"] / (self.__totals["sentences"] - 1)
+
+    def syntactic_similarity(self) -> float:
+        """Return average syntactic similarity of adjacent sentences.
+
+        See :func:`TRUNAJOD.surface_proxies.syntactic_similarity`.
+
+        :return: Average syntactic similarity
+        :rtype: float
+        """
+        return self.__pair_totals["syntactic"] / (
+            self.__totals["sentences"] - 1
+        )
+
+    def entity_grid_transitions(self) -> Dict[str, float]:
+        """Return the probability of each entity grid transition.
+
+        Transitions are computed as in
+        :class:`TRUNAJOD.entity_grid.EntityGrid`, all of them being 0 if
+        there are less than two sentences or no entities.
+
+        :return: Probability of each transition (e.g. ``"SO"``)
+        :rtype: dict
+        """
+        n_pairs = max(self.__totals["sentences"] - 1, 0)
+        total_transitions = n_pairs * len(self.__entities)
+        if total_transitions == 0:
+            return {transition: 0.0 for transition in ordered_transitions}
+        counts = dict(self.__transitions)
+        counts["--"] = total_transitions - sum(self.__transitions.values())
+        return {
+            transition: counts.get(transition, 0) / float(total_transitions)
+            for transition in ordered_transitions
+        }
+
+    def features(self) -> Dict[str, float]:
+        """Return all the features of the document.
+
+        Features that are not defined for the text (e.g. similarities of a
+        text with a single sentence) are NaN.
+
+        :return: Value of each feature
+        :rtype: dict
+        """
+        features = {}
+        for name in (
+            "average_sentence_length",
+            "average_word_length",
+            "lexical_density",
+            "pos_dissimilarity",
+            "sentence_count",
+            "syntactic_similarity",
+            "verb_noun_ratio",
+            "word_count",
+        ):
+            try:
+                features[name] = float(getattr(self, name)())
+            except ZeroDivisionError:
+                features[name] = nan
+        return features
+
+
+def _sentences(doc) -> List[_Sentence]:
+    """Summarize the sentences of a parsed text."""
+    try:
+        sents = list(doc.sents)
+    except ValueError:
+        # No sentence boundaries set by the pipeline
+        sents = [doc[:]]
+    return [_Sentence(sent) for sent in sents if len(sent)]
+
+
+def _last_sentence(chunks, end) -> Optional[_Sentence]:
+    """Return the last sentence of ``chunks[:end]``."""
+    for index in range(end - 1, -1, -1):
+        if chunks[index]:
+            return chunks[index][-1]
+    return None
+
+
+def _first_sentence(chunks, start) -> Optional[_Sentence]:
+    """Return the first sentence of ``chunks[start:]``."""
+    for index in range(start, len(chunks)):
+        if chunks[index]:
+            return chunks[index][0]
+    return None
+
+
+def _pairs(previous, sentences, following):
+    """Return adjacent pairs of a sentence run and its neighbours."""
+    run = [previous] if previous is not None else []
+    run.extend(sentences)
+    if following is not None:
+        run.append(following)
+    return list(zip(run, run[1:]))
@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+"""Instrumentation hooks for TRUNAJOD metrics.
+
+When profiling a feature extraction pipeline it is useful to know which
+metric is consuming most of the time (or memory). This module provides an
+opt-in instrumentation layer: metric functions across TRUNAJOD are decorated
+with :func:`TRUNAJOD.instrumentation.instrument`, and when instrumentation is
+enabled each call records wall time, call count, number of tokens processed
+and optionally the peak of memory allocated (using :mod:`tracemalloc`).
+
+Instrumentation is disabled by default, and in that case the decorated
+functions only pay for a global flag check. A typical usage would be:
+
+.. code-block:: python
+
+    from TRUNAJOD import instrumentation
+    from TRUNAJOD import surface_proxies
+
+    with instrumentation.instrumented(trace_memory=True) as registry:
+        surface_proxies.lexical_density(doc)
+        surface_proxies.syntactic_similarity(doc)
+
+    print(registry.get("surface_proxies.syntactic_similarity").total_time)
+    print(registry.to_json(indent=2))
+
+Recorded statistics are kept in the in-process registry
+``TRUNAJOD.instrumentation.REGISTRY`` until
+:meth:`TRUNAJOD.instrumentation.MetricRegistry.reset` is called.
+"""
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import IO
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+_ENABLED = False
+_TRACE_MEMORY = False
+_STARTED_TRACEMALLOC = False
+_LOCAL = threading.local()
+
+
+class MetricStats(object):
+    """Accumulated statistics of an instrumented metric.
+
+    :param name: Name of the metric (``module.function``)
+    :type name: str
+    """
+
+    def __init__(self, name: str):
+        """Initialize empty statistics for a metric."""
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.0
+        self.min_time = float("inf")
+        self.max_time = 0.0
+        self.tokens = 0
+        self.peak_memory = None
+
+    @property
+    def mean_time(self) -> float:
+        """Average wall time per call, in seconds.
+
+        :return: Mean time per call
+        :rtype: float
+        """
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def update(
+        self, elapsed: float, tokens: int, peak_memory: Optional[int]
+    ) -> None:
+        """Add one call to the statistics.
+
+        :param elapsed: Wall time of the call in seconds
+        :type elapsed: float
+        :param tokens: Number of tokens processed by the call
+        :type tokens: int
+        :param peak_memory: Peak of memory allocated in bytes, if traced
+        :type peak_memory: int, optional
+        """
+        self.calls += 1
+        self.total_time += elapsed
+        self.min_time = min(self.min_time, elapsed)
+        self.max_time = max(self.max_time, elapsed)
+        self.tokens += tokens
+        if peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, peak_memory)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return statistics as a JSON serializable dict.
+
+        :return: Statistics of the metric
+        :rtype: dict
+        """
+        return {
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "min_time": self.min_time if self.calls else 0.0,
+            "max_time": self.max_time,
+            "tokens": self.tokens,
+            "peak_memory": self.peak_memory,
+        }
+
+
+class MetricRegistry(object):
+    """In-process registry of metric statistics.
+
+    The registry is thread-safe, so metrics computed from different threads
+    are accumulated in the same statistics.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.__stats: Dict[str, MetricStats] = {}
+        self.__lock = threading.Lock()
+
+    def record(
+        self,
+        name: str,
+        elapsed: float,
+        tokens: int = 0,
+        peak_memory: Optional[int] = None,
+    ) -> None:
+        """Record a call of the metric ``name``.
+
+        :param name: Metric name
+        :type name: str
+        :param elapsed: Wall time of the call in seconds
+        :type elapsed: float
+        :param tokens: Number of tokens processed, defaults to 0
+        :type tokens: int, optional
+        :param peak_memory: Peak memory allocated in bytes, defaults to None
+        :type peak_memory: int, optional
+        """
+        with self.__lock:
+            stats = self.__stats.get(name)
+            if stats is None:
+                stats = self.__stats[name] = MetricStats(name)
+            stats.update(elapsed, tokens, peak_memory)
+
+    def get(self, name: str) -> Optional[MetricStats]:
+        """Get statistics of a metric.
+
+        :param name: Metric name (e.g. ``surface_proxies.word_count``)
+        :type name: str
+        :return: Statistics of the metric, None if it was not recorded
+        :rtype: MetricStats
+        """
+        return self.__stats.get(name)
+
+    def metrics(self) -> List[str]:
+        """Return the names of the recorded metrics.
+
+        :return: Recorded metric names, sorted alphabetically
+        :rtype: List of str
+        """
+        return sorted(self.__stats)
+
+    def reset(self) -> None:
+        """Remove all the recorded statistics."""
+        with self.__lock:
+            self.__stats.clear()
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return all the statistics as a dict.
+
+        :return: Statistics, keyed by metric name
+        :rtype: dict
+        """
+        with self.__lock:
+            return {
+                name: self.__stats[name].to_dict()
+                for name in sorted(self.__stats)
+            }
+
+    def to_json(self, **kwargs) -> str:
+        """Serialize statistics as a JSON string.
+
+        Keyword arguments are passed to :func:`json.dumps`.
+
+        :return: Statistics as JSON
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def dump(self, fp: IO[str], **kwargs) -> None:
+        """Write statistics as JSON into a file object.
+
+        :param fp: File object opened for writing
+        :type fp: File object
+        """
+        json.dump(self.to_dict(), fp, **kwargs)
+
+
+REGISTRY = MetricRegistry()
+
+
+def enable(trace_memory: bool = False) -> None:
+    """Enable metric instrumentation.
+
+    :param trace_memory: Whether to record allocation peaks using
+        :mod:`tracemalloc` (this slows down the metrics), defaults to False
+    :type trace_memory: bool, optional
+    """
+    global _ENABLED, _TRACE_MEMORY, _STARTED_TRACEMALLOC
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _STARTED_TRACEMALLOC = True
+    _TRACE_MEMORY = trace_memory
+    _ENABLED = True
+
+
+def disable() -> None:
+    """Disable metric instrumentation.
+
+    Recorded statistics are kept in the registry.
+    """
+    global _ENABLED, _TRACE_MEMORY, _STARTED_TRACEMALLOC
+    _ENABLED = False
+    _TRACE_MEMORY = False
+    if _STARTED_TRACEMALLOC:
+        tracemalloc.stop()
+        _STARTED_TRACEMALLOC = False
+
+
+def is_enabled() -> bool:
+    """Return ``True`` if instrumentation is enabled.
+
+    :return: Whether instrumentation is enabled
+    :rtype: bool
+    """
+    return _ENABLED
+
+
+@contextmanager
+def instrumented(
+    trace_memory: bool = False, reset: bool = True
+) -> Iterator[MetricRegistry]:
+    """Enable instrumentation inside a ``with`` block.
+
+    :param trace_memory: Whether to record allocation peaks, defaults to False
+    :type trace_memory: bool, optional
+    :param reset: Whether to reset the registry first, defaults to True
+    :type reset: bool, optional
+    :return: The metric registry
+    :rtype: MetricRegistry
+    """
+    if reset:
+        REGISTRY.reset()
+    enable(trace_memory)
+    try:
+        yield REGISTRY
+    finally:
+        disable()
+
+
+def _token_count(arg: Any) -> int:
+    try:
+        return len(arg)
+    except TypeError:
+        return 0
+
+
+def _memory_frames() -> List[List[int]]:
+    frames = getattr(_LOCAL, "frames", None)
+    if frames is None:
+        frames = _LOCAL.frames = []
+    return frames
+
+
+def _call(name: str, doc_arg: int, func: Callable, args, kwargs):
+    tokens = _token_count(args[doc_arg]) if len(args) > doc_arg else 0
+    if not (_TRACE_MEMORY and tracemalloc.is_tracing()):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            REGISTRY.record(name, time.perf_counter() - start, tokens)
+
+    # Each frame keeps [memory at call start, highest peak seen]. Peaks are
+    # reset when entering a metric, so nested metrics propagate their peak
+    # to the enclosing one when they return.
+    frames = _memory_frames()
+    current, peak = tracemalloc.get_traced_memory()
+    if frames:
+        frames[-1][1] = max(frames[-1][1], peak)
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    frame = [current, current]
+    frames.append(frame)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        frames.pop()
+        frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+        if frames:
+            frames[-1][1] = max(frames[-1][1], frame[1])
+        REGISTRY.record(name, elapsed, tokens, frame[1] - frame[0])
+
+
+def instrument(
+    func: Optional[Callable] = None,
+    name: Optional[str] = None,
+    doc_arg: int = 0,
+) -> Callable:
+    """Decorate a metric so it is recorded when instrumentation is enabled.
+
+    The metric is registered as ``module.function`` (e.g.
+    ``surface_proxies.word_count``) unless a ``name`` is given. The token
+    count is taken as the length of the positional argument ``doc_arg``.
+    It can be used either as ``@instrument`` or as
+    ``@instrument(name="my_metric")``.
+
+    :param func: Function to be decorated
+    :type func: Callable
+    :param name: Name to register the metric, defaults to None
+    :type name: str, optional
+    :param doc_arg: Position of the argument holding the document,
+        defaults to 0
+    :type doc_arg: int, optional
+    :return: Decorated function
+    :rtype: Callable
+    """
+
+    def decorator(func: Callable) -> Callable:
+        metric_name = name or "{}.{}".format(
+            func.__module__.split(".")[-1], func.__qualname__
+        )
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            return _call(metric_name, doc_arg, func, args, kwargs)
+
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
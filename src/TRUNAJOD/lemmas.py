@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""Columnar lemma tables.
+
+:func:`TRUNAJOD.utils.get_sentences_lemmas` returns seven lists (one per
+lemma category), each with a list of lemmas per sentence.
+:class:`TRUNAJOD.lemmas.LemmaTable` keeps the same information as a single
+token level table of integer columns (lemma code, category and sentence),
+sorted by category and sentence. The lemmas of a category in a sentence are
+then a slice of the table, obtained without copies:
+
+.. code-block:: python
+
+    from TRUNAJOD.lemmas import LemmaCategory
+    from TRUNAJOD.lemmas import sentence_lemma_table
+
+    table = sentence_lemma_table(doc.sents, lemma_dict, stopwords)
+    table.sentence_codes(LemmaCategory.NOUN, 0)  # Noun lemma codes
+    table.lemmas(LemmaCategory.NOUN, 0)  # Noun lemmas of 1st sentence
+    table.to_lists()  # Same output as get_sentences_lemmas
+
+Lemma codes are dense (``0 ... len(table.vocabulary) - 1``), so they can be
+used directly as column indices of sentence-lemma matrices.
+"""
+from enum import IntEnum
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+import numpy as np
+from spacy.attrs import LOWER
+from spacy.attrs import POS
+from spacy.parts_of_speech import ADJ
+from spacy.parts_of_speech import ADV
+from spacy.parts_of_speech import NOUN
+from spacy.parts_of_speech import PRON
+from spacy.parts_of_speech import PROPN
+from spacy.parts_of_speech import VERB
+from spacy.strings import hash_string
+from spacy.tokens import Span
+from TRUNAJOD.lexicon import LemmaDictionary
+from TRUNAJOD.lexicon import Lexicon
+from TRUNAJOD.lexicon import NON_WORD_POS
+
+
+class LemmaCategory(IntEnum):
+    """Lemma categories, in the order of ``get_sentences_lemmas`` output."""
+
+    NOUN = 0
+    VERB = 1
+    FUNCTION = 2
+    CONTENT = 3
+    ADJECTIVE = 4
+    ADVERB = 5
+    PRONOUN = 6
+
+
+# Same PoS tags as TRUNAJOD.utils.is_noun, is_verb, etc.
+POS_CATEGORIES = {
+    NOUN: LemmaCategory.NOUN,
+    PROPN: LemmaCategory.NOUN,
+    VERB: LemmaCategory.VERB,
+    ADJ: LemmaCategory.ADJECTIVE,
+    ADV: LemmaCategory.ADVERB,
+    PRON: LemmaCategory.PRONOUN,
+}
+
+
+class LemmaTable(object):
+    """Token level table of lemmas, by category and sentence.
+
+    Rows are sorted by category and sentence, keeping the order of the
+    tokens, so that the rows of category ``c`` in sentence ``s`` are
+    ``offsets[c, s]:offsets[c, s + 1]``. Use
+    :func:`TRUNAJOD.lemmas.sentence_lemma_table` to build it from a text.
+
+    :param codes: Lemma code of each row
+    :type codes: numpy.ndarray
+    :param categories: Category of each row
+    :type categories: numpy.ndarray
+    :param sentences: Sentence of each row
+    :type sentences: numpy.ndarray
+    :param vocabulary: Lemma of each code
+    :type vocabulary: List of str
+    :param n_sentences: Number of sentences of the text
+    :type n_sentences: int
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        categories: np.ndarray,
+        sentences: np.ndarray,
+        vocabulary: List[str],
+        n_sentences: int,
+    ):
+        """Initialize table, sorting rows by category and sentence."""
+        keys = np.asarray(categories, dtype=np.int64) * n_sentences
+        keys += np.asarray(sentences, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self.codes = np.asarray(codes, dtype=np.int64)[order]
+        self.categories = np.asarray(categories, dtype=np.int8)[order]
+        self.sentences = np.asarray(sentences, dtype=np.int64)[order]
+        self.vocabulary = list(vocabulary)
+        self.n_sentences = n_sentences
+        counts = np.bincount(keys, minlength=len(LemmaCategory) * n_sentences)
+        starts = np.concatenate(([0], np.cumsum(counts)))
+        # Row of each category, with the end of the category as last column
+        self.offsets = starts[
+            np.arange(len(LemmaCategory))[:, None] * n_sentences
+            + np.arange(n_sentences + 1)
+        ]
+
+    def __len__(self) -> int:
+        """Return number of rows of the table."""
+        return len(self.codes)
+
+    def category(self, category: LemmaCategory) -> Tuple[np.ndarray, ...]:
+        """Return the rows of a category.
+
+        :param category: Lemma category
+        :type category: LemmaCategory
+        :return: Lemma codes and sentences of the category (views), and the
+            offsets of each sentence within them
+        :rtype: tuple of numpy.ndarray
+        """
+        offsets = self.offsets[category]
+        rows = slice(offsets[0], offsets[-1])
+        return (
+            self.codes[rows],
+            self.sentences[rows],
+            offsets - offsets[0],
+        )
+
+    def sentence_codes(
+        self, category: LemmaCategory, sentence: int
+    ) -> np.ndarray:
+        """Return the lemma codes of a category in a sentence.
+
+        :param category: Lemma category
+        :type category: LemmaCategory
+        :param sentence: Sentence index
+        :type sentence: int
+        :return: Lemma codes (a view of the table)
+        :rtype: numpy.ndarray
+        """
+        offsets = self.offsets[category]
+        return self.codes[offsets[sentence] : offsets[sentence + 1]]
+
+    def lemmas(self, category: LemmaCategory, sentence: int) -> List[str]:
+        """Return the lemmas of a category in a sentence.
+
+        :param category: Lemma category
+        :type category: LemmaCategory
+        :param sentence: Sentence index
+        :type sentence: int
+        :return: Lemmas
+        :rtype: List of str
+        """
+        vocabulary = self.vocabulary
+        return [
+            vocabulary[code]
+            for code in self.sentence_codes(category, sentence).tolist()
+        ]
+
+    def sentence_lemmas(self, category: LemmaCategory) -> List[List[str]]:
+        """Return the lemmas of a category, for each sentence.
+
+        :param category: Lemma category
+        :type category: LemmaCategory
+        :return: Lemmas of each sentence
+        :rtype: List of Lists of str
+        """
+        return [
+            self.lemmas(category, sentence)
+            for sentence in range(self.n_sentences)
+        ]
+
+    def to_lists(self) -> Tuple[List[List[str]], ...]:
+        """Return lemmas as :func:`TRUNAJOD.utils.get_sentences_lemmas`.
+
+        :return: Lemmas of each category for each sentence
+        :rtype: tuple of Lists of Lists of str
+        """
+        return tuple(
+            self.sentence_lemmas(category) for category in LemmaCategory
+        )
+
+
+def sentence_lemma_table(
+    docs: Iterable[Span], lemma_dict: Dict[str, str], stopwords=[]
+) -> LemmaTable:
+    """Build the lemma table of a text.
+
+    This is the columnar alternative of
+    :func:`TRUNAJOD.utils.get_sentences_lemmas`, with the same arguments and
+    categories. Each distinct word of the text is lemmatized once, and the
+    rows of all the tokens are built at once from their ``LOWER`` and
+    ``POS`` attributes.
+
+    :param docs: Sentences to be processed
+    :type docs: List of Spacy Span (Doc.sents)
+    :param lemma_dict: Lemmatizer dictionary
+    :type lemma_dict: dict or :class:`TRUNAJOD.lexicon.LemmaDictionary`
+    :param stopwords: List of stopwords (function words), defaults to []
+    :type stopwords: list or :class:`TRUNAJOD.lexicon.Lexicon`, optional
+    :return: Lemma table
+    :rtype: LemmaTable
+    """
+    arrays = []
+    vocab = None
+    for sent in docs:
+        arrays.append(sent.to_array([LOWER, POS]).reshape(-1, 2))
+        vocab = sent.vocab
+    n_sentences = len(arrays)
+    if not n_sentences:
+        empty = np.zeros(0, dtype=np.int64)
+        return LemmaTable(empty, empty, empty, [], 0)
+
+    tokens = np.concatenate(arrays)
+    lowers = tokens[:, 0]
+    pos = tokens[:, 1]
+    token_sentences = np.repeat(
+        np.arange(n_sentences), [len(array) for array in arrays]
+    )
+
+    # Lemmatize each distinct word once
+    words, inverse = np.unique(lowers, return_inverse=True)
+    lemma_codes: Dict[str, int] = {}
+    word_codes = np.empty(len(words), dtype=np.int64)
+    for i, word in enumerate(words.tolist()):
+        if isinstance(lemma_dict, LemmaDictionary):
+            lemma = lemma_dict.get(word)
+            if lemma is None:
+                lemma = vocab.strings[word]
+        else:
+            text = vocab.strings[word]
+            lemma = lemma_dict.get(text, text)
+        word_codes[i] = lemma_codes.setdefault(lemma, len(lemma_codes))
+    codes = word_codes[inverse.reshape(-1)]
+
+    if isinstance(stopwords, Lexicon):
+        stopword_hashes = stopwords.array
+    else:
+        stopword_hashes = np.array(
+            [hash_string(word) for word in stopwords], dtype=np.uint64
+        )
+    is_stopword = np.isin(lowers, stopword_hashes)
+    is_content = ~is_stopword & ~np.isin(pos, NON_WORD_POS)
+
+    pos_categories = np.full(len(pos), -1, dtype=np.int64)
+    for tag, category in POS_CATEGORIES.items():
+        pos_categories[pos == tag] = category
+    has_pos = pos_categories >= 0
+
+    return LemmaTable(
+        np.concatenate(
+            (codes[has_pos], codes[is_stopword], codes[is_content])
+        ),
+        np.concatenate(
+            (
+                pos_categories[has_pos],
+                np.full(is_stopword.sum(), LemmaCategory.FUNCTION),
+                np.full(is_content.sum(), LemmaCategory.CONTENT),
+            )
+        ),
+        np.concatenate(
+            (
+                token_sentences[has_pos],
+                token_sentences[is_stopword],
+                token_sentences[is_content],
+            )
+        ),
+        list(lemma_codes),
+        n_sentences,
+    )
@@ -12,11 +12,194 @@ compute the following lexico-semantic variables:
 
 We provide two downloadable models of these variables, which come from
 :cite:`duchon2013espal` and :cite:`guasch2016spanish`.
+
+Norm dictionaries can be compiled into a
+:class:`TRUNAJOD.lexico_semantic_norms.NormTable` (a vocabulary index and a
+``words x norms`` matrix), which is faster to score when processing many
+texts, and also supports norms other than the six above.
 """
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from TRUNAJOD.instrumentation import instrument
 from TRUNAJOD.lexicosemantic_norms_espal import LEXICOSEMANTIC_ESPAL
 from TRUNAJOD.lexicosemantic_norms_espal import LSNorm
+from TRUNAJOD.profiles import lexicon_profile
 from TRUNAJOD.utils import lemmatize
 
+NORMS = [
+    "arousal",
+    "concreteness",
+    "context_availability",
+    "familiarity",
+    "imageability",
+    "valence",
+]
+
+
+class NormTable(object):
+    """Lexico semantic norms compiled into a matrix.
+
+    Row ``i`` of ``matrix`` holds the norms of the word with index ``i`` in
+    ``vocabulary``, and each column corresponds to a norm.
+
+    :param vocabulary: Index of each word
+    :type vocabulary: dict
+    :param matrix: ``words x norms`` matrix
+    :type matrix: numpy.ndarray of float32
+    :param columns: Name of each norm
+    :type columns: List of str
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        matrix: np.ndarray,
+        columns: Sequence[str],
+    ):
+        """Initialize table from its vocabulary and matrix."""
+        matrix = np.asarray(matrix, dtype=np.float32).reshape(
+            len(vocabulary), len(columns)
+        )
+        self.vocabulary = vocabulary
+        self.matrix = matrix
+        self.columns = list(columns)
+
+    @classmethod
+    def from_dict(
+        cls,
+        norm_dict: Mapping[str, Union[Mapping[str, float], Sequence[float]]],
+        columns: Optional[Sequence[str]] = None,
+        words: Optional[Iterable[str]] = None,
+    ) -> "NormTable":
+        """Compile a norm dict into a table.
+
+        Values of the dict can be dicts ``norm -> value`` (as the dicts
+        taken by :class:`LexicoSemanticNorm`) or sequences of values, in
+        which case ``columns`` gives their names.
+
+        :param norm_dict: Norms of each word
+        :type norm_dict: dict
+        :param columns: Norms to compile, defaults to None (the six norms of
+            :class:`LexicoSemanticNorm`, or the keys of the first entry if
+            it does not have them)
+        :type columns: List of str, optional
+        :param words: Only compile these words, defaults to None (all)
+        :type words: Iterable of str, optional
+        :return: Norm table
+        :rtype: NormTable
+        """
+        words = list(norm_dict if words is None else words)
+        if columns is None:
+            first = norm_dict[words[0]] if words else {}
+            if isinstance(first, Mapping) and not set(NORMS) <= set(first):
+                columns = list(first)
+            else:
+                columns = NORMS
+        rows = []
+        for word in words:
+            norms = norm_dict[word]
+            if isinstance(norms, Mapping):
+                rows.append([norms.get(column) for column in columns])
+            else:
+                rows.append(norms)
+        vocabulary = {word: index for index, word in enumerate(words)}
+        return cls(vocabulary, np.array(rows, dtype=np.float32), columns)
+
+    def __len__(self) -> int:
+        """Return number of words in the table."""
+        return len(self.vocabulary)
+
+    def __contains__(self, word: str) -> bool:
+        """Return ``True`` if the word is in the table."""
+        return word in self.vocabulary
+
+    def row(self, word: str) -> np.ndarray:
+        """Get the norms of a word.
+
+        :param word: Word to look up
+        :type word: str
+        :raises KeyError: If the word is not in the table
+        :return: Value of each norm
+        :rtype: numpy.ndarray of float32
+        """
+        return self.matrix[self.vocabulary[word]]
+
+    def indices(
+        self, doc, lemmatizer: Optional[Dict[str, str]] = None
+    ) -> np.ndarray:
+        """Get the table row of each token found in the table.
+
+        Tokens are looked up by their lowercased text or, if not found, by
+        their lemma according to ``lemmatizer``. Each distinct word is
+        looked up once.
+
+        :param doc: Text to be processed
+        :type doc: Spacy Doc
+        :param lemmatizer: Lemmatizer, defaults to None
+        :type lemmatizer: dict, optional
+        :return: Rows of the tokens found, in text order
+        :rtype: numpy.ndarray of int
+        """
+        word_rows: Dict[str, int] = {}
+        rows = []
+        for token in doc:
+            word = token.text.lower()
+            row = word_rows.get(word)
+            if row is None:
+                row = word_rows[word] = _resolve(
+                    word, self.vocabulary, lemmatizer, -1
+                )
+            if row >= 0:
+                rows.append(row)
+        return np.array(rows, dtype=np.int64)
+
+    def score(
+        self, doc, lemmatizer: Optional[Dict[str, str]] = None
+    ) -> Tuple[np.ndarray, int]:
+        """Average norms over the tokens of a text found in the table.
+
+        :param doc: Text to be processed
+        :type doc: Spacy Doc
+        :param lemmatizer: Lemmatizer, defaults to None
+        :type lemmatizer: dict, optional
+        :return: Average of each norm (zeros if no token was found) and the
+            number of tokens found
+        :rtype: Tuple (numpy.ndarray, int)
+        """
+        rows = self.indices(doc, lemmatizer)
+        if not len(rows):
+            return np.zeros(len(self.columns)), 0
+        return self.matrix[rows].mean(axis=0, dtype=np.float64), len(rows)
+
+
+def _resolve(word, vocabulary, lemmatizer, default):
+    """Look up a word, falling back to its lemma."""
+    if word in vocabulary:
+        return vocabulary[word]
+    if lemmatizer:
+        return vocabulary.get(lemmatize(lemmatizer, word), default)
+    return default
+
+
+def _doc_table(doc, norm_dict, lemmatizer=None) -> NormTable:
+    """Compile the entries of a norm dict used by a text."""
+    words = set()
+    for token in doc:
+        word = token.text.lower()
+        if word not in norm_dict and lemmatizer:
+            word = lemmatize(lemmatizer, word)
+        if word in norm_dict:
+            words.add(word)
+    return NormTable.from_dict(norm_dict, NORMS, sorted(words))
+
 
 class LexicoSemanticNorm(object):
     """Create a lexico semantic norm calculator for text.
@@ -26,9 +209,21 @@ class LexicoSemanticNorm(object):
     "familiarity", "imageability", "valence"}``. Average over number of
     tokens will be computed. The values are obtained from
     :cite:`guasch2016spanish`.
+
+    A :class:`NormTable` can be given instead of the dict. Compiling the
+    norms once and reusing the table is faster when processing many texts,
+    and tables may have any set of norms (see
+    :meth:`LexicoSemanticNorm.get_norms`).
     """
 
-    def __init__(self, doc, lexico_semantic_norm_dict, lemmatizer=None):
+    @instrument(name="lexico_semantic_norms.LexicoSemanticNorm", doc_arg=1)
+    def __init__(
+        self,
+        doc,
+        lexico_semantic_norm_dict,
+        lemmatizer=None,
+        sentence_profile=False,
+    ):
         """Initialize lexico semantic norm object.
 
         Calculate average over number of tokens given a text.
@@ -36,71 +231,33 @@ class LexicoSemanticNorm(object):
         :param doc: Text to be processed
         :type doc: Spacy Doc
         :param lexico_semantic_norm_dict: Lexico semantic norms for words
-        :type lexico_semantic_norm_dict: dict
+        :type lexico_semantic_norm_dict: dict or NormTable
         :param lemmatizer: Lemmatizer, defaults to None
         :type lemmatizer: dict, optional
+        :param sentence_profile: Whether to also compute norms of each
+            sentence (see :meth:`LexicoSemanticNorm.get_sentence_profile`),
+            defaults to False
+        :type sentence_profile: bool, optional
         """
-        valence = 0
-        arousal = 0
-        concreteness = 0
-        imageability = 0
-        context_availability = 0
-        familiarity = 0
-        count = 0.0
+        if isinstance(lexico_semantic_norm_dict, NormTable):
+            table = lexico_semantic_norm_dict
+        else:
+            # Only the words of the text are compiled
+            table = _doc_table(doc, lexico_semantic_norm_dict, lemmatizer)
+        means, _ = table.score(doc, lemmatizer)
+        self.__norms = dict(zip(table.columns, means.tolist()))
 
-        for token in doc:
-            word = token.text.lower()
-            word_lemma = word
-            if lemmatizer:
-                word_lemma = lemmatize(lemmatizer, word)
-
-            if word in lexico_semantic_norm_dict:
-                valence += lexico_semantic_norm_dict[word].get("valence")
-                arousal += lexico_semantic_norm_dict[word].get("arousal")
-                concreteness += lexico_semantic_norm_dict[word].get(
-                    "concreteness"
-                )
-                imageability += lexico_semantic_norm_dict[word].get(
-                    "imageability"
-                )
-                context_availability += lexico_semantic_norm_dict[word].get(
-                    "context_availability"
-                )
-                familiarity += lexico_semantic_norm_dict[word].get(
-                    "familiarity"
-                )
-                count += 1
-            elif word_lemma in lexico_semantic_norm_dict:
-                word = word_lemma
-                valence += lexico_semantic_norm_dict[word].get("valence")
-                arousal += lexico_semantic_norm_dict[word].get("arousal")
-                concreteness += lexico_semantic_norm_dict[word].get(
-                    "concreteness"
-                )
-                imageability += lexico_semantic_norm_dict[word].get(
-                    "imageability"
-                )
-                context_availability += lexico_semantic_norm_dict[word].get(
-                    "context_availability"
-                )
-                familiarity += lexico_semantic_norm_dict[word].get(
-                    "familiarity"
-                )
-                count += 1.0
-
-        self.__valence = valence
-        self.__arousal = arousal
-        self.__concreteness = concreteness
-        self.__imageability = imageability
-        self.__context_avilability = context_availability
-        self.__familiarity = familiarity
-        if count > 0:
-            self.__valence /= count
-            self.__arousal /= count
-            self.__concreteness /= count
-            self.__imageability /= count
-            self.__context_avilability /= count
-            self.__familiarity /= count
+        self.__profile = None
+        if sentence_profile:
+            self.__profile = norms_profile(doc, table, lemmatizer)
+
+    def get_norms(self) -> Dict[str, float]:
+        """Get the average of every norm.
+
+        :return: Average of each norm, keyed by norm name
+        :rtype: dict
+        """
+        return dict(self.__norms)
 
     def get_arousal(self):
         """Get arousal.
@@ -108,7 +265,7 @@ class LexicoSemanticNorm(object):
         :return: Average arousal.
         :rtype: float
         """
-        return self.__arousal
+        return self.__norms["arousal"]
 
     def get_concreteness(self):
         """Get concreteness.
@@ -116,7 +273,7 @@ class LexicoSemanticNorm(object):
         :return: Average concreteness.
         :rtype: float
         """
-        return self.__concreteness
+        return self.__norms["concreteness"]
 
     def get_context_availability(self):
         """Get context_availability.
@@ -124,7 +281,7 @@ class LexicoSemanticNorm(object):
         :return: Average context_availability.
         :rtype: float
         """
-        return self.__context_avilability
+        return self.__norms["context_availability"]
 
     def get_familiarity(self):
         """Get familiarity.
@@ -132,7 +289,7 @@ class LexicoSemanticNorm(object):
         :return: Average familiarity.
         :rtype: float
         """
-        return self.__familiarity
+        return self.__norms["familiarity"]
 
     def get_imageability(self):
         """Get imageability.
@@ -140,7 +297,7 @@ class LexicoSemanticNorm(object):
         :return: Average imageability.
         :rtype: float
         """
-        return self.__imageability
+        return self.__norms["imageability"]
 
     def get_valence(self):
         """Get valence.
@@ -148,9 +305,69 @@ class LexicoSemanticNorm(object):
         :return: Average valence.
         :rtype: float
         """
-        return self.__valence
+        return self.__norms["valence"]
 
+    def get_sentence_profile(self):
+        """Get lexico semantic norms of each sentence.
 
+        Columns of the profile are the norms of the table, by default in
+        ``NORMS`` order: arousal, concreteness, context_availability,
+        familiarity, imageability and valence.
+
+        :raises ValueError: If ``sentence_profile`` was not requested
+        :return: Sentence profile of lexico semantic norms
+        :rtype: SentenceProfile
+        """
+        if self.__profile is None:
+            raise ValueError(
+                "Sentence profile was not computed, use "
+                "LexicoSemanticNorm(doc, norms, sentence_profile=True)"
+            )
+        return self.__profile
+
+
+@instrument
+def norms_profile(doc, lexico_semantic_norm_dict, lemmatizer=None):
+    """Compute lexico semantic norms of each sentence of a text.
+
+    Values are computed as in :class:`LexicoSemanticNorm`, but averaged over
+    the words of each sentence found in the norms dict.
+
+    :param doc: Text to be processed
+    :type doc: Spacy Doc
+    :param lexico_semantic_norm_dict: Lexico semantic norms for words
+    :type lexico_semantic_norm_dict: dict or NormTable
+    :param lemmatizer: Lemmatizer, defaults to None
+    :type lemmatizer: dict, optional
+    :return: Sentence profile, with one column per norm
+    :rtype: SentenceProfile
+    """
+    table = lexico_semantic_norm_dict
+    if not isinstance(table, NormTable):
+        table = _doc_table(doc, table, lemmatizer)
+
+    def lookup(word):
+        row = _resolve(word, table.vocabulary, lemmatizer, None)
+        return None if row is None else table.matrix[row].tolist()
+
+    return lexicon_profile(doc, table.columns, lookup)
+
+
+_ESPAL_TABLE: List = [None, None]
+
+
+def _espal_table() -> NormTable:
+    """Compile EsPal norms, once per dict object."""
+    if _ESPAL_TABLE[0] is not LEXICOSEMANTIC_ESPAL:
+        _ESPAL_TABLE[1] = NormTable.from_dict(
+            LEXICOSEMANTIC_ESPAL,
+            ["concreteness", "imageability", "familiarity"],
+        )
+        _ESPAL_TABLE[0] = LEXICOSEMANTIC_ESPAL
+    return _ESPAL_TABLE[1]
+
+
+@instrument
 def get_conc_imag_familiarity(doc):
     """Get lexico-semantic variables.
 
@@ -167,22 +384,15 @@ def get_conc_imag_familiarity(doc):
     :return: Concreteness imageability and familiarity averaged over sentences
     :rtype: List of float
     """
-    n_found_tokens = [0, 0, 0]
-    lsnorm_total = [0, 0, 0]
-
-    for token in doc:
-        if token.pos_ == "NOUN":
-            lemma = token.lemma_
-            if lemma in LEXICOSEMANTIC_ESPAL:
-                concreteness, imageability, familiarity = LEXICOSEMANTIC_ESPAL[
-                    lemma.lower()
-                ]
-                n_found_tokens = [x + 1 for x in n_found_tokens]
-                lsnorm_total[LSNorm.CONCRETENESS] += concreteness
-                lsnorm_total[LSNorm.IMAGEABILITY] += imageability
-                lsnorm_total[LSNorm.FAMILIARITY] += familiarity
-
-    lsnorm_total[LSNorm.CONCRETENESS] /= n_found_tokens[LSNorm.CONCRETENESS]
-    lsnorm_total[LSNorm.IMAGEABILITY] /= n_found_tokens[LSNorm.IMAGEABILITY]
-    lsnorm_total[LSNorm.FAMILIARITY] /= n_found_tokens[LSNorm.FAMILIARITY]
-    return lsnorm_total
+    table = _espal_table()
+    rows = [
+        table.vocabulary[token.lemma_]
+        for token in doc
+        if token.pos_ == "NOUN" and token.lemma_ in table.vocabulary
+    ]
+    lsnorm_total = table.matrix[rows].sum(axis=0, dtype=np.float64).tolist()
+    return [
+        lsnorm_total[LSNorm.CONCRETENESS] / len(rows),
+        lsnorm_total[LSNorm.IMAGEABILITY] / len(rows),
+        lsnorm_total[LSNorm.FAMILIARITY] / len(rows),
+    ]
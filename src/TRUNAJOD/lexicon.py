@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""Hashed lexicons module.
+
+Word lists (stopwords, negation words, connectives) and lemma dictionaries are
+usually Python sets and dicts of strings, so checking a token means building
+its lowercased text (``token.text.lower()``) first. spaCy already stores the
+hash of the lowercased text and of the lemma of each token
+(``token.lower`` and ``token.lemma``), so this module compiles lexicons into
+those hashes once, and membership tests run on integers:
+
+.. code-block:: python
+
+    from TRUNAJOD.lexicon import Lexicon
+
+    negation = Lexicon(["no", "nunca", "jamás"])
+    token.lemma in negation  # No strings involved
+    negation.count(doc, attr="lemma")  # Vectorized over the whole Doc
+
+Hashed lexicons also accept strings, so they can be used wherever a set of
+words was used before.
+"""
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Union
+
+import numpy as np
+from spacy.attrs import LEMMA
+from spacy.attrs import LOWER
+from spacy.attrs import NORM
+from spacy.attrs import ORTH
+from spacy.attrs import POS
+from spacy.parts_of_speech import PUNCT
+from spacy.parts_of_speech import SPACE
+from spacy.parts_of_speech import SYM
+from spacy.strings import hash_string
+from spacy.tokens import Doc
+
+TOKEN_ATTRS = {"lemma": LEMMA, "lower": LOWER, "norm": NORM, "orth": ORTH}
+
+# Same PoS tags as TRUNAJOD.utils.is_word
+NON_WORD_TAGS = ("PUNCT", "SYM", "SPACE")
+NON_WORD_POS = np.array([PUNCT, SYM, SPACE], dtype=np.uint64)
+
+
+def _case_variants(word: str) -> set:
+    return {word, word.lower(), word.upper(), word.capitalize()}
+
+
+def _word_mask(doc: Doc) -> np.ndarray:
+    pos = doc.to_array([POS]).reshape(-1)
+    return ~np.isin(pos, NON_WORD_POS)
+
+
+class Lexicon(object):
+    """Set of words compiled into spaCy string hashes.
+
+    Words are matched ignoring case: the hashes of the lowercased,
+    uppercased and capitalized variants of each word are kept, so attributes
+    that are not lowercased by spaCy (such as ``token.lemma``) are matched
+    like ``token.lemma_.lower()`` would be. Words mixing cases in other ways
+    are not matched.
+
+    :param words: Words of the lexicon
+    :type words: Iterable of str
+    """
+
+    def __init__(self, words: Iterable[str]):
+        """Initialize lexicon, hashing the words."""
+        self.words = frozenset(word.lower() for word in words)
+        self.hashes = frozenset(
+            hash_string(variant)
+            for word in self.words
+            for variant in _case_variants(word)
+        )
+        self.array = np.array(sorted(self.hashes), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        """Return number of words of the lexicon."""
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the words of the lexicon."""
+        return iter(self.words)
+
+    def __contains__(self, item: Union[str, int]) -> bool:
+        """Return ``True`` if a word (or the hash of a word) is in lexicon."""
+        if isinstance(item, str):
+            return item.lower() in self.words
+        return item in self.hashes
+
+    def mask(self, doc: Doc, attr: str = "lower") -> np.ndarray:
+        """Return a boolean mask of the tokens found in the lexicon.
+
+        :param doc: Tokenized text
+        :type doc: Spacy Doc
+        :param attr: Token attribute looked up, one of ``lower``, ``lemma``,
+            ``norm`` and ``orth``, defaults to ``lower``
+        :type attr: str, optional
+        :return: Whether each token is in the lexicon
+        :rtype: numpy.ndarray of bool
+        """
+        if isinstance(doc, Doc):
+            values = doc.to_array([TOKEN_ATTRS[attr]]).reshape(-1)
+            return np.isin(values, self.array)
+        # Sequences of tokens that are not spaCy tokens: look up strings
+        attr += "_"
+        return np.array(
+            [getattr(token, attr).lower() in self.words for token in doc],
+            dtype=bool,
+        )
+
+    def count(
+        self, doc: Doc, attr: str = "lower", words_only: bool = True
+    ) -> int:
+        """Count the tokens of a text found in the lexicon.
+
+        :param doc: Tokenized text
+        :type doc: Spacy Doc
+        :param attr: Token attribute looked up, defaults to ``lower``
+        :type attr: str, optional
+        :param words_only: Whether to ignore punctuation, symbols and spaces
+            (see :func:`TRUNAJOD.utils.is_word`), defaults to True
+        :type words_only: bool, optional
+        :return: Number of tokens found in the lexicon
+        :rtype: int
+        """
+        found = self.mask(doc, attr)
+        if words_only:
+            if isinstance(doc, Doc):
+                found &= _word_mask(doc)
+            else:
+                found &= np.array(
+                    [token.pos_ not in NON_WORD_TAGS for token in doc],
+                    dtype=bool,
+                )
+        return int(found.sum())
+
+
+class LemmaDictionary(object):
+    """Lemma dictionary keyed by spaCy string hashes.
+
+    It maps the hash of a lowercased word to its lemma, so tokens are
+    lemmatized from ``token.lower``. It can be used wherever a lemma dict
+    is used, such as :func:`TRUNAJOD.utils.lemmatize`, as strings are also
+    accepted.
+
+    :param lemma_dict: A dict (word, lemma), words being lowercased
+    :type lemma_dict: Python dict
+    """
+
+    def __init__(self, lemma_dict: Dict[str, str]):
+        """Initialize dictionary, hashing the words and lemmas."""
+        self.__lemmas: Dict[int, str] = {}
+        self.__lemma_hashes: Dict[int, int] = {}
+        for word, lemma in lemma_dict.items():
+            key = hash_string(word)
+            self.__lemmas[key] = lemma
+            self.__lemma_hashes[key] = hash_string(lemma)
+
+    def __len__(self) -> int:
+        """Return number of words of the dictionary."""
+        return len(self.__lemmas)
+
+    def __contains__(self, word: Union[str, int]) -> bool:
+        """Return ``True`` if a word (or its hash) is in the dictionary."""
+        if isinstance(word, str):
+            word = hash_string(word)
+        return word in self.__lemmas
+
+    def get(
+        self, word: Union[str, int], default: Optional[str] = None
+    ) -> Optional[str]:
+        """Get the lemma of a word, like ``dict.get``.
+
+        :param word: Lowercased word, or its hash
+        :type word: str or int
+        :param default: Value if the word is not found, defaults to None
+        :type default: str, optional
+        :return: The lemma
+        :rtype: str
+        """
+        if isinstance(word, str):
+            word = hash_string(word)
+        return self.__lemmas.get(word, default)
+
+    def lemma(self, token) -> str:
+        """Lemmatize a token.
+
+        :param token: Token to be lemmatized
+        :type token: Spacy Token
+        :return: The lemma, or the lowercased text if the token is not in the
+            dictionary
+        :rtype: str
+        """
+        lemma = self.__lemmas.get(token.lower)
+        return token.lower_ if lemma is None else lemma
+
+    def lemma_hashes(self, doc: Doc) -> np.ndarray:
+        """Lemmatize a text into lemma hashes.
+
+        Each distinct word of the text is looked up once. Words that are not
+        in the dictionary keep the hash of their lowercased text.
+
+        :param doc: Tokenized text
+        :type doc: Spacy Doc
+        :return: Hash of the lemma of each token
+        :rtype: numpy.ndarray of uint64
+        """
+        lowers = doc.to_array([LOWER]).reshape(-1)
+        words, inverse = np.unique(lowers, return_inverse=True)
+        lemmas = np.array(
+            [self.__lemma_hashes.get(word, word) for word in words.tolist()],
+            dtype=np.uint64,
+        )
+        return lemmas[inverse.reshape(-1)]
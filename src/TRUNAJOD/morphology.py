@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Morphology features module.
+
+Several metrics look for morphological features of tokens, such as finite
+verbs (``VerbForm=Fin``) or third person pronouns (``Person=3``). Depending
+on the model, these features are in the morphological analysis of the token
+(``token.morph``, spaCy 3) or in its tag (``token.tag_``, e.g.
+``VERB__Mood=Ind|Person=3|VerbForm=Fin`` in spaCy 2 models). This module
+decodes both into :class:`TRUNAJOD.morphology.MorphFlag` bitmasks, so
+metrics test bits instead of searching strings:
+
+.. code-block:: python
+
+    from TRUNAJOD.morphology import MorphFlag
+    from TRUNAJOD.morphology import doc_flags
+
+    flags = doc_flags(doc)  # One bitmask per token
+    finite_verbs = (flags & MorphFlag.FINITE) != 0
+
+Each distinct morphological analysis and tag is decoded once, and cached by
+its hash.
+"""
+import re
+from enum import IntFlag
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+from spacy.attrs import MORPH
+from spacy.attrs import TAG
+from spacy.tokens import Doc
+from spacy.tokens import Token
+
+
+class MorphFlag(IntFlag):
+    """Morphological features used by TRUNAJOD metrics."""
+
+    FINITE = 1
+    INFINITIVE = 2
+    GERUND = 4
+    PARTICIPLE = 8
+    FIRST_PERSON = 16
+    SECOND_PERSON = 32
+    THIRD_PERSON = 64
+    # Added to tags by TRUNAJOD.surface_proxies.fix_parse_tree
+    PERIPHRASIS = 128
+
+
+FEATURE_FLAGS = {
+    "VerbForm=Fin": MorphFlag.FINITE,
+    "VerbForm=Inf": MorphFlag.INFINITIVE,
+    "VerbForm=Ger": MorphFlag.GERUND,
+    "VerbForm=Part": MorphFlag.PARTICIPLE,
+    "Person=1": MorphFlag.FIRST_PERSON,
+    "Person=2": MorphFlag.SECOND_PERSON,
+    "Person=3": MorphFlag.THIRD_PERSON,
+    "Perif": MorphFlag.PERIPHRASIS,
+}
+
+# Flag of each VerbForm value
+VERB_FORM_FLAGS = {
+    feature.split("=")[1]: flag
+    for feature, flag in FEATURE_FLAGS.items()
+    if feature.startswith("VerbForm=")
+}
+
+FEATURE_SEPARATOR_REGEX = re.compile(r"\|+|__")
+
+_HASH_FLAGS: Dict[int, int] = {}
+
+
+@lru_cache(maxsize=None)
+def decode_flags(features: str) -> int:
+    """Decode morphological features into a bitmask.
+
+    Features are separated by ``|`` (or ``__`` after the PoS of spaCy 2
+    tags), and multiple values of a feature by ``,``.
+
+    :param features: Morphological analysis or tag, e.g.
+        ``Mood=Ind|Person=3|VerbForm=Fin``
+    :type features: str
+    :return: Bitmask of :class:`TRUNAJOD.morphology.MorphFlag`
+    :rtype: int
+    """
+    flags = 0
+    for feature in FEATURE_SEPARATOR_REGEX.split(features):
+        name, _, values = feature.partition("=")
+        if not values:
+            flags |= FEATURE_FLAGS.get(name, 0)
+            continue
+        for value in values.split(","):
+            flags |= FEATURE_FLAGS.get(name + "=" + value, 0)
+    return flags
+
+
+def _hash_flags(key: int, strings) -> int:
+    flags = _HASH_FLAGS.get(key)
+    if flags is None:
+        flags = _HASH_FLAGS[key] = decode_flags(strings[key])
+    return flags
+
+
+def token_flags(token: Token) -> int:
+    """Return the morphological flags of a token.
+
+    :param token: Token
+    :type token: Spacy Token
+    :return: Bitmask of :class:`TRUNAJOD.morphology.MorphFlag`
+    :rtype: int
+    """
+    if isinstance(token, Token):
+        strings = token.vocab.strings
+        return _hash_flags(token.morph.key, strings) | _hash_flags(
+            token.tag, strings
+        )
+    # Tokens that are not spaCy tokens: decode their tag
+    tag = token.tag_
+    if not isinstance(tag, str):
+        tag = "|".join(tag)
+    return decode_flags(tag)
+
+
+def doc_flags(doc: Doc) -> np.ndarray:
+    """Return the morphological flags of the tokens of a text.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Bitmask of :class:`TRUNAJOD.morphology.MorphFlag` of each token
+    :rtype: numpy.ndarray of int64
+    """
+    if not isinstance(doc, Doc):
+        return np.array([token_flags(token) for token in doc], dtype=np.int64)
+
+    keys = doc.to_array([MORPH, TAG]).reshape(-1)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    strings = doc.vocab.strings
+    unique_flags = np.array(
+        [_hash_flags(key, strings) for key in unique_keys.tolist()],
+        dtype=np.int64,
+    )
+    # Combine the flags of the analysis and the tag of each token
+    flags = unique_flags[inverse.reshape(-1)].reshape(-1, 2)
+    return flags[:, 0] | flags[:, 1]
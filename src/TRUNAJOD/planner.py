@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""Pipeline planner module.
+
+TRUNAJOD features need different annotations: some only need PoS tags,
+others need lemmas, the dependency parse or word vectors. Running the full
+spaCy pipeline for features that only need tags wastes most of the parsing
+time. Given a list of features, :func:`TRUNAJOD.planner.plan_pipeline`
+finds the annotations they need and the components of a pipeline that can
+be disabled:
+
+.. code-block:: python
+
+    import spacy
+    from TRUNAJOD.planner import plan_pipeline
+
+    nlp = spacy.load("es_core_news_sm")
+    plan = plan_pipeline(nlp, ["lexical_density", "yule_k"])
+    plan.disable  # ['parser', 'ner']
+    with plan.select_pipes(nlp):
+        docs = list(nlp.pipe(texts))
+
+Components are matched with the annotations they declare
+(``nlp.get_pipe_meta(name).assigns``). Components declaring no annotations
+(such as ``attribute_ruler``) are kept, and so are the components required
+by kept components, and ``tok2vec`` components listened by them. If the
+pipeline cannot produce an annotation, planning fails before any text is
+processed.
+
+This requires spaCy 3.
+"""
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+
+from spacy.language import Language
+
+# Annotations, and the component attributes (any of them) providing them.
+# Annotations are planned in this order, so that sentence boundaries come
+# from the parser when it is needed anyway.
+ANNOTATIONS: Dict[str, Set[str]] = {
+    "dep": {"token.dep", "token.head"},
+    "pos": {"token.pos"},
+    "tag": {"token.tag"},
+    "morph": {"token.morph"},
+    "lemma": {"token.lemma"},
+    "ents": {"doc.ents", "token.ent_iob", "token.ent_type"},
+    "sents": {"doc.sents", "token.is_sent_start"},
+}
+
+# Annotations that do not come from components
+VECTORS = "vectors"
+
+FEATURE_ANNOTATIONS: Dict[str, Set[str]] = {
+    "average_clause_length": {"pos", "morph", "lemma"},
+    "average_dependency_depth": {"dep", "pos"},
+    "average_dependency_distance": {"dep", "pos"},
+    "average_sentence_length": {"pos", "sents"},
+    "average_word_length": {"pos"},
+    "avg_w2v_semantic_similarity": {VECTORS, "sents"},
+    "char_count": {"pos"},
+    "clause_count": {"pos", "morph", "lemma"},
+    "connection_words_ratio": {"pos", "lemma"},
+    "crawford": {"pos", "sents"},
+    "entity_grid": {"pos", "dep", "sents"},
+    "fernandez_huerta": {"pos", "sents"},
+    "first_second_person_density": {"pos", "morph"},
+    "frequency_index": {"pos", "lemma", "sents"},
+    "gutierrez_de_polini": {"pos", "sents"},
+    "hdd": {"pos", "lemma"},
+    "lexical_density": {"pos"},
+    "lexical_diversity_mtld": {"pos", "lemma"},
+    "max_dependency_depth": {"dep", "pos"},
+    "mean_segmental_ttr": {"pos", "lemma"},
+    "moving_average_ttr": {"pos", "lemma"},
+    "mu_legibility": {"pos", "sents"},
+    "negation_density": {"pos", "lemma"},
+    "noun_phrase_density": {"pos", "dep", "sents"},
+    "pos_dissimilarity": {"pos", "sents"},
+    "pos_ratio": {"pos"},
+    "pronoun_density": {"pos", "morph"},
+    "pronoun_noun_ratio": {"pos", "morph"},
+    "sentence_count": {"sents"},
+    "subordination": {"pos", "morph", "lemma", "sents"},
+    "syllable_count": {"pos"},
+    "syllable_word_ratio": {"pos"},
+    "syntactic_similarity": {"pos", "dep", "sents"},
+    "szigriszt_pazos": {"pos", "sents"},
+    "verb_noun_ratio": {"pos"},
+    "word_count": {"pos"},
+    "word_variation_index": {"pos", "lemma"},
+    "words_before_root": {"pos", "dep", "sents"},
+    "yule_k": {"pos", "lemma"},
+}
+
+
+class PipelinePlan(object):
+    """Components of a pipeline needed to compute a set of features.
+
+    :param features: Planned features
+    :type features: List of str
+    :param annotations: Annotations needed by the features
+    :type annotations: Set of str
+    :param enable: Components to run
+    :type enable: List of str
+    :param disable: Components that can be disabled
+    :type disable: List of str
+    """
+
+    def __init__(
+        self,
+        features: List[str],
+        annotations: Set[str],
+        enable: List[str],
+        disable: List[str],
+    ):
+        """Initialize plan."""
+        self.features = features
+        self.annotations = annotations
+        self.enable = enable
+        self.disable = disable
+
+    def select_pipes(self, nlp: Language):
+        """Disable the unneeded components of a pipeline.
+
+        :param nlp: The planned pipeline
+        :type nlp: spacy.language.Language
+        :return: Context manager restoring the components, see
+            ``Language.select_pipes``
+        """
+        return nlp.select_pipes(disable=self.disable)
+
+    def __repr__(self) -> str:
+        """Return representation of the plan."""
+        return "PipelinePlan(enable={}, disable={})".format(
+            self.enable, self.disable
+        )
+
+
+def required_annotations(features: Iterable[str]) -> Set[str]:
+    """Return the annotations needed by a set of features.
+
+    :param features: Names of the features (see ``FEATURE_ANNOTATIONS``)
+    :type features: Iterable of str
+    :raises KeyError: If the requirements of a feature are unknown
+    :return: Needed annotations
+    :rtype: Set of str
+    """
+    unknown = [name for name in features if name not in FEATURE_ANNOTATIONS]
+    if unknown:
+        raise KeyError("Unknown requirements of features: {}".format(unknown))
+    annotations: Set[str] = set()
+    for name in features:
+        annotations |= FEATURE_ANNOTATIONS[name]
+    return annotations
+
+
+def _providers(assigns: Dict[str, Set[str]], attrs: Set[str]) -> List[str]:
+    # Components providing attributes, those doing the least work first
+    names = [name for name in assigns if assigns[name] & attrs]
+    return sorted(names, key=lambda name: len(assigns[name]))
+
+
+def plan_pipeline(nlp: Language, features: Iterable[str]) -> PipelinePlan:
+    """Plan the components of a pipeline needed by a set of features.
+
+    :param nlp: Pipeline (its enabled components are considered)
+    :type nlp: spacy.language.Language
+    :param features: Names of the features (see ``FEATURE_ANNOTATIONS``)
+    :type features: Iterable of str
+    :raises KeyError: If the requirements of a feature are unknown
+    :raises ValueError: If the pipeline cannot produce an annotation
+    :return: The plan
+    :rtype: PipelinePlan
+    """
+    features = list(features)
+    annotations = required_annotations(features)
+    assigns = {
+        name: set(nlp.get_pipe_meta(name).assigns) for name in nlp.pipe_names
+    }
+
+    missing = []
+    if VECTORS in annotations and not nlp.vocab.vectors.shape[0]:
+        missing.append(VECTORS)
+    enable = {name for name in assigns if not assigns[name]}
+    for annotation, attrs in ANNOTATIONS.items():
+        if annotation not in annotations:
+            continue
+        providers = _providers(assigns, attrs)
+        if not providers:
+            missing.append(annotation)
+        elif not enable.intersection(providers):
+            enable.add(providers[0])
+    if missing:
+        raise ValueError(
+            "Pipeline {} cannot provide annotations: {}".format(
+                nlp.pipe_names, missing
+            )
+        )
+
+    # Add the components required by the enabled ones
+    pending = list(enable)
+    while pending:
+        name = pending.pop()
+        for attr in nlp.get_pipe_meta(name).requires:
+            providers = _providers(assigns, {attr})
+            if providers and not enable.intersection(providers):
+                enable.add(providers[0])
+                pending.append(providers[0])
+    for name in nlp.pipe_names:
+        listeners = getattr(nlp.get_pipe(name), "listening_components", [])
+        if enable.intersection(listeners):
+            enable.add(name)
+
+    return PipelinePlan(
+        features,
+        annotations,
+        [name for name in nlp.pipe_names if name in enable],
+        [name for name in nlp.pipe_names if name not in enable],
+    )
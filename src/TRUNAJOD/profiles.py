@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""Sentence profiles module.
+
+Lexicon based measurements (such as :mod:`TRUNAJOD.emotions` or
+:mod:`TRUNAJOD.lexico_semantic_norms`) are usually averaged over the whole
+text. To analyze how they evolve along a text (e.g. the emotional arc of a
+narrative), :class:`TRUNAJOD.profiles.SentenceProfile` keeps them for each
+sentence as a ``sentences x dimensions`` matrix, and provides sliding window
+profiles and reductions over sentences:
+
+.. code-block:: python
+
+    from TRUNAJOD.emotions import Emotions
+
+    profile = Emotions(doc, sentence_profile=True).get_sentence_profile()
+    profile.matrix  # float32 matrix, one row per sentence
+    profile.window(5).matrix  # Average over windows of 5 sentences
+    profile.trend()  # Slope of each emotion along the text
+
+Profiles are built by :func:`TRUNAJOD.profiles.lexicon_profile`, which looks
+up each distinct word of the text once, and then gathers the values of all
+the tokens at once.
+"""
+import warnings
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+from spacy.tokens import Doc
+
+
+class SentenceProfile(object):
+    """Per-sentence averages of lexicon values.
+
+    The average of a sentence is computed over the words of the sentence
+    found in the lexicon, so it is NaN if there are none. Reductions over
+    sentences ignore those sentences.
+
+    :param sums: Sum of the values of each sentence, for each dimension
+    :type sums: numpy.ndarray
+    :param counts: Number of words found in the lexicon in each sentence
+    :type counts: numpy.ndarray
+    :param columns: Name of each dimension
+    :type columns: List of str
+    """
+
+    def __init__(
+        self, sums: np.ndarray, counts: np.ndarray, columns: Sequence[str]
+    ):
+        """Initialize profile from per-sentence sums and counts."""
+        self.sums = np.asarray(sums, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.columns = list(columns)
+
+    def __len__(self) -> int:
+        """Return number of sentences (or windows) of the profile."""
+        return len(self.counts)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Average of each dimension for each sentence.
+
+        :return: ``sentences x dimensions`` matrix, NaN rows for sentences
+            without words in the lexicon
+        :rtype: numpy.ndarray of float32
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self.sums / self.counts[:, None]).astype(np.float32)
+
+    def mean(self) -> np.ndarray:
+        """Average of each dimension over all the words of the text.
+
+        :return: Average of each dimension
+        :rtype: numpy.ndarray
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums.sum(axis=0) / self.counts.sum()
+
+    def window(self, size: int) -> "SentenceProfile":
+        """Profile over sliding windows of consecutive sentences.
+
+        Each window averages the words of ``size`` consecutive sentences.
+        If the text has fewer sentences, a single window is returned.
+
+        :param size: Number of sentences per window
+        :type size: int
+        :raises ValueError: If size is not positive
+        :return: Profile with one row per window
+        :rtype: SentenceProfile
+        """
+        if size < 1:
+            raise ValueError("Window size should be positive")
+        size = max(min(size, len(self)), 1)
+        zero = np.zeros((1, len(self.columns)))
+        sums = np.concatenate((zero, np.cumsum(self.sums, axis=0)))
+        counts = np.concatenate(([0], np.cumsum(self.counts)))
+        return SentenceProfile(
+            sums[size:] - sums[:-size],
+            counts[size:] - counts[:-size],
+            self.columns,
+        )
+
+    def max(self) -> np.ndarray:
+        """Maximum sentence average of each dimension.
+
+        :return: Maximum of each dimension
+        :rtype: numpy.ndarray
+        """
+        return self.__reduce(np.nanmax)
+
+    def variance(self) -> np.ndarray:
+        """Variance of the sentence averages of each dimension.
+
+        :return: Variance of each dimension
+        :rtype: numpy.ndarray
+        """
+        return self.__reduce(np.nanvar)
+
+    def trend(self) -> np.ndarray:
+        """Least squares slope of each dimension along the sentences.
+
+        The slope is the change of the sentence average per sentence, a
+        positive value meaning that the dimension grows along the text.
+
+        :return: Slope of each dimension, NaN if fewer than two sentences
+            have words in the lexicon
+        :rtype: numpy.ndarray
+        """
+        matrix = self.matrix.astype(np.float64)
+        found = ~np.isnan(matrix)
+        positions = np.where(found, np.arange(len(self))[:, None], 0.0)
+        values = np.where(found, matrix, 0.0)
+        n = found.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_position = positions.sum(axis=0) / n
+            mean_value = values.sum(axis=0) / n
+            centered = np.where(found, positions - mean_position, 0.0)
+            slope = (centered * (values - mean_value)).sum(axis=0) / (
+                centered ** 2
+            ).sum(axis=0)
+        return np.where(n >= 2, slope, np.nan)
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        """Return sentence averages of each dimension.
+
+        :return: Sentence averages, keyed by dimension
+        :rtype: dict
+        """
+        return {
+            column: values.tolist()
+            for column, values in zip(self.columns, self.matrix.T)
+        }
+
+    def __reduce(self, reduction: Callable) -> np.ndarray:
+        with warnings.catch_warnings():
+            # All NaN dimensions are expected, and reduced to NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return reduction(self.matrix.astype(np.float64), axis=0)
+
+
+def lexicon_profile(
+    doc: Doc,
+    columns: Sequence[str],
+    lookup: Callable[[str], Optional[Sequence[float]]],
+) -> SentenceProfile:
+    """Build a sentence profile of a text from a lexicon.
+
+    Tokens are integer coded by their lowercased text, so ``lookup`` is
+    called once per distinct word. Then the values of all the tokens are
+    gathered and added by sentence at once.
+
+    :param doc: Processed text, with sentence boundaries
+    :type doc: Spacy Doc
+    :param columns: Name of each dimension
+    :type columns: List of str
+    :param lookup: Function returning the values of a word for each
+        dimension, or None if the word is not in the lexicon
+    :type lookup: Callable
+    :return: Sentence profile
+    :rtype: SentenceProfile
+    """
+    word_codes: Dict[str, int] = {}
+    # Code 0 is for words that are not in the lexicon
+    table = [[0.0] * len(columns)]
+    codes = []
+    sentence_lengths = []
+    for sent in doc.sents:
+        sentence_lengths.append(len(sent))
+        for token in sent:
+            word = token.text.lower()
+            code = word_codes.get(word)
+            if code is None:
+                values = lookup(word)
+                if values is None:
+                    code = 0
+                else:
+                    code = len(table)
+                    table.append(values)
+                word_codes[word] = code
+            codes.append(code)
+
+    codes = np.array(codes, dtype=np.int64)
+    n_sentences = len(sentence_lengths)
+    sentences = np.repeat(np.arange(n_sentences), sentence_lengths)
+    sums = np.zeros((n_sentences, len(columns)))
+    np.add.at(sums, sentences, np.array(table, dtype=np.float64)[codes])
+    counts = np.bincount(sentences[codes > 0], minlength=n_sentences)
+    return SentenceProfile(sums, counts, columns)
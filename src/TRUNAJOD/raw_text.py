@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""Raw text module.
+
+Some surface metrics (character, syllable and word counts, and the discourse
+markers of :mod:`TRUNAJOD.discourse_markers`) do not need tagging nor
+parsing. :class:`TRUNAJOD.raw_text.RawText` computes them from the raw
+string, with a rule based Spanish tokenizer and sentence splitter, which is
+orders of magnitude faster than running a spaCy pipeline. This is useful to
+triage large collections of texts before parsing them:
+
+.. code-block:: python
+
+    from TRUNAJOD.raw_text import raw_text_features
+
+    features = raw_text_features(post, ["word_count", "syllable_word_ratio"])
+
+Words are runs of letters and digits (including inner hyphens and
+apostrophes, and decimal numbers), and everything else is punctuation. As
+there are no PoS tags, results may differ slightly from the ones computed
+on a spaCy Doc (e.g. for symbols, which are not words for spaCy but do count
+as characters).
+"""
+import re
+from collections import Counter
+from collections import namedtuple
+from functools import lru_cache
+from math import nan
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from TRUNAJOD import discourse_markers
+from TRUNAJOD.syllabizer import Syllabizer
+
+# A sentence ends with terminal punctuation (and closing quotes or brackets)
+# followed by whitespace, or at the end of a line.
+SENTENCE_REGEX = re.compile(
+    r"\S(?:.*?[.!?…]+[\"'»”’)\]]*(?=\s|$)|.*)", re.MULTILINE
+)
+
+# Decimal numbers, or letters and digits with inner hyphens and apostrophes
+WORD_REGEX = re.compile(r"\d+(?:[.,]\d+)+|[^\W_]+(?:[-'’][^\W_]+)*")
+
+# Sentences as expected by TRUNAJOD.discourse_markers (like spaCy 2 spans)
+RawSentence = namedtuple("RawSentence", ["text", "string"])
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a text into sentences.
+
+    Sentences end with ``.``, ``!``, ``?`` or ``…`` followed by whitespace,
+    or with a line break.
+
+    :param text: Text to be split
+    :type text: str
+    :return: Sentences, without surrounding whitespace
+    :rtype: List of str
+    """
+    return [match.group().strip() for match in SENTENCE_REGEX.finditer(text)]
+
+
+def tokenize(text: str) -> List[str]:
+    """Return the words of a text, ignoring punctuation.
+
+    :param text: Text to be tokenized
+    :type text: str
+    :return: Words, in text order
+    :rtype: List of str
+    """
+    return WORD_REGEX.findall(text)
+
+
+@lru_cache(maxsize=65536)
+def syllables(word: str) -> int:
+    """Return number of syllables of a word, cached.
+
+    :param word: Lowercased word
+    :type word: str
+    :return: Number of syllables
+    :rtype: int
+    """
+    return Syllabizer.number_of_syllables(word)
+
+
+class RawText(object):
+    """Surface measurements of an unprocessed text.
+
+    Words are counted once per distinct word, so syllables are counted once
+    per distinct word too. ``RawText`` objects have ``sents`` (sentences
+    with a ``string`` attribute), so the functions of
+    :mod:`TRUNAJOD.discourse_markers` accept them.
+
+    :param text: Text to be analyzed
+    :type text: str
+    """
+
+    def __init__(self, text: str):
+        """Initialize text, splitting sentences and counting words."""
+        self.text = text
+        self.sentences = split_sentences(text)
+        self.word_counts = Counter(tokenize(text.lower()))
+
+    @property
+    def sents(self) -> List[RawSentence]:
+        """Sentences of the text.
+
+        :return: Sentences
+        :rtype: List of RawSentence
+        """
+        return [RawSentence(sent, sent) for sent in self.sentences]
+
+    def word_count(self) -> int:
+        """Return number of words.
+
+        :return: Word count
+        :rtype: int
+        """
+        return sum(self.word_counts.values())
+
+    def sentence_count(self) -> int:
+        """Return number of sentences.
+
+        :return: Number of sentences
+        :rtype: int
+        """
+        return len(self.sentences)
+
+    def char_count(self) -> int:
+        """Return number of characters of the words.
+
+        :return: Char count
+        :rtype: int
+        """
+        return sum(len(word) * n for word, n in self.word_counts.items())
+
+    def syllable_count(self) -> int:
+        """Return number of syllables of the words.
+
+        :return: Number of syllables
+        :rtype: int
+        """
+        return sum(syllables(word) * n for word, n in self.word_counts.items())
+
+    def average_sentence_length(self) -> float:
+        """Return average number of words per sentence.
+
+        :return: Average sentence length
+        :rtype: float
+        """
+        return self.word_count() / self.sentence_count()
+
+    def average_word_length(self) -> float:
+        """Return average number of characters per word.
+
+        :return: Average word length
+        :rtype: float
+        """
+        return self.char_count() / self.word_count()
+
+    def syllable_word_ratio(self) -> float:
+        """Return average number of syllables per word.
+
+        :return: Syllable word ratio
+        :rtype: float
+        """
+        return self.syllable_count() / self.word_count()
+
+
+RawFeatureFunction = Callable[[RawText], float]
+
+RAW_FEATURES: Dict[str, RawFeatureFunction] = {
+    "average_sentence_length": RawText.average_sentence_length,
+    "average_word_length": RawText.average_word_length,
+    "cause_dm_count": discourse_markers.get_cause_dm_count,
+    "char_count": RawText.char_count,
+    "closed_class_vague_meaning_count": (
+        discourse_markers.get_closed_class_vague_meaning_count
+    ),
+    "context_dm_count": discourse_markers.get_context_dm_count,
+    "equality_dm_count": discourse_markers.get_equality_dm_count,
+    "polysemic_dm_count": discourse_markers.get_polysemic_dm_count,
+    "revision_dm_count": discourse_markers.get_revision_dm_count,
+    "sentence_count": RawText.sentence_count,
+    "syllable_count": RawText.syllable_count,
+    "syllable_word_ratio": RawText.syllable_word_ratio,
+    "word_count": RawText.word_count,
+}
+
+
+def raw_text_features(
+    text: str, features: Optional[Iterable[str]] = None
+) -> Dict[str, float]:
+    """Compute features of an unprocessed text.
+
+    Features that are not defined for the text (e.g. averages of an empty
+    text) are NaN, as in :func:`TRUNAJOD.features.extract_features`.
+
+    :param text: Text to be analyzed
+    :type text: str
+    :param features: Names of the features (see ``RAW_FEATURES``), defaults
+        to None (all of them)
+    :type features: Iterable of str, optional
+    :raises KeyError: If a feature is not available for raw texts
+    :return: Value of each feature
+    :rtype: dict
+    """
+    names = list(RAW_FEATURES) if features is None else list(features)
+    unknown = [name for name in names if name not in RAW_FEATURES]
+    if unknown:
+        raise KeyError("Unknown raw text features: {}".format(unknown))
+
+    raw = RawText(text)
+    values = {}
+    for name in names:
+        try:
+            values[name] = float(RAW_FEATURES[name](raw))
+        except ZeroDivisionError:
+            values[name] = nan
+    return values
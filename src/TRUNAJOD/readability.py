@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+"""Spanish readability formulas.
+
+This module implements the classic readability indices for Spanish texts:
+
+* Fernández-Huerta reading ease :cite:`fernandez1959medidas`.
+* Szigriszt-Pazos perspicuity :cite:`szigriszt1993sistemas`, interpreted
+  with the INFLESZ scale :cite:`barrio2008legibilidad`.
+* Gutiérrez de Polini comprehensibility :cite:`gutierrez1972investigacion`.
+* Crawford's grade level :cite:`crawford1984calculo`.
+* Muñoz Baquedano's µ legibility :cite:`munoz2006legibilidad`.
+
+All of them are computed from the same counts (words, syllables, letters
+and sentences). :func:`TRUNAJOD.readability.readability_counts` gets them
+in a single pass over the text, per sentence, so all the indices of a text
+(or of each of its sentences) are obtained at once:
+
+.. code-block:: python
+
+    from TRUNAJOD.readability import readability
+    from TRUNAJOD.readability import sentence_readability
+
+    readability(doc)  # {"fernandez_huerta": 71.2, ...}
+    sentence_readability(doc)["crawford"]  # One value per sentence
+"""
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+import numpy as np
+from spacy.tokens import Doc
+from TRUNAJOD.instrumentation import instrument
+from TRUNAJOD.raw_text import syllables
+from TRUNAJOD.utils import is_word
+
+# INFLESZ scale: lower bound of Szigriszt-Pazos perspicuity of each level
+INFLESZ_LEVELS = (
+    (80, "muy fácil"),
+    (65, "bastante fácil"),
+    (55, "normal"),
+    (40, "algo difícil"),
+    (float("-inf"), "muy difícil"),
+)
+
+
+class ReadabilityCounts(object):
+    """Counts of each sentence of a text needed by readability formulas.
+
+    :param words: Number of words of each sentence
+    :type words: numpy.ndarray
+    :param syllables: Number of syllables of each sentence
+    :type syllables: numpy.ndarray
+    :param letters: Number of letters of each sentence
+    :type letters: numpy.ndarray
+    :param squared_letters: Sum of the squared number of letters of the
+        words of each sentence
+    :type squared_letters: numpy.ndarray
+    """
+
+    def __init__(
+        self,
+        words: np.ndarray,
+        syllables: np.ndarray,
+        letters: np.ndarray,
+        squared_letters: np.ndarray,
+    ):
+        """Initialize counts."""
+        self.words = np.asarray(words, dtype=np.int64)
+        self.syllables = np.asarray(syllables, dtype=np.int64)
+        self.letters = np.asarray(letters, dtype=np.int64)
+        self.squared_letters = np.asarray(squared_letters, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Return number of sentences."""
+        return len(self.words)
+
+    def totals(self) -> Dict[str, int]:
+        """Return counts of the whole text.
+
+        :return: Number of words, syllables, letters and sentences, and sum
+            of squared letters
+        :rtype: dict
+        """
+        return {
+            "words": int(self.words.sum()),
+            "syllables": int(self.syllables.sum()),
+            "letters": int(self.letters.sum()),
+            "squared_letters": int(self.squared_letters.sum()),
+            "sentences": len(self),
+        }
+
+    def sentence_indices(self) -> Dict[str, np.ndarray]:
+        """Return the readability indices of each sentence.
+
+        Indices that are not defined for a sentence (e.g. without words, or
+        with a single word for µ legibility) are NaN.
+
+        :return: Readability indices of each sentence, keyed by the name of
+            their function
+        :rtype: dict of numpy.ndarray
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            indices = readability_indices(
+                {
+                    "words": self.words.astype(np.float64),
+                    "syllables": self.syllables,
+                    "letters": self.letters,
+                    "squared_letters": self.squared_letters,
+                    "sentences": np.ones(len(self)),
+                }
+            )
+        return {
+            name: np.where(np.isfinite(values), values, np.nan)
+            for name, values in indices.items()
+        }
+
+
+def readability_counts(doc: Doc) -> ReadabilityCounts:
+    """Count words, syllables and letters of each sentence in a single pass.
+
+    Punctuation, symbols and spaces are not words
+    (see :func:`TRUNAJOD.utils.is_word`).
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Counts of each sentence
+    :rtype: ReadabilityCounts
+    """
+    counts = []
+    for sent in doc.sents:
+        n_words = n_syllables = n_letters = n_squared = 0
+        for token in sent:
+            if is_word(token):
+                word = token.lower_
+                n_words += 1
+                n_syllables += syllables(word)
+                n_letters += len(word)
+                n_squared += len(word) ** 2
+        counts.append((n_words, n_syllables, n_letters, n_squared))
+    columns = np.array(counts, dtype=np.int64).reshape(-1, 4).T
+    return ReadabilityCounts(*columns)
+
+
+def _fernandez_huerta(words, syllables, sentences):
+    return 206.84 - 60 * syllables / words - 102 * sentences / words
+
+
+def _szigriszt_pazos(words, syllables, sentences):
+    return 206.835 - 62.3 * syllables / words - words / sentences
+
+
+def _gutierrez_de_polini(words, letters, sentences):
+    return 95.2 - 9.7 * letters / words - 0.35 * words / sentences
+
+
+def _crawford(words, syllables, sentences):
+    return -20.5 * sentences / words + 4.9 * syllables / words - 3.407
+
+
+def _mu_legibility(words, letters, squared_letters):
+    # n / (n - 1) * mean / variance * 100, with the variance computed as
+    # (n * sum(x^2) - sum(x)^2) / n^2 to be exact on integer counts
+    return (
+        100
+        * letters
+        * words
+        * words
+        / ((words - 1) * (words * squared_letters - letters * letters))
+    )
+
+
+def readability_indices(
+    totals: Dict[str, float], names: Optional[Iterable[str]] = None
+) -> Dict[str, float]:
+    """Compute the readability indices from counts.
+
+    Counts may be numbers or arrays (e.g. of the sentences of a text).
+
+    :param totals: Number of words, syllables, letters and sentences, and
+        sum of squared letters (see
+        :meth:`TRUNAJOD.readability.ReadabilityCounts.totals`)
+    :type totals: dict
+    :param names: Indices to compute, defaults to None (all)
+    :type names: Iterable of str, optional
+    :raises KeyError: If an index does not exist
+    :return: Readability indices, keyed by the name of their function
+    :rtype: dict
+    """
+    words = totals["words"]
+    syllables = totals["syllables"]
+    letters = totals["letters"]
+    sentences = totals["sentences"]
+    formulas = {
+        "fernandez_huerta": lambda: _fernandez_huerta(
+            words, syllables, sentences
+        ),
+        "szigriszt_pazos": lambda: _szigriszt_pazos(
+            words, syllables, sentences
+        ),
+        "gutierrez_de_polini": lambda: _gutierrez_de_polini(
+            words, letters, sentences
+        ),
+        "crawford": lambda: _crawford(words, syllables, sentences),
+        "mu_legibility": lambda: _mu_legibility(
+            words, letters, totals["squared_letters"]
+        ),
+    }
+    names = list(formulas if names is None else names)
+    return {name: formulas[name]() for name in names}
+
+
+@instrument
+def fernandez_huerta(doc: Doc) -> float:
+    r"""Compute Fernández-Huerta reading ease.
+
+    It is Flesch reading ease adapted to Spanish
+    :cite:`fernandez1959medidas`:
+
+    .. math::
+
+        L = 206.84 - 0.60 P - 1.02 F
+
+    where :math:`P` is the number of syllables per 100 words, and :math:`F`
+    the number of sentences per 100 words. Higher values are easier texts.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Fernández-Huerta reading ease
+    :rtype: float
+    """
+    totals = readability_counts(doc).totals()
+    return _fernandez_huerta(
+        totals["words"], totals["syllables"], totals["sentences"]
+    )
+
+
+@instrument
+def szigriszt_pazos(doc: Doc) -> float:
+    r"""Compute Szigriszt-Pazos perspicuity.
+
+    The perspicuity index :cite:`szigriszt1993sistemas` is:
+
+    .. math::
+
+        P = 206.835 - 62.3 \frac{syllables}{words} - \frac{words}{sentences}
+
+    See :func:`TRUNAJOD.readability.inflesz_level` to interpret it.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Szigriszt-Pazos perspicuity
+    :rtype: float
+    """
+    totals = readability_counts(doc).totals()
+    return _szigriszt_pazos(
+        totals["words"], totals["syllables"], totals["sentences"]
+    )
+
+
+def inflesz_level(perspicuity: float) -> str:
+    """Return the INFLESZ level of a Szigriszt-Pazos perspicuity.
+
+    The INFLESZ scale :cite:`barrio2008legibilidad` has five levels, from
+    ``muy difícil`` (below 40) to ``muy fácil`` (above 80).
+
+    :param perspicuity: Szigriszt-Pazos perspicuity
+    :type perspicuity: float
+    :return: INFLESZ level
+    :rtype: str
+    """
+    for lower_bound, level in INFLESZ_LEVELS:
+        if perspicuity >= lower_bound:
+            return level
+    return INFLESZ_LEVELS[-1][1]
+
+
+@instrument
+def gutierrez_de_polini(doc: Doc) -> float:
+    r"""Compute Gutiérrez de Polini comprehensibility.
+
+    It is based on letters instead of syllables
+    :cite:`gutierrez1972investigacion`:
+
+    .. math::
+
+        CP = 95.2 - 9.7 \frac{letters}{words} - 0.35 \frac{words}{sentences}
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Gutiérrez de Polini comprehensibility
+    :rtype: float
+    """
+    totals = readability_counts(doc).totals()
+    return _gutierrez_de_polini(
+        totals["words"], totals["letters"], totals["sentences"]
+    )
+
+
+@instrument
+def crawford(doc: Doc) -> float:
+    r"""Compute Crawford's grade level.
+
+    It estimates the years of schooling needed to understand a text
+    :cite:`crawford1984calculo`:
+
+    .. math::
+
+        A = -0.205 OP + 0.049 SP - 3.407
+
+    where :math:`OP` is the number of sentences per 100 words, and
+    :math:`SP` the number of syllables per 100 words.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Crawford's grade level
+    :rtype: float
+    """
+    totals = readability_counts(doc).totals()
+    return _crawford(totals["words"], totals["syllables"], totals["sentences"])
+
+
+@instrument
+def mu_legibility(doc: Doc) -> float:
+    r"""Compute µ legibility.
+
+    It is based on the mean :math:`\bar{x}` and variance :math:`\sigma^2`
+    of the number of letters per word :cite:`munoz2006legibilidad`, for a
+    text of :math:`n` words:
+
+    .. math::
+
+        \mu = \frac{n}{n - 1} \frac{\bar{x}}{\sigma^2} 100
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: µ legibility
+    :rtype: float
+    """
+    totals = readability_counts(doc).totals()
+    return _mu_legibility(
+        totals["words"], totals["letters"], totals["squared_letters"]
+    )
+
+
+@instrument
+def readability(doc: Doc) -> Dict[str, float]:
+    """Compute all the readability indices of a text in a single pass.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Readability indices, keyed by the name of their function
+    :rtype: dict
+    """
+    return readability_indices(readability_counts(doc).totals())
+
+
+def sentence_readability(doc: Doc) -> Dict[str, np.ndarray]:
+    """Compute the readability indices of each sentence of a text.
+
+    Indices that are not defined for a sentence (e.g. without words, or
+    with a single word for µ legibility) are NaN.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Readability indices of each sentence, keyed by the name of
+        their function
+    :rtype: dict of numpy.ndarray
+    """
+    return readability_counts(doc).sentence_indices()
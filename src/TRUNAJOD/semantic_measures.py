@@ -6,8 +6,10 @@ synonym overlap measurement requires knowledge from a word onthology, and
 semantic measurements require word vectors (word embeddings) obtained from
 CORPUS semantics.
 """
+from TRUNAJOD.instrumentation import instrument
 
 
+@instrument
 def avg_w2v_semantic_similarity(docs, N):
     """Compute average semantic similarity between adjacent sentences.
 
@@ -61,6 +63,7 @@ def get_synsets(lemma, synset_dict):
     return synset_dict.get(lemma, {lemma})
 
 
+@instrument
 def overlap(lemma_list_group, synset_dict):
     """Compute average overlap in a text.
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""Sentence feature matrix module.
+
+TRUNAJOD metrics reduce a text to a single value. Models working at the
+sentence level (e.g. to highlight difficult sentences) need one row of
+features per sentence instead, and calling each metric on each sentence
+``Span`` means thousands of small calls per document.
+:func:`TRUNAJOD.sentence_matrix.sentence_feature_matrix` returns a dense
+``float32`` matrix with one row per sentence and one column per feature:
+
+.. code-block:: python
+
+    from TRUNAJOD.sentence_matrix import sentence_feature_matrix
+
+    matrix, columns = sentence_feature_matrix(
+        doc, ["average_word_length", "lexical_density", "crawford"]
+    )
+    matrix.shape  # (number of sentences, 3)
+
+The counts behind most metrics (words, characters, syllables, PoS tags,
+lexicon matches, dependency depths, etc.) are gathered for all sentences at
+once by :class:`TRUNAJOD.sentence_matrix.SentenceCounts`, and features in
+``SENTENCE_FEATURES`` are computed from them as vectorized operations.
+Other features (such as lexical diversity indices, or features added with
+:func:`TRUNAJOD.features.register_feature`) are computed on each sentence
+``Span``. Either way, values are the ones the metric would return for the
+sentence on its own, and NaN where they are not defined.
+"""
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from spacy.attrs import HEAD
+from spacy.attrs import LOWER
+from spacy.attrs import POS
+from spacy.parts_of_speech import ADJ
+from spacy.parts_of_speech import ADV
+from spacy.parts_of_speech import AUX
+from spacy.parts_of_speech import NOUN
+from spacy.parts_of_speech import PRON
+from spacy.parts_of_speech import PROPN
+from spacy.parts_of_speech import PUNCT
+from spacy.parts_of_speech import SPACE
+from spacy.parts_of_speech import SYM
+from spacy.parts_of_speech import VERB
+from spacy.tokens import Doc
+from TRUNAJOD.features import FEATURES
+from TRUNAJOD.features import resolve_features
+from TRUNAJOD.graph import COUNT_FEATURES
+from TRUNAJOD.morphology import doc_flags
+from TRUNAJOD.morphology import MorphFlag
+from TRUNAJOD.raw_text import syllables
+from TRUNAJOD.readability import ReadabilityCounts
+from TRUNAJOD.surface_proxies import CONNECTION_LEXICON
+from TRUNAJOD.surface_proxies import dependency_depths
+from TRUNAJOD.surface_proxies import NEGATION_LEXICON
+
+# PoS tags as in TRUNAJOD.utils and TRUNAJOD.surface_proxies
+NON_WORD_POS = [PUNCT, SYM, SPACE]
+LEXICAL_POS = [VERB, AUX, ADJ, NOUN, PROPN, ADV]
+VERB_POS = [VERB, AUX]
+NOUN_POS = [NOUN, PROPN]
+
+
+class SentenceCounts(object):
+    """Counts of each sentence of a text, gathered in a single traversal.
+
+    Token attributes are read once for the whole text, strings are decoded
+    once per distinct lowercased word, and token counts are summed per
+    sentence. Each count is an array with one value per sentence.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    """
+
+    def __init__(self, doc: Doc):
+        """Initialize counts, traversing the text."""
+        sents = list(doc.sents)
+        self.n_sentences = len(sents)
+        self.sentence_ids = np.repeat(
+            np.arange(self.n_sentences), [len(sent) for sent in sents]
+        )
+
+        attrs = doc.to_array([POS, LOWER, HEAD]).reshape(-1, 3)
+        pos = attrs[:, 0]
+        words = ~np.isin(pos, NON_WORD_POS)
+        nouns = np.isin(pos, NOUN_POS)
+
+        # Length and syllables of each distinct word
+        keys, inverse = np.unique(attrs[:, 1], return_inverse=True)
+        strings = [doc.vocab.strings[key] for key in keys.tolist()]
+        lengths = np.array([len(word) for word in strings], dtype=np.int64)
+        n_syllables = np.array(
+            [syllables(word) for word in strings], dtype=np.int64
+        )
+        inverse = inverse.reshape(-1)
+        lengths = lengths[inverse]
+        n_syllables = n_syllables[inverse]
+
+        flags = doc_flags(doc)
+        third_person_pronouns = (pos == PRON) & (
+            (flags & MorphFlag.THIRD_PERSON) != 0
+        )
+        persons = MorphFlag.FIRST_PERSON | MorphFlag.SECOND_PERSON
+
+        depths = dependency_depths(doc)
+        # Heads are relative to the token
+        distances = np.abs(attrs[:, 2].astype(np.int64))
+
+        self.words = self._sum(words)
+        self.chars = self._sum(lengths * ~np.isin(pos, [PUNCT, SPACE]))
+        self.syllables = self._sum(n_syllables * (pos != PUNCT))
+        self.lexical_words = self._sum(words & np.isin(pos, LEXICAL_POS))
+        self.verbs = self._sum(words & np.isin(pos, VERB_POS))
+        self.nouns = self._sum(words & nouns)
+        self.all_nouns = self._sum(nouns)
+        self.negations = self._sum(
+            words & NEGATION_LEXICON.mask(doc, attr="lemma")
+        )
+        self.connections = self._sum(
+            words & CONNECTION_LEXICON.mask(doc, attr="lemma")
+        )
+        self.first_second_person = self._sum((flags & persons) != 0)
+        self.third_person_pronouns = self._sum(third_person_pronouns)
+        self.third_person_pronoun_words = self._sum(
+            words & third_person_pronouns
+        )
+        self.depths = self._sum(depths * words)
+        self.sentences = np.ones(self.n_sentences, dtype=np.int64)
+        self.max_depths = np.zeros(self.n_sentences, dtype=np.int64)
+        np.maximum.at(self.max_depths, self.sentence_ids, depths * words)
+        self.dependent_words = self._sum(words & (distances > 0))
+        self.distances = self._sum(distances * words)
+        self.readability = ReadabilityCounts(
+            self.words,
+            self._sum(n_syllables * words),
+            self._sum(lengths * words),
+            self._sum(lengths * lengths * words),
+        ).sentence_indices()
+
+    def __len__(self) -> int:
+        """Return number of sentences."""
+        return self.n_sentences
+
+    def _sum(self, values: np.ndarray) -> np.ndarray:
+        return np.bincount(
+            self.sentence_ids,
+            weights=values.astype(np.float64),
+            minlength=self.n_sentences,
+        ).astype(np.int64)
+
+
+SentenceFeatureFunction = Callable[[SentenceCounts], np.ndarray]
+
+
+def _count_feature(
+    counts: Tuple[str, ...], formula: Callable
+) -> SentenceFeatureFunction:
+    return lambda c: formula(*[getattr(c, count) for count in counts])
+
+
+SENTENCE_FEATURES: Dict[str, SentenceFeatureFunction] = {
+    "average_dependency_distance": lambda c: c.distances / c.dependent_words,
+    "crawford": lambda c: c.readability["crawford"],
+    "fernandez_huerta": lambda c: c.readability["fernandez_huerta"],
+    "gutierrez_de_polini": lambda c: c.readability["gutierrez_de_polini"],
+    "mu_legibility": lambda c: c.readability["mu_legibility"],
+    "pronoun_density": lambda c: c.third_person_pronoun_words / c.words,
+    "pronoun_noun_ratio": lambda c: c.third_person_pronouns / c.all_nouns,
+    "szigriszt_pazos": lambda c: c.readability["szigriszt_pazos"],
+}
+# Features computed from counts share their formulas with TRUNAJOD.graph
+for _name, (_counts, _formula) in COUNT_FEATURES.items():
+    SENTENCE_FEATURES[_name] = _count_feature(_counts, _formula)
+
+# Registered functions computed by SENTENCE_FEATURES
+FEATURE_FUNCTIONS = {
+    name: FEATURES[name] for name in sorted(SENTENCE_FEATURES)
+}
+
+
+def _span_feature(name: str, sents: List) -> np.ndarray:
+    values = np.empty(len(sents), dtype=np.float64)
+    for index, sent in enumerate(sents):
+        try:
+            values[index] = float(FEATURES[name](sent))
+        except ZeroDivisionError:
+            values[index] = np.nan
+    return values
+
+
+def sentence_feature_matrix(
+    doc: Doc, names: Optional[Iterable[str]] = None
+) -> Tuple[np.ndarray, List[str]]:
+    """Compute features of each sentence of a document.
+
+    Features in ``SENTENCE_FEATURES`` are computed for all sentences at
+    once, and the rest are computed on each sentence ``Span``. Features that
+    are not defined for a sentence (those raising ``ZeroDivisionError``) are
+    NaN, as in :func:`TRUNAJOD.features.extract_features`.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :param names: Features to compute, defaults to None (all features)
+    :type names: Iterable of str, optional
+    :raises KeyError: If a feature is not registered
+    :return: Matrix of shape (sentences, features), and the name of each
+        column
+    :rtype: Tuple[numpy.ndarray of float32, List of str]
+    """
+    names = resolve_features(names)
+    counts = SentenceCounts(doc)
+    matrix = np.empty((len(counts), len(names)), dtype=np.float32)
+    sents = None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column, name in enumerate(names):
+            # Registered features may replace the built-in ones
+            if FEATURES[name] is FEATURE_FUNCTIONS.get(name):
+                values = SENTENCE_FEATURES[name](counts)
+                # Divisions by zero, where the metric raises an error
+                values = np.where(np.isfinite(values), values, np.nan)
+            else:
+                if sents is None:
+                    sents = list(doc.sents)
+                values = _span_feature(name, sents)
+            matrix[:, column] = values
+    return matrix, names
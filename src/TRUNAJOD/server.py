@@ -0,0 +1,552 @@
+#!/usr/bin/env python
+"""Feature extraction HTTP service.
+
+This module provides a small HTTP service (built on :mod:`asyncio`, without
+extra dependencies) to compute TRUNAJOD features of texts. It is meant to
+run behind a web application that needs instant feedback, where paying a
+full ``nlp()`` call per request is expensive:
+
+* The spaCy model is loaded once and kept warm.
+* Concurrent requests are coalesced into ``nlp.pipe`` micro-batches. A batch
+  is processed when it has ``max_batch_size`` texts, or when its oldest text
+  has waited ``max_latency`` seconds.
+* Batches are parsed, and features of their documents computed, in a pool
+  of worker processes (only texts and feature values cross processes), so
+  several batches are processed in parallel while the next one is being
+  collected. Each worker holds a copy of the pipeline (sent once, when the
+  worker starts), and features are looked up in the registry of the
+  workers, so features registered at runtime are only available with the
+  ``fork`` start method.
+
+The service can be started from the command line (``trunajod serve``, see
+:mod:`TRUNAJOD.cli`), or from Python:
+
+.. code-block:: python
+
+    import spacy
+    from TRUNAJOD.server import run
+
+    nlp = spacy.load("es_core_news_sm", disable=["ner", "textcat"])
+    run(nlp, host="127.0.0.1", port=8000, max_latency=0.01)
+
+The endpoints are:
+
+* ``POST /features`` with a JSON body ``{"text": "..."}`` (or
+  ``{"texts": ["...", ...]}``) and optionally ``"features": [...]`` to
+  select the features to compute. It returns ``{"features": {...}}`` (or
+  ``{"results": [{...}, ...]}``). Undefined values are returned as ``null``.
+* ``GET /features`` returns the names of the available features.
+* ``GET /stats`` returns throughput, batching and latency statistics.
+* ``GET /health`` returns ``{"status": "ok"}``.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from http import HTTPStatus
+from multiprocessing import Pool
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from spacy.language import Language
+from TRUNAJOD.features import available_features
+from TRUNAJOD.features import extract_features
+from TRUNAJOD.features import resolve_features
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class _Job(object):
+    """A text waiting to be processed."""
+
+    __slots__ = ("text", "features", "future", "enqueued")
+
+    def __init__(self, text, features, future, enqueued):
+        self.text = text
+        self.features = features
+        self.future = future
+        self.enqueued = enqueued
+
+
+class FeatureServer(object):
+    """Micro-batching feature extraction server.
+
+    :param nlp: Loaded spaCy pipeline
+    :type nlp: spacy.language.Language
+    :param features: Features computed by default, defaults to None (all
+        the features in :data:`TRUNAJOD.features.FEATURES`)
+    :type features: Iterable of str, optional
+    :param max_batch_size: Maximum number of texts per ``nlp.pipe`` batch,
+        defaults to 32
+    :type max_batch_size: int, optional
+    :param max_latency: Maximum time (in seconds) a text waits for its
+        batch to be filled, defaults to 0.01
+    :type max_latency: float, optional
+    :param workers: Number of worker processes parsing texts and computing
+        features, defaults to None (the number of CPUs)
+    :type workers: int, optional
+    :param latency_window: Number of recent requests used for latency
+        statistics, defaults to 1000
+    :type latency_window: int, optional
+    """
+
+    def __init__(
+        self,
+        nlp: Language,
+        features: Optional[Iterable[str]] = None,
+        max_batch_size: int = 32,
+        max_latency: float = 0.01,
+        workers: Optional[int] = None,
+        latency_window: int = 1000,
+    ):
+        """Initialize server, it is not listening until started."""
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size should be at least 1")
+        if max_latency < 0:
+            raise ValueError("max_latency should not be negative")
+        self.nlp = nlp
+        self.features = resolve_features(features)
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.workers = workers
+        self.__latencies = deque(maxlen=latency_window)
+        self.__counters = {
+            "requests": 0,
+            "documents": 0,
+            "batches": 0,
+            "errors": 0,
+        }
+        self.__max_batch_seen = 0
+        self.__started = None
+        self.__server = None
+        self.__queue = None
+        self.__batcher = None
+        self.__closed = None
+        self.__pool = None
+        # Jobs taken from the queue whose features are not computed yet
+        self.__in_flight = set()
+
+    @property
+    def port(self) -> Optional[int]:
+        """Port the server is listening on, None if not started.
+
+        :return: Port number
+        :rtype: int
+        """
+        if self.__server is None:
+            return None
+        return self.__server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """Start listening for connections.
+
+        :param host: Interface to bind, defaults to "127.0.0.1"
+        :type host: str, optional
+        :param port: Port to bind (0 picks a free one), defaults to 8000
+        :type port: int, optional
+        """
+        loop = asyncio.get_event_loop()
+        self.__queue = asyncio.Queue()
+        self.__closed = asyncio.Event()
+        # The pool starts its workers right away: before listening, so
+        # forked workers do not inherit the sockets of the server and its
+        # connections.
+        self.__pool = Pool(
+            self.workers, initializer=_init_worker, initargs=(self.nlp,)
+        )
+        self.__started = time.perf_counter()
+        self.__batcher = loop.create_task(self.__batch_loop())
+        self.__server = await asyncio.start_server(
+            self.__handle_connection, host, port
+        )
+
+    async def serve_forever(self) -> None:
+        """Wait until the server is closed."""
+        await self.__closed.wait()
+
+    async def close(self) -> None:
+        """Stop the server, failing texts still waiting to be processed.
+
+        Texts being batched, parsed or processed are failed too, so no
+        caller waits forever.
+        """
+        if self.__server is None:
+            return
+        self.__server.close()
+        self.__batcher.cancel()
+        try:
+            await self.__batcher
+        except asyncio.CancelledError:
+            pass
+        jobs = list(self.__in_flight)
+        self.__in_flight.clear()
+        while not self.__queue.empty():
+            jobs.append(self.__queue.get_nowait())
+        for job in jobs:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Server closed"))
+        await self.__server.wait_closed()
+        # Pending and running batches are dropped, their texts already failed
+        self.__pool.terminate()
+        self.__server = None
+        self.__closed.set()
+
+    async def extract(
+        self, text: str, features: Optional[Iterable[str]] = None
+    ) -> Dict[str, float]:
+        """Compute features of a text.
+
+        :param text: Text to be processed
+        :type text: str
+        :param features: Features to compute, defaults to None (the server
+            features)
+        :type features: Iterable of str, optional
+        :raises KeyError: If a feature is not registered
+        :return: Value of each feature
+        :rtype: dict
+        """
+        results = await self.extract_many([text], features)
+        return results[0]
+
+    async def extract_many(
+        self, texts: List[str], features: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, float]]:
+        """Compute features of several texts.
+
+        Each text is queued on its own, so it can share a batch with texts
+        of other requests.
+
+        :param texts: Texts to be processed
+        :type texts: List of str
+        :param features: Features to compute, defaults to None (the server
+            features)
+        :type features: Iterable of str, optional
+        :raises KeyError: If a feature is not registered
+        :return: Value of each feature, for each text
+        :rtype: List of dict
+        """
+        if self.__queue is None:
+            raise RuntimeError("Server is not started")
+        names = self.features if features is None else features
+        names = resolve_features(names)
+        loop = asyncio.get_event_loop()
+        jobs = [
+            _Job(text, names, loop.create_future(), loop.time())
+            for text in texts
+        ]
+        for job in jobs:
+            self.__queue.put_nowait(job)
+        return list(await asyncio.gather(*(job.future for job in jobs)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return service statistics.
+
+        Latencies (in seconds) are measured from the moment a text is queued
+        until its features are computed, over the most recent texts.
+
+        :return: Statistics of the service
+        :rtype: dict
+        """
+        uptime = (
+            time.perf_counter() - self.__started if self.__started else 0.0
+        )
+        documents = self.__counters["documents"]
+        batches = self.__counters["batches"]
+        latencies = np.array(self.__latencies, dtype=np.float64)
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+            latency = {
+                "mean": float(latencies.mean()),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "max": float(latencies.max()),
+            }
+        else:
+            latency = None
+        stats = dict(self.__counters)
+        stats.update(
+            {
+                "uptime": uptime,
+                "throughput": documents / uptime if uptime else 0.0,
+                "mean_batch_size": documents / batches if batches else 0.0,
+                "max_batch_size_seen": self.__max_batch_seen,
+                "queue_size": self.__queue.qsize() if self.__queue else 0,
+                "latency": latency,
+                "max_batch_size": self.max_batch_size,
+                "max_latency": self.max_latency,
+            }
+        )
+        return stats
+
+    async def __batch_loop(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            job = await self.__queue.get()
+            self.__in_flight.add(job)
+            batch = [job]
+            deadline = job.enqueued + self.max_latency
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    # Deadline reached: take whatever is already waiting
+                    while (
+                        len(batch) < self.max_batch_size
+                        and not self.__queue.empty()
+                    ):
+                        job = self.__queue.get_nowait()
+                        self.__in_flight.add(job)
+                        batch.append(job)
+                    break
+                try:
+                    job = await asyncio.wait_for(self.__queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                self.__in_flight.add(job)
+                batch.append(job)
+            self.__run_batch(batch)
+
+    def __run_batch(self, batch: List[_Job]) -> None:
+        loop = asyncio.get_event_loop()
+        # The batch is processed by a worker while the next batch is being
+        # collected. Callbacks run in a thread of the pool, so results are
+        # handed back to the event loop.
+        self.__pool.apply_async(
+            _process_batch,
+            ([job.text for job in batch], [job.features for job in batch]),
+            callback=lambda results: loop.call_soon_threadsafe(
+                self.__finish, batch, loop, results, None
+            ),
+            error_callback=lambda error: loop.call_soon_threadsafe(
+                self.__finish, batch, loop, None, error
+            ),
+        )
+
+    def __finish(
+        self,
+        batch: List[_Job],
+        loop: asyncio.AbstractEventLoop,
+        results: Optional[
+            List[Tuple[Optional[Dict[str, float]], Optional[Exception]]]
+        ],
+        error: Optional[BaseException],
+    ) -> None:
+        for job in batch:
+            self.__in_flight.discard(job)
+        if error is not None:
+            # The batch could not be parsed
+            self.__counters["errors"] += len(batch)
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(error)
+            return
+
+        self.__counters["batches"] += 1
+        self.__max_batch_seen = max(self.__max_batch_seen, len(batch))
+        now = loop.time()
+        for job, (features, error) in zip(batch, results):
+            self.__latencies.append(now - job.enqueued)
+            if error is not None:
+                self.__counters["errors"] += 1
+                if not job.future.done():
+                    job.future.set_exception(error)
+                continue
+            self.__counters["documents"] += 1
+            if not job.future.done():
+                job.future.set_result(features)
+
+    async def __handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = (
+                        request_line.decode("latin-1").strip().split()
+                    )
+                except ValueError:
+                    await self.__respond(
+                        writer,
+                        HTTPStatus.BAD_REQUEST,
+                        {"error": "Malformed request line"},
+                        False,
+                    )
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_SIZE:
+                    await self.__respond(
+                        writer,
+                        (
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                            if length > 0
+                            else HTTPStatus.BAD_REQUEST
+                        ),
+                        {"error": "Invalid Content-Length"},
+                        False,
+                    )
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.__counters["requests"] += 1
+                status, payload = await self.__dispatch(method, path, body)
+                await self.__respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __dispatch(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[HTTPStatus, Any]:
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        routes = {
+            "/health": ("GET",),
+            "/stats": ("GET",),
+            "/features": ("GET", "POST"),
+        }
+        if path not in routes:
+            return HTTPStatus.NOT_FOUND, {"error": "Not found"}
+        if method not in routes[path]:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Not allowed"}
+
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if path == "/stats":
+            return HTTPStatus.OK, self.stats()
+        if method == "GET":
+            return HTTPStatus.OK, {"features": available_features()}
+
+        try:
+            request = json.loads(body.decode("utf-8"))
+            features = request.get("features")
+            if "texts" in request:
+                texts = request["texts"]
+                single = False
+            else:
+                texts = [request["text"]]
+                single = True
+            if not all(isinstance(text, str) for text in texts):
+                raise TypeError("Texts should be strings")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return HTTPStatus.BAD_REQUEST, {
+                "error": 'Expected a JSON object with "text" or "texts"'
+            }
+
+        try:
+            results = await self.extract_many(texts, features)
+        except KeyError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": error.args[0]}
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+
+        results = [_json_features(result) for result in results]
+        if single:
+            return HTTPStatus.OK, {"features": results[0]}
+        return HTTPStatus.OK, {"results": results}
+
+    @staticmethod
+    async def __respond(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload: Any,
+        keep_alive: bool,
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            "HTTP/1.1 {} {}\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: {}\r\n\r\n"
+        ).format(
+            status.value,
+            status.phrase,
+            len(body),
+            "keep-alive" if keep_alive else "close",
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+# Pipeline of this process, when it is a worker of a server
+_NLP: Optional[Language] = None
+
+
+def _init_worker(nlp: Language) -> None:
+    global _NLP
+    _NLP = nlp
+
+
+def _process_batch(
+    texts: List[str], names: List[List[str]]
+) -> List[Tuple[Optional[Dict[str, float]], Optional[Exception]]]:
+    """Parse a batch of texts, and compute the features of each one."""
+    results = []
+    for doc, doc_names in zip(_NLP.pipe(texts, batch_size=len(texts)), names):
+        try:
+            results.append((extract_features(doc, doc_names), None))
+        except Exception as error:
+            results.append((None, error))
+    return results
+
+
+def _json_features(features: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """Replace undefined values (NaN, infinity) with None."""
+    return {
+        name: value if math.isfinite(value) else None
+        for name, value in features.items()
+    }
+
+
+def run(
+    nlp: Language, host: str = "127.0.0.1", port: int = 8000, **kwargs
+) -> None:
+    """Run the feature server until interrupted.
+
+    Keyword arguments are passed to :class:`FeatureServer`.
+
+    :param nlp: Loaded spaCy pipeline
+    :type nlp: spacy.language.Language
+    :param host: Interface to bind, defaults to "127.0.0.1"
+    :type host: str, optional
+    :param port: Port to bind, defaults to 8000
+    :type port: int, optional
+    """
+    server = FeatureServer(nlp, **kwargs)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(server.start(host, port))
+        print("Serving TRUNAJOD features on http://{}:{}".format(host, port))
+        loop.run_until_complete(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.close())
+        loop.close()
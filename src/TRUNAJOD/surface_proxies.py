@@ -8,10 +8,26 @@ as cohesion, coherence, complexity. Examples of these measurements include but
 are not limited to: Number of sentences, number of syllables, etc.
 """
 import re
+from collections import deque
 from copy import deepcopy
 from functools import wraps
 from math import log
-
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from spacy.attrs import LEMMA
+from spacy.strings import hash_string
+from spacy.tokens import Doc
+from TRUNAJOD.frequency import FrequencyStore
+from TRUNAJOD.frequency import sentence_frequency_indices
+from TRUNAJOD.instrumentation import instrument
+from TRUNAJOD.lexicon import Lexicon
+from TRUNAJOD.morphology import doc_flags
+from TRUNAJOD.morphology import MorphFlag
+from TRUNAJOD.morphology import VERB_FORM_FLAGS
 from TRUNAJOD.syllabizer import Syllabizer
 from TRUNAJOD.utils import is_word
 from TRUNAJOD.verb_types import GERUND_VERBS
@@ -23,6 +39,8 @@ PERIPHRASIS_INF = "VerbForm=Inf"
 PERIPHRASIS_PAR = "VerbForm=Part"
 PERIPHRASIS_SUF = "|Perif"
 
+MAX_FREQUENCY = 99999999999999
+
 NEGATION_WORDS = {
     "no",
     "ni",
@@ -36,6 +54,10 @@ NEGATION_WORDS = {
     "ninguno",
     "ninguna",
 }
+NEGATION_LEXICON = Lexicon(NEGATION_WORDS)
+
+CONNECTION_WORDS = {"y", "o", "no", "si"}
+CONNECTION_LEXICON = Lexicon(CONNECTION_WORDS)
 
 
 def _fix_doc(func):
@@ -47,6 +69,121 @@ def _fix_doc(func):
     return function_wrapper
 
 
+def _compile_tree(root):
+    """Flatten a parse subtree into POS codes and children lists.
+
+    Nodes are numbered in breadth-first order, the root being node ``0``.
+    """
+    nodes = [root]
+    pos_codes = []
+    children = []
+    for node in nodes:
+        pos_codes.append(node.pos_)
+        first_child = len(nodes)
+        nodes.extend(node.children)
+        children.append(range(first_child, len(nodes)))
+    return pos_codes, children
+
+
+def _tree_similarity(tree1, tree2, is_central_node=False):
+    """Count common nodes of two trees compiled by ``_compile_tree``."""
+    pos1, children1 = tree1
+    pos2, children2 = tree2
+    similarity = 0
+    if is_central_node:
+        if pos1[0] != pos2[0]:
+            return 0
+        similarity += 1
+
+    # Each pair of subtrees is reached through its parents only, so it is
+    # visited once. Children of node2 are bucketed by POS, so that matching
+    # every child of node1 against them is linear instead of quadratic.
+    pending = [(0, 0)]
+    while pending:
+        node1, node2 = pending.pop()
+        candidates = {}
+        for child2 in children2[node2]:
+            candidates.setdefault(pos2[child2], deque()).append(child2)
+        if not candidates:
+            continue
+        for child1 in children1[node1]:
+            matches = candidates.get(pos1[child1])
+            if matches:
+                similarity += 1
+                pending.append((child1, matches.popleft()))
+
+    return similarity
+
+
+def _head_indices(doc):
+    """Return the head of each token as an index relative to ``doc``."""
+    offset = doc[0].i if len(doc) else 0
+    return np.array([token.head.i - offset for token in doc], dtype=np.int64)
+
+
+def _word_mask(doc):
+    """Return a boolean mask of the tokens that are words."""
+    return np.array([is_word(token) for token in doc], dtype=bool)
+
+
+def _compile_periphrasis_trie(periphrasis_list):
+    """Compile periphrases into a trie of lemma hashes, from the last word.
+
+    Each node maps the hash of a lemma to the next node (the previous word
+    of the periphrases), and the key ``None`` marks a complete periphrasis.
+    """
+    trie = {}
+    for periphrasis in periphrasis_list:
+        node = trie
+        for word in reversed(periphrasis.split()):
+            node = node.setdefault(hash_string(word.lower()), {})
+        node[None] = True
+    return trie
+
+
+def _mark_periphrases(doc, tries):
+    """Append ``PERIPHRASIS_SUF`` to the tags of periphrases of a text.
+
+    A periphrasis is a sequence of lemmas followed by a verb whose form
+    (infinitive, gerund or participle) has a trie in ``tries``. The text is
+    scanned once: from each verb in those forms, the trie of its form is
+    walked backwards over the lemmas of the previous tokens. As in previous
+    versions, the verb and all the words of the periphrasis except the first
+    one are marked, once per periphrasis found.
+    """
+    lemmas = doc.to_array([LEMMA]).reshape(-1).tolist()
+    marks = [0] * len(lemmas)
+    form_tries = [
+        (VERB_FORM_FLAGS[verb_form], trie) for verb_form, trie in tries.items()
+    ]
+    for position, flags in enumerate(doc_flags(doc).tolist()):
+        for verb_form, node in form_tries:
+            if not flags & verb_form:
+                continue
+            index = position - 1
+            while node and index >= 0:
+                node = node.get(lemmas[index])
+                if node is None:
+                    break
+                if None in node:
+                    for marked in range(index + 1, position + 1):
+                        marks[marked] += 1
+                index -= 1
+
+    for index, count in enumerate(marks):
+        if count:
+            doc[index].tag_ = doc[index].tag_ + PERIPHRASIS_SUF * count
+    return doc
+
+
+# Periphrases of each verb form, compiled once
+PERIPHRASIS_TRIES = {
+    "Inf": _compile_periphrasis_trie(INFINITIVE_VERBS),
+    "Ger": _compile_periphrasis_trie(GERUND_VERBS),
+    "Part": _compile_periphrasis_trie(PAST_TENSE_VERBS),
+}
+
+
 def add_periphrasis(doc, periphrasis_type, periphrasis_list):
     """Add periphrasis to SPACY tags.
 
@@ -54,40 +191,31 @@ def add_periphrasis(doc, periphrasis_type, periphrasis_list):
     periphrasis of texts (in our case Spanish text). This function adds
     periphrasis to the text in order to improve further analysis such as
     clause segmentation, and clause count. This is used by
-    :func:`TRUNAJOD.surface_proxies.fix_parse_tree`.
+    :func:`TRUNAJOD.surface_proxies.fix_parse_tree`, which finds the
+    periphrases of the three verb forms in a single scan over the text.
+
+    Verb forms are read from the morphological analysis and the tag of the
+    tokens (see :func:`TRUNAJOD.morphology.doc_flags`).
 
     :param doc: Tokenized text
     :type doc: Spacy Doc
-    :param type: Periphrasis type
+    :param type: Periphrasis type, e.g. ``PERIPHRASIS_INF``
     :type type: string
     :param periphrasis_list: List of periphrasis
     :type periphrasis_list: List of strings
+    :raises ValueError: If the verb form of the type is not supported
     :return: Corrected doc
     :rtype: Spacy Doc
     """
-    regexp = re.compile(periphrasis_type)
-    for token in doc:
-        if token.pos_ in {"VERB", "AUX"} or regexp.search(token.tag_):
-            if regexp.search(token.tag_):
-                for periphrasis in periphrasis_list:
-                    # For multi-word periphrases
-                    periphrasis_words = periphrasis.split()
-                    pos = token.i - len(periphrasis_words)
-                    if pos >= 0:
-                        fail = False
-                        for word in periphrasis_words:
-                            if word.lower() != doc[pos].lemma_:
-                                fail = True
-                                break
-                            pos = pos + 1
-                        if not fail:
-                            pos = token.i - len(periphrasis_words) + 1
-                            for k in range(len(periphrasis_words)):
-                                doc[pos].tag_ = doc[pos].tag_ + PERIPHRASIS_SUF
-                                pos = pos + 1
-    return doc
+    verb_form = periphrasis_type.split("=")[-1]
+    if verb_form not in VERB_FORM_FLAGS:
+        raise ValueError("Unknown verb form: {}".format(periphrasis_type))
+    return _mark_periphrases(
+        doc, {verb_form: _compile_periphrasis_trie(periphrasis_list)}
+    )
 
 
+@instrument
 def average_clause_length(doc, infinitive_map):
     """Return average clause length (heuristic).
 
@@ -105,6 +233,44 @@ def average_clause_length(doc, infinitive_map):
     return word_count(doc) / clause_count(doc, infinitive_map)
 
 
+@instrument
+def average_dependency_depth(doc: Doc) -> float:
+    """Return average depth of words in the parse tree.
+
+    The ``ROOT`` of each sentence is considered level 1, see
+    :func:`TRUNAJOD.surface_proxies.dependency_depths`. Punctuation, symbols
+    and spaces are not considered.
+
+    :param doc: Text to be processed
+    :type doc: Spacy Doc
+    :return: Average dependency depth
+    :rtype: float
+    """
+    words = _word_mask(doc)
+    return float(dependency_depths(doc)[words].sum()) / int(words.sum())
+
+
+@instrument
+def average_dependency_distance(doc: Doc) -> float:
+    """Return average dependency distance.
+
+    The dependency distance of a word is the number of positions between the
+    word and its head. This is averaged over all the words that are not the
+    ``ROOT`` of a sentence. Punctuation, symbols and spaces are not
+    considered.
+
+    :param doc: Text to be processed
+    :type doc: Spacy Doc
+    :return: Average dependency distance
+    :rtype: float
+    """
+    heads = _head_indices(doc)
+    distances = np.abs(heads - np.arange(len(heads)))
+    words = _word_mask(doc) & (distances > 0)
+    return float(distances[words].sum()) / int(words.sum())
+
+
+@instrument
 def average_sentence_length(doc):
     """Return average sentence length.
 
@@ -118,6 +284,7 @@ def average_sentence_length(doc):
     return word_count(doc) / sentence_count(doc)
 
 
+@instrument
 def average_word_length(doc):
     """Return average word length.
 
@@ -131,6 +298,7 @@ def average_word_length(doc):
     return char_count(doc) / word_count(doc)
 
 
+@instrument
 def char_count(doc):
     """Return number of chars in a text.
 
@@ -151,6 +319,7 @@ def char_count(doc):
     )
 
 
+@instrument
 @_fix_doc
 def clause_count(doc, infinitive_map):
     """Return clause count (heuristic).
@@ -166,17 +335,46 @@ def clause_count(doc, infinitive_map):
     :return: Clause count
     :rtype: int
     """
-    n_clauses = 0
-    regexp = re.compile("VerbForm=Fin")
-    regexp_perif = re.compile("Perif")
-    for token in doc:
-        verb_or_aux = token.pos_ in {"VERB", "AUX"}
-        if verb_or_aux and not regexp_perif.search(token.tag_):
-            if regexp.search(token.tag_):
-                n_clauses += 1
-    return n_clauses
+    verb_or_aux = np.array(
+        [token.pos_ in {"VERB", "AUX"} for token in doc], dtype=bool
+    )
+    flags = doc_flags(doc)
+    finite = (flags & MorphFlag.FINITE) != 0
+    periphrasis = (flags & MorphFlag.PERIPHRASIS) != 0
+    return int(np.count_nonzero(verb_or_aux & finite & ~periphrasis))
+
 
+def dependency_depths(doc: Doc) -> np.ndarray:
+    """Return the depth of each token in the parse tree.
 
+    The ``ROOT`` of a sentence is considered level 1 (as in
+    :func:`TRUNAJOD.surface_proxies.get_word_depth`). Depths are computed
+    for all the tokens in a single pass over the head indices, walking up
+    each path only until a token with a known depth is reached, so the cost
+    is linear in the length of the text.
+
+    :param doc: Text to be processed
+    :type doc: Spacy Doc
+    :return: Depth of each token, in text order
+    :rtype: numpy.ndarray of int
+    """
+    heads = _head_indices(doc).tolist()
+    depths = [0] * len(heads)
+    for index in range(len(heads)):
+        path = []
+        node = index
+        while not depths[node] and heads[node] != node:
+            path.append(node)
+            node = heads[node]
+        depth = depths[node] or 1
+        depths[node] = depth
+        for node in reversed(path):
+            depth += 1
+            depths[node] = depth
+    return np.array(depths, dtype=np.int64)
+
+
+@instrument
 def first_second_person_count(doc):
     """Count first|second person tokens.
 
@@ -185,10 +383,11 @@ def first_second_person_count(doc):
     :return: First and second person count
     :rtype: int
     """
-    criteria = re.compile("Person=1|Person=2")
-    return sum([1 for token in doc if criteria.search(token.tag_)])
+    persons = MorphFlag.FIRST_PERSON | MorphFlag.SECOND_PERSON
+    return int(np.count_nonzero(doc_flags(doc) & persons))
 
 
+@instrument
 def first_second_person_density(doc):
     """Compute density of first|second person.
 
@@ -200,6 +399,7 @@ def first_second_person_density(doc):
     return first_second_person_count(doc) / word_count(doc)
 
 
+@instrument
 def fix_parse_tree(doc, infinitive_map):
     """Fix SPACY parse tree.
 
@@ -221,12 +421,10 @@ def fix_parse_tree(doc, infinitive_map):
             conjugate = infinitve(token.text, infinitive_map)
             if conjugate is not None:
                 token.lemma_ = conjugate
-    fixed_doc = add_periphrasis(fixed_doc, PERIPHRASIS_INF, INFINITIVE_VERBS)
-    fixed_doc = add_periphrasis(fixed_doc, PERIPHRASIS_GER, GERUND_VERBS)
-    fixed_doc = add_periphrasis(fixed_doc, PERIPHRASIS_PAR, PAST_TENSE_VERBS)
-    return fixed_doc
+    return _mark_periphrases(fixed_doc, PERIPHRASIS_TRIES)
 
 
+@instrument
 def frequency_index(doc, frequency_dict):
     """Return frequency index.
 
@@ -234,15 +432,29 @@ def frequency_index(doc, frequency_dict):
     word over sentences. To compute this, we use a dictionary. In the case
     of this Spanish implementation we could use RAE dictionary CREA.
 
+    For large frequency lists, a :class:`TRUNAJOD.frequency.FrequencyStore`
+    can be given instead of the dictionary. In that case the rarest word of
+    every sentence is found with vectorized lookups (see
+    :func:`TRUNAJOD.frequency.sentence_frequency_indices`).
+
     :param doc: Tokenized text.
     :type doc: Spacy Doc
+    :param frequency_dict: Frequency of each (lowercased) word
+    :type frequency_dict: dict or FrequencyStore
     :return: Frequency index
     :rtype: float
     """
+    if isinstance(frequency_dict, FrequencyStore):
+        minimums = sentence_frequency_indices(doc, frequency_dict, "min")
+        # Sentences without known words count as the initial minimum, as in
+        # the dictionary implementation below.
+        minimums[np.isnan(minimums)] = log(MAX_FREQUENCY, 10)
+        return sum(minimums.tolist()) / len(minimums)
+
     n_sents = 0
     aggregate_frec = 0
     for sent in doc.sents:
-        minimum = 99999999999999
+        minimum = MAX_FREQUENCY
         for token in sent:
             if is_word(token):
                 frec = frequency_dict.get(token.lower_, 0)
@@ -301,6 +513,7 @@ def infinitve(conjugate, infinitive_map):
     return None
 
 
+@instrument
 def lexical_density(doc):
     """Compute lexical density.
 
@@ -316,28 +529,39 @@ def lexical_density(doc):
     return pos_ratio(doc, "VERB|AUX|ADJ|NOUN|PROPN|ADV")
 
 
+@instrument
 def connection_words_ratio(doc):
     """Get ratio of connecting words over total words of text.
 
     This function computes the ratio of connective words over the total
     number of words. This implementation is only supported in Spanish and
-    we consider the following lemmas: ``y``, ``o``, ``no``, ``si``.
+    we consider the following lemmas: ``y``, ``o``, ``no``, ``si``
+    (``TRUNAJOD.surface_proxies.CONNECTION_WORDS``).
 
     :param doc: Tokenized text
     :type doc: Spacy Doc
     :return: Connection word ratio
     :rtype: float
     """
-    return sum(
-        [
-            1
-            for token in doc
-            if token.lemma_.lower() in {"y", "o", "no", "si"}
-            and is_word(token)
-        ]
-    ) / word_count(doc)
+    return CONNECTION_LEXICON.count(doc, attr="lemma") / word_count(doc)
 
 
+@instrument
+def max_dependency_depth(doc: Doc) -> int:
+    """Return maximum depth of words in the parse tree.
+
+    See :func:`TRUNAJOD.surface_proxies.dependency_depths`.
+
+    :param doc: Text to be processed
+    :type doc: Spacy Doc
+    :return: Maximum dependency depth, 0 if the text has no words
+    :rtype: int
+    """
+    depths = dependency_depths(doc)[_word_mask(doc)]
+    return int(depths.max()) if len(depths) else 0
+
+
+@instrument
 def negation_density(doc):
     """Compute negation density.
 
@@ -350,16 +574,11 @@ def negation_density(doc):
     :return: Negation density
     :rtype: float
     """
-    negation_count = 0
-    for token in doc:
-        if is_word(token) and token.lemma_.lower() in NEGATION_WORDS:
-            negation_count += 1
-
-    return negation_count / word_count(doc)
+    return NEGATION_LEXICON.count(doc, attr="lemma") / word_count(doc)
 
 
 def node_similarity(node1, node2, is_central_node=False):
-    """Compute node similarity recursively, based on common children POS.
+    """Compute node similarity, based on common children POS.
 
     This function is called inside
     :func:`TRUNAJOD.surface_proxies.syntactic_similarity`
@@ -367,6 +586,12 @@ def node_similarity(node1, node2, is_central_node=False):
     need to call this function directly, but we provide it for debugging
     purposes.
 
+    Children of both nodes are matched greedily: each child of ``node1`` is
+    paired with the first unmatched child of ``node2`` that has the same POS,
+    and the matched pairs are compared in the same way down the tree. The
+    traversal is iterative, so deeply nested sentences do not hit Python's
+    recursion limit.
+
     :param node1: Node of the parse tree.
     :type node1: Spacy Token
     :param node2: Node of the parse tree
@@ -376,30 +601,12 @@ def node_similarity(node1, node2, is_central_node=False):
     :return: Total childs in common between node1 and node2.
     :rtype: int
     """
-    similarity = 0
-    common_childs_node1 = set()
-    common_childs_node2 = set()
-    if is_central_node:
-        if node1.pos_ == node2.pos_:
-            similarity += 1
-        else:
-            return 0
-
-    for child1 in node1.children:
-        for child2 in node2.children:
-            child_not_seen = (
-                child1 not in common_childs_node1
-                and child2 not in common_childs_node2
-            )
-            if child1.pos_ == child2.pos_ and child_not_seen:
-                similarity += 1
-                common_childs_node1.add(child1)
-                common_childs_node2.add(child2)
-                similarity += node_similarity(child1, child2, False)
-
-    return similarity
+    return _tree_similarity(
+        _compile_tree(node1), _compile_tree(node2), is_central_node
+    )
 
 
+@instrument
 def noun_count(doc):
     """Count nouns in the text.
 
@@ -414,6 +621,7 @@ def noun_count(doc):
     return sum([1 for token in doc if token.pos_ in {"NOUN", "PROPN"}])
 
 
+@instrument
 def noun_phrase_density(doc):
     """Compute NP density.
 
@@ -447,7 +655,41 @@ def noun_phrase_density(doc):
     return children / noun_count(doc)
 
 
-def pos_dissimilarity(doc):
+@instrument
+def pos_count_matrix(doc: Doc) -> Tuple[np.ndarray, List[str]]:
+    """Get a sentences by POS tags count matrix.
+
+    Row ``i`` holds the PoS distribution of the ``i``-th sentence (see
+    :func:`TRUNAJOD.surface_proxies.pos_distribution`), and each column
+    corresponds to a PoS tag. Tags are integer coded in a single pass over
+    the text, in order of first appearance.
+
+    :param doc: Processed text
+    :type doc: Spacy Doc
+    :return: Count matrix and the PoS tag of each column
+    :rtype: Tuple (numpy.ndarray, List of str)
+    """
+    tag_codes: Dict[str, int] = {}
+    codes = []
+    sentence_lengths = []
+    for sent in doc.sents:
+        length = 0
+        for token in sent:
+            code = tag_codes.get(token.pos_)
+            if code is None:
+                code = tag_codes[token.pos_] = len(tag_codes)
+            codes.append(code)
+            length += 1
+        sentence_lengths.append(length)
+
+    rows = np.repeat(np.arange(len(sentence_lengths)), sentence_lengths)
+    counts = np.zeros((len(sentence_lengths), len(tag_codes)), dtype=np.int64)
+    np.add.at(counts, (rows, np.array(codes, dtype=np.int64)), 1)
+    return counts, list(tag_codes)
+
+
+@instrument
+def pos_dissimilarity(doc: Doc, window: Optional[int] = 1) -> float:
     """Measure Part of Speech disimilarity over sentences.
 
     The dissimilarity of POS between two sentences is the difference
@@ -462,33 +704,40 @@ def pos_dissimilarity(doc):
     This is done for each pair of sentences (``N - 1`` sentences) and the
     results are averaged (again, over ``N - 1``)
 
+    All the differences are computed at once over the rows of
+    :func:`TRUNAJOD.surface_proxies.pos_count_matrix`. By default adjacent
+    sentences are compared; with ``window=k`` every sentence is compared to
+    the ``k`` sentences that follow it, and with ``window=None`` all the
+    pairs of sentences are compared. The result is averaged over the number
+    of pairs.
+
     :param doc: Processed text
     :type doc: Spacy Doc
+    :param window: Maximum distance between compared sentences, or None to
+        compare all pairs, defaults to 1
+    :type window: int, optional
+    :raises ValueError: If window is less than 1
     :return: Part of Speech dissimilarity
     :rtype: float
     """
-    sent_pos_dist = []
-    for sent in doc.sents:
-        sent_pos_dist.append(pos_distribution(sent))
-
+    if window is not None and window < 1:
+        raise ValueError("window should be at least 1")
+    counts, _ = pos_count_matrix(doc)
+    n_sentences = len(counts)
+    max_offset = n_sentences - 1 if window is None else window
     disimilarity = 0
-    for i in range(len(sent_pos_dist) - 1):
-        common_adj_tags = set(sent_pos_dist[i].keys()) | set(
-            sent_pos_dist[i + 1].keys()
-        )
-        difference = 0
-        totals = 0
-        for pos in common_adj_tags:
-            pos_dist_value = sent_pos_dist[i].get(pos, 0)
-            pos_dist_value_next = sent_pos_dist[i + 1].get(pos, 0)
-
-            difference += abs(pos_dist_value - pos_dist_value_next)
-            totals += pos_dist_value + pos_dist_value_next
-
-        disimilarity += difference / totals
-    return disimilarity / (len(sent_pos_dist) - 1)
-
-
+    n_pairs = 0
+    for offset in range(1, min(max_offset, n_sentences - 1) + 1):
+        current = counts[:-offset]
+        following = counts[offset:]
+        difference = np.abs(current - following).sum(axis=1)
+        totals = (current + following).sum(axis=1)
+        disimilarity += sum((difference / totals).tolist())
+        n_pairs += n_sentences - offset
+    return disimilarity / n_pairs
+
+
+@instrument
 def pos_distribution(doc):
     """Get POS distribution from a processed text.
 
@@ -512,6 +761,7 @@ def pos_distribution(doc):
     return distribution
 
 
+@instrument
 def pos_ratio(doc, pos_types):
     """Compute POS ratio given desired type of ratio.
 
@@ -536,6 +786,7 @@ def pos_ratio(doc, pos_types):
     return total_pos_tags / total_words
 
 
+@instrument
 def sentence_count(doc):
     """Return number of sentences in a text.
 
@@ -547,6 +798,7 @@ def sentence_count(doc):
     return len(list(doc.sents))
 
 
+@instrument
 def syllable_count(doc):
     """Return number of syllables of a text.
 
@@ -564,6 +816,7 @@ def syllable_count(doc):
     )
 
 
+@instrument
 def syntactic_similarity(doc):
     """Compute average syntactic similarity between sentences.
 
@@ -578,18 +831,23 @@ def syntactic_similarity(doc):
     """
     n_sentences = 0
     prev_sent = None
+    prev_tree = None
     aggregate_similarity = 0
     for sent in doc.sents:
         n_sentences += 1
+        # Each sentence tree is compiled once and reused for both neighbours
+        tree = _compile_tree(sent.root)
         if prev_sent is not None:
-            common_nodes = node_similarity(sent.root, prev_sent.root, True)
+            common_nodes = _tree_similarity(tree, prev_tree, True)
             aggregate_similarity += common_nodes / (
                 len(sent) + len(prev_sent) - common_nodes
             )
         prev_sent = sent
+        prev_tree = tree
     return aggregate_similarity / (n_sentences - 1)
 
 
+@instrument
 def syllable_word_ratio(doc):
     """Return average syllable word ratio.
 
@@ -603,6 +861,7 @@ def syllable_word_ratio(doc):
     return syllable_count(doc) / word_count(doc)
 
 
+@instrument
 def subordination(doc, infinitive_map):
     """Return subordination, defined as the clause density.
 
@@ -619,6 +878,7 @@ def subordination(doc, infinitive_map):
     return clause_count(doc, infinitive_map) / sentence_count(doc)
 
 
+@instrument
 def verb_noun_ratio(doc):
     """Compute Verb/Noun ratio.
 
@@ -630,6 +890,7 @@ def verb_noun_ratio(doc):
     return pos_ratio(doc, "VERB|AUX") / pos_ratio(doc, "NOUN|PROPN")
 
 
+@instrument
 def words_before_root(doc, max_depth=4):
     """Return average word count of words before root.
 
@@ -637,11 +898,19 @@ def words_before_root(doc, max_depth=4):
     root is a verb. Otherwise, the root is considered to be the verb in the
     highest node in the parse tree.
 
+    Token depths are computed once for the whole text using
+    :func:`TRUNAJOD.surface_proxies.dependency_depths`.
+
     :param doc: Text to be processed.
     :type doc: Spacy Doc
+    :param max_depth: Verbs at this depth or deeper are not considered as
+        root, defaults to 4
+    :type max_depth: int, optional
     :return: Average words before root
     :rtype: float
     """
+    depths = dependency_depths(doc)
+    offset = doc[0].i if len(doc) else 0
     total_words_before_root = 0
     total_roots = 0
     for sent in doc.sents:
@@ -654,14 +923,16 @@ def words_before_root(doc, max_depth=4):
                 if token.pos_ in {"VERB", "AUX"}:
                     root_is_verb = True
         if not root_is_verb:
-            for depth in range(2, max_depth):
-                if not verb_highest_node_found:
-                    for token in sent:
-                        if token.pos_ in {"VERB", "AUX"}:
-                            if get_word_depth(token.i, doc) == depth:
-                                root = token
-                                verb_highest_node_found = True
-                                break
+            # Verb in the highest node: the first verb with the lowest depth
+            # in [2, max_depth)
+            highest_depth = max_depth
+            for token in sent:
+                if token.pos_ in {"VERB", "AUX"}:
+                    depth = depths[token.i - offset]
+                    if 2 <= depth < highest_depth:
+                        root = token
+                        highest_depth = depth
+                        verb_highest_node_found = True
 
         root_found = False
         verb_root_found = root_is_verb or verb_highest_node_found
@@ -678,6 +949,7 @@ def words_before_root(doc, max_depth=4):
     return total_words_before_root / total_roots
 
 
+@instrument
 def word_count(doc):
     """Return number of words in a text.
 
@@ -9,11 +9,15 @@ tend to 0. This measurement is not recommended if analyzing texts of different
 lengths, as when the number of tokens increases, the TTR tends flatten.
 """
 from collections import defaultdict
+from math import exp
+from math import lgamma
 from typing import Dict
 from typing import List
+from typing import Tuple
 
 import numpy as np
 from spacy.tokens import Doc
+from TRUNAJOD.instrumentation import instrument
 from TRUNAJOD.utils import is_word
 from TRUNAJOD.utils import SupportedModels
 
@@ -29,6 +33,7 @@ def type_token_ratio(word_list: List[str]) -> float:
     return len(set(word_list)) / len(word_list)
 
 
+@instrument
 def lexical_diversity_mtld(
     doc: Doc, model_name: str = "spacy", ttr_segment: float = 0.72
 ) -> float:
@@ -56,6 +61,7 @@ def lexical_diversity_mtld(
     ) / 2
 
 
+@instrument
 def one_side_lexical_diversity_mtld(
     doc: Doc, model_name: str = "spacy", ttr_segment: float = 0.72
 ) -> float:
@@ -105,6 +111,7 @@ def one_side_lexical_diversity_mtld(
     return total_words / factor
 
 
+@instrument
 def yule_k(doc: Doc) -> float:
     r"""Compute Yule's K from a text.
 
@@ -135,6 +142,7 @@ def yule_k(doc: Doc) -> float:
     return 1e4 * sum(r ** 2 * vr - N for r, vr in rs.items()) / N ** 2
 
 
+@instrument
 def d_estimate(
     doc: Doc, min_range: int = 35, max_range: int = 50, trials: int = 5
 ) -> float:
@@ -196,6 +204,7 @@ def d_estimate(
     return d[0]
 
 
+@instrument
 def word_variation_index(doc: Doc) -> float:
     r"""Compute Word Variation Index.
 
@@ -224,3 +233,187 @@ def word_variation_index(doc: Doc) -> float:
     return np.log(number_of_words) / np.log(
         2 - np.log(number_of_types) / np.log(number_of_words)
     )
+
+
+def _lemma_codes(doc: Doc) -> Tuple[np.ndarray, int]:
+    """Integer code the lemmas of the words of a text.
+
+    Codes are assigned in order of first appearance.
+    """
+    lemma_codes: Dict[str, int] = {}
+    codes = [
+        lemma_codes.setdefault(token.lemma_, len(lemma_codes))
+        for token in doc
+        if is_word(token)
+    ]
+    return np.array(codes, dtype=np.int64), len(lemma_codes)
+
+
+def _moving_average_ttr(codes: np.ndarray, n_types: int, window: int):
+    if window < 1:
+        raise ValueError("window should be at least 1")
+    n_words = len(codes)
+    if n_words <= window:
+        return n_types / n_words
+
+    # A word adds a new type to the windows that start after the previous
+    # occurrence of its lemma (and no more than window - 1 words before it)
+    order = np.argsort(codes, kind="stable")
+    previous = np.full(n_words, -1, dtype=np.int64)
+    same_type = codes[order[1:]] == codes[order[:-1]]
+    previous[order[1:][same_type]] = order[:-1][same_type]
+
+    positions = np.arange(n_words)
+    n_windows = n_words - window + 1
+    first = np.maximum(previous + 1, positions - window + 1)
+    last = np.minimum(positions, n_windows - 1)
+    valid = first <= last
+    changes = np.zeros(n_windows + 1, dtype=np.int64)
+    np.add.at(changes, first[valid], 1)
+    np.add.at(changes, last[valid] + 1, -1)
+    types_per_window = np.cumsum(changes[:-1])
+    return float(types_per_window.sum()) / (n_windows * window)
+
+
+def _mean_segmental_ttr(codes: np.ndarray, n_types: int, segment_size: int):
+    if segment_size < 1:
+        raise ValueError("segment_size should be at least 1")
+    n_segments = len(codes) // segment_size
+    if n_segments == 0:
+        return n_types / len(codes)
+
+    segments = np.sort(
+        codes[: n_segments * segment_size].reshape(n_segments, segment_size),
+        axis=1,
+    )
+    types_per_segment = 1 + (np.diff(segments, axis=1) != 0).sum(axis=1)
+    return float(types_per_segment.sum()) / (n_segments * segment_size)
+
+
+def _log_binomial(n: int, k: int) -> float:
+    return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+
+def _hdd(codes: np.ndarray, n_types: int, sample_size: int):
+    if sample_size < 1:
+        raise ValueError("sample_size should be at least 1")
+    n_words = len(codes)
+    sample_size = min(sample_size, n_words)
+    frequencies, n_lemmas = np.unique(
+        np.bincount(codes, minlength=n_types), return_counts=True
+    )
+    log_total = _log_binomial(n_words, sample_size)
+    hdd = 0.0
+    for frequency, count in zip(frequencies.tolist(), n_lemmas.tolist()):
+        # Probability of the lemma not appearing in the sample
+        if n_words - frequency >= sample_size:
+            absent = exp(
+                _log_binomial(n_words - frequency, sample_size) - log_total
+            )
+        else:
+            absent = 0.0
+        hdd += count * (1 - absent)
+    return hdd / sample_size
+
+
+@instrument
+def moving_average_ttr(doc: Doc, window: int = 50) -> float:
+    """Compute Moving-Average Type-Token Ratio (MATTR).
+
+    MATTR :cite:`covington2010cutting` is the average TTR over all the
+    windows of ``window`` consecutive words of the text. Instead of
+    recomputing the TTR of each window, the number of types of every window
+    is obtained at once from the previous occurrence of each lemma, so this
+    is linear in the number of words. Texts shorter than the window get the
+    plain TTR.
+
+    :param doc: Processed text
+    :type doc: Doc
+    :param window: Number of words of each window, defaults to 50
+    :type window: int, optional
+    :raises ValueError: If window is less than 1
+    :return: MATTR lexical diversity
+    :rtype: float
+    """
+    codes, n_types = _lemma_codes(doc)
+    return _moving_average_ttr(codes, n_types, window)
+
+
+@instrument
+def mean_segmental_ttr(doc: Doc, segment_size: int = 50) -> float:
+    """Compute Mean Segmental Type-Token Ratio (MSTTR).
+
+    MSTTR :cite:`johnson1944studies` splits the text in consecutive,
+    non-overlapping segments of ``segment_size`` words and averages their
+    TTRs. Words of the last, incomplete, segment are discarded. Texts
+    shorter than a segment get the plain TTR.
+
+    :param doc: Processed text
+    :type doc: Doc
+    :param segment_size: Number of words of each segment, defaults to 50
+    :type segment_size: int, optional
+    :raises ValueError: If segment_size is less than 1
+    :return: MSTTR lexical diversity
+    :rtype: float
+    """
+    codes, n_types = _lemma_codes(doc)
+    return _mean_segmental_ttr(codes, n_types, segment_size)
+
+
+@instrument
+def hdd(doc: Doc, sample_size: int = 42) -> float:
+    r"""Compute HD-D lexical diversity.
+
+    HD-D :cite:`mccarthy2007vocd,mccarthy2010mtld` is the closed form of
+    what :func:`TRUNAJOD.ttr.d_estimate` approximates by random sampling.
+    For each lemma appearing :math:`f` times in a text of :math:`N` words,
+    the hypergeometric distribution gives the probability of the lemma being
+    in a random sample of :math:`n` words (``sample_size``). The expected
+    TTR of the samples is then:
+
+    .. math::
+        HDD = \displaystyle\frac{1}{n}\sum_{lemma}\left[1 -
+        \frac{\binom{N - f}{n}}{\binom{N}{n}}\right]
+
+    The probabilities are computed once per distinct frequency, so no
+    sampling is involved. Texts shorter than the sample get the plain TTR.
+
+    :param doc: Processed text
+    :type doc: Doc
+    :param sample_size: Number of words of each sample, defaults to 42
+    :type sample_size: int, optional
+    :raises ValueError: If sample_size is less than 1
+    :return: HD-D lexical diversity
+    :rtype: float
+    """
+    codes, n_types = _lemma_codes(doc)
+    return _hdd(codes, n_types, sample_size)
+
+
+@instrument
+def moving_window_diversity(
+    doc: Doc, window: int = 50, segment_size: int = 50, sample_size: int = 42
+) -> Dict[str, float]:
+    """Compute MATTR, MSTTR and HD-D with a single pass over the text.
+
+    See :func:`TRUNAJOD.ttr.moving_average_ttr`,
+    :func:`TRUNAJOD.ttr.mean_segmental_ttr` and :func:`TRUNAJOD.ttr.hdd`.
+
+    :param doc: Processed text
+    :type doc: Doc
+    :param window: Number of words of MATTR windows, defaults to 50
+    :type window: int, optional
+    :param segment_size: Number of words of MSTTR segments, defaults to 50
+    :type segment_size: int, optional
+    :param sample_size: Number of words of HD-D samples, defaults to 42
+    :type sample_size: int, optional
+    :raises ValueError: If a window, segment or sample has less than 1 word
+    :return: Measures, keyed by ``mattr``, ``msttr`` and ``hdd``
+    :rtype: dict
+    """
+    codes, n_types = _lemma_codes(doc)
+    return {
+        "mattr": _moving_average_ttr(codes, n_types, window),
+        "msttr": _mean_segmental_ttr(codes, n_types, segment_size),
+        "hdd": _hdd(codes, n_types, sample_size),
+    }
@@ -3,6 +3,8 @@
 from enum import Enum
 
 from spacy.tokens import Token
+from TRUNAJOD.lexicon import LemmaDictionary
+from TRUNAJOD.lexicon import Lexicon
 
 
 class SupportedModels(str, Enum):
@@ -43,12 +45,15 @@ def get_sentences_lemmas(docs, lemma_dict, stopwords=[]):  # pragma: no cover
     * Adverb lemmas
     * Proper pronoun lemmas
 
+    :func:`TRUNAJOD.lemmas.sentence_lemma_table` returns the same lemmas as
+    an integer coded table, which avoids building lists of strings.
+
     :param docs: List of sentences to be processed.
     :type docs: List of Spacy Doc (Doc.sents)
     :param lemma_dict: Lemmatizer dictionary
-    :type lemma_dict: dict
+    :type lemma_dict: dict or :class:`TRUNAJOD.lexicon.LemmaDictionary`
     :param stopwords: List of stopwords (function words), defaults to []
-    :type stopwords: list, optional
+    :type stopwords: list or :class:`TRUNAJOD.lexicon.Lexicon`, optional
     :return: List of lemmas from text
     :rtype: List of Lists of str
     """
@@ -124,12 +129,16 @@ def get_token_lemmas(doc, lemma_dict, stopwords=[]):  # pragma: no cover
     * Adverb lemmas
     * Proper pronoun lemmas
 
+    If ``lemma_dict`` is a :class:`TRUNAJOD.lexicon.LemmaDictionary` and
+    ``stopwords`` a :class:`TRUNAJOD.lexicon.Lexicon`, tokens are looked up
+    by the hash of their lowercased text, without lowercasing them.
+
     :param doc: Doc containing tokens from text
     :type doc: Spacy Doc
     :param lemma_dict: Lemmatizer key-value pairs
-    :type lemma_dict: Dict
+    :type lemma_dict: Dict or :class:`TRUNAJOD.lexicon.LemmaDictionary`
     :param stopwords: list of stopwords, defaults to []
-    :type stopwords: set/list, optional
+    :type stopwords: set/list or :class:`TRUNAJOD.lexicon.Lexicon`, optional
     :return: All lemmas for noun, verb, etc.
     :rtype: tuple of lists
     """
@@ -141,9 +150,14 @@ def get_token_lemmas(doc, lemma_dict, stopwords=[]):  # pragma: no cover
     adv_lemmas = []
     prp_lemmas = []
 
+    hashed_lemmas = isinstance(lemma_dict, LemmaDictionary)
+    hashed_stopwords = isinstance(stopwords, Lexicon)
     for token in doc:
-        word = token.text.lower()
-        word_lemma = lemmatize(lemma_dict, word)
+        word = token.lower if hashed_stopwords else token.text.lower()
+        if hashed_lemmas:
+            word_lemma = lemma_dict.lemma(token)
+        else:
+            word_lemma = lemmatize(lemma_dict, token.text.lower())
         if is_noun(token):
             noun_lemmas.append(word_lemma)
         elif is_verb(token):
@@ -219,10 +233,11 @@ def is_pronoun(token: Token):
 def is_stopword(word, stopwords):
     """Return ``True`` if ``word`` is in ``stopwords``, False otherwise.
 
-    :param word: Word to be checked
+    :param word: Word to be checked (or its hash, if ``stopwords`` is a
+        :class:`TRUNAJOD.lexicon.Lexicon`)
     :type word: string
     :param stopwords: stopword list
-    :type stopwords: List of strings
+    :type stopwords: List of strings or :class:`TRUNAJOD.lexicon.Lexicon`
     :return: True if word in stopwords
     :rtype: boolean
     """
@@ -265,7 +280,7 @@ def lemmatize(lemma_dict, word):
     word.
 
     :param lemma_dict: A dict (word, lemma)
-    :type lemma_dict: Python dict
+    :type lemma_dict: Python dict or :class:`TRUNAJOD.lexicon.LemmaDictionary`
     :param word: The word to be lemmatized
     :type word: string
     :return: Lemmatized word
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+"""scikit-learn compatible feature extraction.
+
+:class:`TRUNAJOD.vectorizer.TrunajodVectorizer` turns texts (or processed
+``Doc`` objects) into a matrix with one row per text and one column per
+feature, so TRUNAJOD features can be used as a step of a scikit-learn
+pipeline:
+
+.. code-block:: python
+
+    import spacy
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from TRUNAJOD.vectorizer import TrunajodVectorizer
+
+    nlp = spacy.load("es_core_news_sm", disable=["ner"])
+    model = make_pipeline(
+        TrunajodVectorizer(
+            nlp,
+            features=["lexical_density", "yule_k"],
+            n_jobs=4,
+            memory="trunajod_cache",
+        ),
+        LogisticRegression(),
+    )
+    model.fit(texts, labels)
+
+scikit-learn is not required: the vectorizer implements its estimator
+interface (``fit``, ``transform``, ``fit_transform``, ``get_params``,
+``set_params`` and ``get_feature_names_out``) without importing it.
+
+* Texts are processed with ``nlp.pipe(texts, n_process=n_jobs)``, without
+  modifying the pipeline. Features of the processed texts (and of ``Doc``
+  objects) are then computed in a pool of ``n_jobs`` worker processes,
+  which receive the serialized Docs. Features are looked up in the registry
+  of the workers, so features registered at runtime are only available
+  with the ``fork`` start method. Workers rebuild the Docs on the blank
+  vocabulary of their language: word vectors and lexeme attributes set on
+  the vocabulary of the pipeline are not available to features computed
+  with ``n_jobs`` > 1.
+* With ``memory``, the features of each text are cached in that directory,
+  so the folds of a cross-validation do not compute them again. Entries are
+  keyed by the text and the pipeline (or the annotations of the ``Doc``),
+  and hold one value per feature, so other selections of features reuse
+  them. Changing the definition of a registered feature does not
+  invalidate its cached values. Entries are read, completed and written
+  back without locking, so a directory should be written by a single
+  process at a time: features computed concurrently by another process
+  for the same text may be lost (they are computed again when needed).
+* The output is a NumPy array, or a pandas ``DataFrame`` with
+  ``output="pandas"``. Columns follow the order of ``features`` (or the
+  alphabetical order, when all the features are computed), and undefined
+  values are NaN.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+from spacy.util import minibatch
+from spacy.vocab import Vocab
+from TRUNAJOD import component  # noqa: F401 (registers doc._.trunajod)
+from TRUNAJOD.features import resolve_features
+
+OUTPUTS = ("numpy", "pandas")
+
+
+class FeatureCache(object):
+    """Directory of features of texts, one JSON file per text.
+
+    Files are replaced atomically, but not locked: updates of an entry by
+    concurrent writers may overwrite each other.
+
+    :param path: Cache directory, created if it does not exist
+    :type path: str
+    """
+
+    def __init__(self, path: str):
+        """Initialize cache."""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def __file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, key: str) -> Dict[str, Optional[float]]:
+        """Get the cached features of a text.
+
+        :param key: Key of the text
+        :type key: str
+        :return: Value of each cached feature (empty if none is cached)
+        :rtype: dict
+        """
+        try:
+            with open(self.__file(key), encoding="utf-8") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def set(self, key: str, features: Dict[str, float]) -> None:
+        """Cache the features of a text.
+
+        The file is replaced atomically, so concurrent processes sharing
+        the directory never read partial entries.
+
+        :param key: Key of the text
+        :type key: str
+        :param features: Value of each feature
+        :type features: dict
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+            json.dump(features, cache_file)
+        os.replace(tmp_path, self.__file(key))
+
+
+def _hash(*parts: bytes) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _pipeline_id(nlp: Language) -> bytes:
+    meta = nlp.meta
+    return json.dumps(
+        [meta.get("lang"), meta.get("name"), meta.get("version")]
+        + nlp.pipe_names
+    ).encode("utf-8")
+
+
+class TrunajodVectorizer(object):
+    """Extract TRUNAJOD features of texts, as a scikit-learn transformer.
+
+    :param nlp: Pipeline processing the texts, defaults to None (only
+        ``Doc`` objects can be transformed)
+    :type nlp: spacy.language.Language, optional
+    :param features: Features to extract, defaults to None (all the
+        registered features, in alphabetical order)
+    :type features: List of str, optional
+    :param n_jobs: Number of processes parsing texts (and computing
+        features of Docs, on a blank vocabulary without vectors), -1 for all
+        the CPUs, defaults to None (1)
+    :type n_jobs: int, optional
+    :param batch_size: Texts per ``nlp.pipe`` batch, defaults to 64
+    :type batch_size: int, optional
+    :param memory: Directory caching the features of each text, written by
+        one process at a time, defaults to None (no cache)
+    :type memory: str, optional
+    :param output: ``numpy`` or ``pandas``, defaults to ``numpy``
+    :type output: str, optional
+    """
+
+    def __init__(
+        self,
+        nlp: Optional[Language] = None,
+        features: Optional[List[str]] = None,
+        n_jobs: Optional[int] = None,
+        batch_size: int = 64,
+        memory: Optional[str] = None,
+        output: str = "numpy",
+    ):
+        """Initialize vectorizer."""
+        self.nlp = nlp
+        self.features = features
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.memory = memory
+        self.output = output
+
+    def get_params(self, deep: bool = True) -> Dict[str, Any]:
+        """Get parameters of the vectorizer.
+
+        :param deep: Unused, for scikit-learn compatibility
+        :type deep: bool, optional
+        :return: Parameter names mapped to their values
+        :rtype: dict
+        """
+        return {
+            "nlp": self.nlp,
+            "features": self.features,
+            "n_jobs": self.n_jobs,
+            "batch_size": self.batch_size,
+            "memory": self.memory,
+            "output": self.output,
+        }
+
+    def set_params(self, **params) -> "TrunajodVectorizer":
+        """Set parameters of the vectorizer.
+
+        :raises ValueError: If a parameter is unknown
+        :return: The vectorizer
+        :rtype: TrunajodVectorizer
+        """
+        valid = self.get_params()
+        for name, value in params.items():
+            if name not in valid:
+                raise ValueError(
+                    "Invalid parameter {} for {}".format(
+                        name, type(self).__name__
+                    )
+                )
+            setattr(self, name, value)
+        return self
+
+    def __check_params(self) -> List[str]:
+        if self.output not in OUTPUTS:
+            raise ValueError(
+                "Unknown output {}, expected one of {}".format(
+                    self.output, OUTPUTS
+                )
+            )
+        return resolve_features(self.features)
+
+    def fit(self, X: Iterable, y=None) -> "TrunajodVectorizer":
+        """Check the parameters, features are not learned from data.
+
+        :param X: Texts (str) or processed texts (Doc)
+        :type X: Iterable
+        :param y: Unused, for scikit-learn compatibility
+        :raises KeyError: If a feature is not registered
+        :raises ValueError: If the output is unknown
+        :return: The vectorizer
+        :rtype: TrunajodVectorizer
+        """
+        self.feature_names_ = self.__check_params()
+        return self
+
+    def fit_transform(self, X: Iterable, y=None):
+        """Fit the vectorizer and extract features of texts.
+
+        :param X: Texts (str) or processed texts (Doc)
+        :type X: Iterable
+        :param y: Unused, for scikit-learn compatibility
+        :return: Features of each text, see
+            :meth:`TRUNAJOD.vectorizer.TrunajodVectorizer.transform`
+        """
+        return self.fit(X, y).transform(X)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        """Get the names of the output columns.
+
+        :param input_features: Unused, for scikit-learn compatibility
+        :raises KeyError: If a feature is not registered
+        :return: Feature names
+        :rtype: numpy.ndarray of str
+        """
+        return np.array(resolve_features(self.features), dtype=object)
+
+    def transform(self, X: Iterable):
+        """Extract features of texts.
+
+        :param X: Texts (str) or processed texts (Doc)
+        :type X: Iterable
+        :raises KeyError: If a feature is not registered
+        :raises ValueError: If the output is unknown, or there are texts
+            and no pipeline
+        :return: Matrix of shape (texts, features)
+        :rtype: numpy.ndarray of float64, or pandas.DataFrame
+        """
+        names = self.__check_params()
+        X = list(X)
+        if self.nlp is None and any(not isinstance(x, Doc) for x in X):
+            raise ValueError("A pipeline (nlp) is needed to process texts")
+
+        cache = FeatureCache(self.memory) if self.memory else None
+        keys = [self.__key(x) for x in X] if cache else [None] * len(X)
+        rows: List[Optional[Dict[str, Optional[float]]]] = [None] * len(X)
+        if cache:
+            for index, key in enumerate(keys):
+                cached = cache.get(key)
+                if all(name in cached for name in names):
+                    rows[index] = cached
+
+        pending = [index for index, row in enumerate(rows) if row is None]
+        texts = [index for index in pending if not isinstance(X[index], Doc)]
+        docs = [index for index in pending if isinstance(X[index], Doc)]
+        computed = dict(zip(texts, self.__text_features(X, texts, names)))
+        computed.update(zip(docs, self.__doc_features(X, docs, names)))
+        for index, features in computed.items():
+            if cache:
+                cached = cache.get(keys[index])
+                cached.update(features)
+                cache.set(keys[index], cached)
+            rows[index] = features
+
+        matrix = np.array(
+            [[rows[i][name] for name in names] for i in range(len(X))],
+            dtype=np.float64,
+        ).reshape(len(X), len(names))
+        if self.output == "pandas":
+            import pandas as pd
+
+            return pd.DataFrame(matrix, columns=names)
+        return matrix
+
+    def __key(self, x) -> str:
+        if isinstance(x, Doc):
+            return _hash(x.to_bytes(exclude=["user_data"]))
+        return _hash(_pipeline_id(self.nlp), b"\0", x.encode("utf-8"))
+
+    def __n_jobs(self) -> int:
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs < 0:
+            return max(1, (os.cpu_count() or 1) + 1 + self.n_jobs)
+        return self.n_jobs
+
+    def __text_features(
+        self, X: List, indices: List[int], names: List[str]
+    ) -> List[Dict[str, float]]:
+        if not indices:
+            return []
+        docs = self.nlp.pipe(
+            (X[index] for index in indices),
+            batch_size=self.batch_size,
+            n_process=self.__n_jobs(),
+        )
+        return self.__features(docs, len(indices), names)
+
+    def __doc_features(
+        self, X: List, indices: List[int], names: List[str]
+    ) -> List[Dict[str, float]]:
+        return self.__features(
+            (X[index] for index in indices), len(indices), names
+        )
+
+    def __features(
+        self, docs: Iterable[Doc], n_docs: int, names: List[str]
+    ) -> List[Dict[str, float]]:
+        n_jobs = self.__n_jobs()
+        if n_jobs == 1 or n_docs < 2:
+            return [doc._.trunajod.to_dict(names) for doc in docs]
+        # Tensors are not needed by features, cached features in user_data
+        # travel with the Docs
+        size = min(self.batch_size, -(-n_docs // n_jobs))
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _batch_features,
+                    [
+                        (doc.lang_ or "xx", doc.to_bytes(exclude=["tensor"]))
+                        for doc in batch
+                    ],
+                    names,
+                )
+                for batch in minibatch(docs, size)
+            ]
+            return [
+                features for future in futures for features in future.result()
+            ]
+
+
+# Vocabularies of this process, reused by the tasks of workers
+_VOCABS: Dict[str, Vocab] = {}
+
+
+def _batch_features(
+    docs: List[Tuple[str, bytes]], names: List[str]
+) -> List[Dict[str, float]]:
+    """Compute features of serialized Docs, given with their language.
+
+    Docs are rebuilt on the blank vocabulary of their language, so vectors
+    and lexeme attributes of the original vocabulary are not available.
+    """
+    rows = []
+    for lang, data in docs:
+        vocab = _VOCABS.get(lang)
+        if vocab is None:
+            vocab = _VOCABS[lang] = spacy.blank(lang).vocab
+        rows.append(Doc(vocab).from_bytes(data)._.trunajod.to_dict(names))
+    return rows
@@ -0,0 +1,73 @@
+"""Unit tests for cohesion TRUNAJOD module."""
+import math
+
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import semantic_measures
+from TRUNAJOD.cohesion import IncidenceMatrix
+from TRUNAJOD.cohesion import lexical_overlap
+from TRUNAJOD.lemmas import LemmaCategory
+from TRUNAJOD.lemmas import sentence_lemma_table
+
+LEMMA_DICT = {"perros": "perro", "corren": "correr", "corre": "correr"}
+STOPWORDS = ["los", "el", "y"]
+
+
+def _doc():
+    words = ["Los", "perros", "corren", ".", "El", "perro", "corre", "."]
+    words += ["Él", "salta", ".", "Los", "perros", "saltan", "."]
+    return Doc(
+        spacy.blank("es").vocab,
+        words=words,
+        pos=["DET", "NOUN", "VERB", "PUNCT", "DET", "NOUN", "VERB", "PUNCT"]
+        + ["PRON", "VERB", "PUNCT", "DET", "NOUN", "VERB", "PUNCT"],
+        sent_starts=[True, False, False, False, True, False, False, False]
+        + [True, False, False, True, False, False, False],
+    )
+
+
+def test_incidence_matrix():
+    """Test sparse products match dense ones."""
+    a = IncidenceMatrix.from_pairs([0, 0, 0, 2, 2], [1, 3, 1, 0, 3], (3, 4))
+    b = IncidenceMatrix.from_pairs([0, 1, 1], [3, 0, 1], (2, 4))
+    assert a.nnz == 4
+    assert a.indptr.tolist() == [0, 2, 2, 4]
+    for other in (None, b):
+        rows, columns, values = a.dot_transpose(other)
+        dense = a.toarray() @ (a if other is None else other).toarray().T
+        product = np.zeros_like(dense)
+        product[rows, columns] = values
+        np.testing.assert_array_equal(product, dense)
+        assert (values > 0).all()
+
+    with pytest.raises(ValueError):
+        a.dot_transpose(IncidenceMatrix.from_pairs([], [], (1, 2)))
+
+
+def test_lexical_overlap():
+    """Test overlap of each span and category."""
+    table = sentence_lemma_table(_doc().sents, LEMMA_DICT, STOPWORDS)
+    overlap = lexical_overlap(table)
+    # Nouns: perro in sentences 0, 1 and 3
+    assert overlap["adjacent_noun_overlap"] == pytest.approx(1 / 3)
+    assert overlap["two_ahead_noun_overlap"] == pytest.approx(1 / 2)
+    assert overlap["global_noun_overlap_binary"] == pytest.approx(3 / 6)
+    # Verbs: correr (0, 1) and saltar in 2 only, as "saltan" is not lemmatized
+    assert overlap["adjacent_verb_overlap"] == pytest.approx(1 / 3)
+    assert overlap["global_function_overlap"] == pytest.approx(1 / 6)
+    assert overlap["global_argument_overlap"] == pytest.approx(3 / 6)
+    assert overlap["global_stem_overlap_binary"] == pytest.approx(3 / 6)
+
+    sentences = table.sentence_lemmas(LemmaCategory.CONTENT)
+    assert overlap["adjacent_content_overlap"] == pytest.approx(
+        semantic_measures.overlap(sentences, {})
+    )
+
+    one_sentence = sentence_lemma_table(list(_doc().sents)[:1], LEMMA_DICT)
+    overlap = lexical_overlap(one_sentence, ["noun", "stem"])
+    assert len(overlap) == 3 * 2 + 3
+    assert all(math.isnan(value) for value in overlap.values())
+    with pytest.raises(KeyError):
+        lexical_overlap(table, ["clause"])
@@ -0,0 +1,79 @@
+"""Unit tests for component TRUNAJOD module."""
+import math
+
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import component  # noqa: F401
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.features import available_features
+
+
+def _annotated_doc(vocab):
+    words = ["El", "perro", "come", "pan", ".", "Hoy", "llueve", "."]
+    return Doc(
+        vocab,
+        words=words,
+        pos=["DET", "NOUN", "VERB", "NOUN", "PUNCT", "ADV", "VERB", "PUNCT"],
+        heads=[1, 2, 2, 2, 2, 6, 6, 6],
+        deps=["det", "nsubj", "ROOT", "obj", "punct"]
+        + ["advmod", "ROOT", "punct"],
+    )
+
+
+def test_accessor():
+    """Test features are computed lazily and cached in the Doc."""
+    doc = _annotated_doc(spacy.blank("es").vocab)
+    features = doc._.trunajod
+    assert "lexical_density" not in features
+    for name in (
+        "word_count",
+        "sentence_count",
+        "average_sentence_length",
+        "average_word_length",
+        "lexical_density",
+        "verb_noun_ratio",
+        "syllable_word_ratio",
+        "pos_dissimilarity",
+    ):
+        expected = getattr(surface_proxies, name)(doc)
+        assert features[name] == pytest.approx(expected), name
+
+    assert "lexical_density" in doc._.trunajod
+    assert doc._.trunajod.word_count == 6
+    assert doc._.trunajod.counts["syllables"] == 9
+    assert doc.user_data["trunajod"]["features"]["word_count"] == 6
+    assert set(features.to_dict()) == set(available_features())
+
+    with pytest.raises(KeyError):
+        features["nope"]
+    with pytest.raises(AttributeError):
+        features.nope
+
+
+def test_undefined_features():
+    """Test features undefined for a text are NaN."""
+    nlp = spacy.blank("es")
+    nlp.add_pipe("sentencizer")
+    doc = nlp("")
+    assert math.isnan(doc._.trunajod["lexical_density"])
+    assert doc._.trunajod["word_count"] == 0
+
+
+def test_pipeline_component():
+    """Test eager features are computed by the pipeline and serialized."""
+    nlp = spacy.blank("es")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("trunajod", config={"features": ["word_count"]})
+    doc = nlp("El perro ladra. Hola.")
+    assert list(doc._.trunajod) == ["word_count"]
+
+    restored = Doc(nlp.vocab).from_bytes(doc.to_bytes())
+    assert list(restored._.trunajod) == ["word_count"]
+    assert restored._.trunajod["word_count"] == 6
+
+    docs = list(nlp.pipe(["Uno dos.", "Tres."]))
+    assert [d._.trunajod["word_count"] for d in docs] == [3, 2]
+
+    with pytest.raises(KeyError):
+        component.TrunajodComponent(["nope"])
@@ -0,0 +1,78 @@
+"""Unit tests for conllu TRUNAJOD module."""
+import pytest
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.conllu import DOC_ID_KEY
+from TRUNAJOD.conllu import read_conllu
+
+CONLLU = """# newdoc id = doc1
+# sent_id = 1
+# text = Juan vive del campo.
+1	Juan	Juan	PROPN	np	_	2	nsubj	_	_
+2	vive	vivir	VERB	vmip3s	Mood=Ind|Person=3|VerbForm=Fin	0	root	_	_
+3-4	del	_	_	_	_	_	_	_	_
+3	de	de	ADP	sps	_	5	case	_	_
+4	el	el	DET	da	Definite=Def	5	det	_	_
+5	campo	campo	NOUN	nc	Number=Sing	2	obl	_	SpaceAfter=No
+6	.	.	PUNCT	fp	_	2	punct	_	_
+
+# sent_id = 2
+# text = Llueve.
+1	Llueve	llover	VERB	_	VerbForm=Fin	0	root	_	SpaceAfter=No
+2	.	.	PUNCT	_	_	1	punct	_	_
+
+# newdoc id = doc2
+# sent_id = 3
+1	Hola	hola	INTJ	_	_	_	_	_	_
+1.1	x	_	_	_	_	_	_	_	_
+2	mundo	mundo	NOUN	_	_	_	_	_	_
+"""
+
+
+def test_read_conllu():
+    """Test documents are built from CoNLL-U columns."""
+    docs = list(read_conllu(CONLLU.splitlines(True)))
+    assert len(docs) == 2
+
+    doc = docs[0]
+    assert doc.user_data[DOC_ID_KEY] == "doc1"
+    assert doc.text == "Juan vive deel campo. Llueve."
+    assert [sent.text for sent in doc.sents] == [
+        "Juan vive deel campo.",
+        "Llueve.",
+    ]
+    assert [token.lemma_ for token in doc][:3] == ["Juan", "vivir", "de"]
+    assert doc[1].pos_ == "VERB"
+    assert doc[1].tag_ == "vmip3s"
+    assert str(doc[1].morph) == "Mood=Ind|Person=3|VerbForm=Fin"
+    assert [token.head.i for token in doc] == [1, 1, 4, 4, 1, 1, 6, 6]
+    assert doc[1].dep_ == "ROOT"
+    assert doc[6].dep_ == "ROOT"
+    assert surface_proxies.word_count(doc) == 6
+    assert surface_proxies.max_dependency_depth(doc) == 3
+
+    doc = docs[1]
+    assert doc.user_data[DOC_ID_KEY] == "doc2"
+    assert doc.text == "Hola mundo"
+    assert not doc.has_annotation("DEP")
+    assert len(list(doc.sents)) == 1
+
+    docs = list(read_conllu(CONLLU.splitlines(True), doc_boundary="sentence"))
+    assert [doc.text for doc in docs] == [
+        "Juan vive deel campo.",
+        "Llueve.",
+        "Hola mundo",
+    ]
+
+
+def test_read_conllu_file(tmp_path):
+    """Test reading from a path, and invalid input."""
+    path = tmp_path / "test.conllu"
+    path.write_text(CONLLU, encoding="utf-8")
+    assert len(list(read_conllu(str(path)))) == 2
+
+    with pytest.raises(ValueError):
+        list(read_conllu(["1\tHola\n"]))
+    with pytest.raises(ValueError):
+        list(read_conllu(["1\tHola\thola\tINTJ\t_\t_\tx\t_\t_\t_\n"]))
+    with pytest.raises(ValueError):
+        list(read_conllu([], doc_boundary="paragraph"))
@@ -0,0 +1,114 @@
+"""Unit tests for corpus TRUNAJOD module."""
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD.corpus import Corpus
+from TRUNAJOD.corpus import corpus_features
+from TRUNAJOD.features import extract_features
+
+VOCAB = spacy.blank("es").vocab
+NAMES = ["word_count", "max_dependency_depth", "first_second_person_density"]
+
+
+def _docs():
+    parsed = Doc(
+        VOCAB,
+        words=["Yo", "vivo", "aquí", ".", "Llueve", "."],
+        spaces=[True, True, False, True, False, False],
+        pos=["PRON", "VERB", "ADV", "PUNCT", "VERB", "PUNCT"],
+        lemmas=["yo", "vivir", "aquí", ".", "llover", "."],
+        morphs=["Person=1", "Person=1|VerbForm=Fin", "", "", "", ""],
+        heads=[1, 1, 1, 1, 4, 4],
+        deps=["nsubj", "ROOT", "advmod", "punct", "ROOT", "punct"],
+    )
+    unparsed = Doc(
+        VOCAB,
+        words=["Hola", "mundo", "!", "Chao"],
+        pos=["INTJ", "NOUN", "PUNCT", "INTJ"],
+        sent_starts=[True, False, False, True],
+    )
+    return [parsed, unparsed, Doc(VOCAB, words=[])]
+
+
+def test_corpus(tmp_path):
+    """Test documents are restored from the memory mapped arrays."""
+    path = str(tmp_path / "corpus")
+    corpus = Corpus(path)
+    docs = _docs()
+    assert corpus.extend(docs, ["a", "b", "c"]) == ["a", "b", "c"]
+    assert corpus.append(docs[1]) == "3"
+    with pytest.raises(ValueError):
+        corpus.append(docs[0], "a")
+
+    # A new reader sees the same documents, without the writer's vocab
+    reader = Corpus(path)
+    assert len(reader) == 4
+    assert "b" in reader
+    assert reader.position("c") == 2
+    assert isinstance(reader.tokens, np.memmap)
+    assert reader.token_attrs(1).base is not None
+    for doc, restored in zip(docs, [reader["a"], reader["b"], reader["c"]]):
+        assert restored.vocab is not VOCAB
+        assert restored.text == doc.text
+        assert [t.lemma_ for t in restored] == [t.lemma_ for t in doc]
+        assert [t.pos_ for t in restored] == [t.pos_ for t in doc]
+        assert [str(t.morph) for t in restored] == [str(t.morph) for t in doc]
+        assert [t.head.i for t in restored] == [t.head.i for t in doc]
+        assert [t.dep_ for t in restored] == [t.dep_ for t in doc]
+        assert [s.text for s in restored.sents] == [s.text for s in doc.sents]
+    assert not reader["b"].has_annotation("DEP")
+
+    corpus.append(docs[0], "e")
+    assert len(reader) == 4
+    reader.refresh()
+    assert len(reader) == 5
+    assert reader["e"].text == docs[0].text
+    with pytest.raises(KeyError):
+        reader["f"]
+
+
+def test_interrupted_append(tmp_path):
+    """Test data of an interrupted append is overwritten by the next one."""
+    path = tmp_path / "corpus"
+    docs = _docs()
+    Corpus(str(path)).append(docs[0], "a")
+    # Strings, tokens and id written, the index entry only partially
+    with open(path / "strings.jsonl", "a") as strings_file:
+        strings_file.write('"huérfano"\n"huér')
+    with open(path / "tokens.bin", "ab") as tokens_file:
+        tokens_file.write(b"\xff" * 8 * 9 * 3)
+    with open(path / "ids.jsonl", "a") as ids_file:
+        ids_file.write('"orphan"\n')
+    with open(path / "docs.bin", "ab") as docs_file:
+        docs_file.write(b"\x00" * 8)
+
+    corpus = Corpus(str(path))
+    assert corpus.ids == ["a"]
+    corpus.append(docs[1], "b")
+    reader = Corpus(str(path))
+    assert reader.ids == ["a", "b"]
+    assert reader.offsets.tolist() == [[0, 6], [6, 10]]
+    assert reader["b"].text == docs[1].text
+    assert [t.pos_ for t in reader["b"]] == [t.pos_ for t in docs[1]]
+    assert reader["a"].text == docs[0].text
+
+
+def test_corpus_features(tmp_path):
+    """Test features match the ones of the original documents."""
+    path = str(tmp_path / "corpus")
+    docs = _docs() * 3
+    Corpus(path).extend(docs)
+
+    expected = np.array(
+        [list(extract_features(doc, NAMES).values()) for doc in docs]
+    )
+    for n_jobs in (None, 2):
+        matrix, columns = corpus_features(
+            path, NAMES, n_jobs=n_jobs, chunk_size=4
+        )
+        assert columns == NAMES
+        np.testing.assert_array_equal(matrix, expected)
+
+    matrix, columns = corpus_features(str(tmp_path / "empty"), NAMES)
+    assert matrix.shape == (0, 3)
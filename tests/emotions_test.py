@@ -1,6 +1,8 @@
 """Unit tests for emotions TRUNAJOD module."""
 from collections import namedtuple
 
+import numpy as np
+import pytest
 from TRUNAJOD.emotions import Emotions
 from TRUNAJOD.spanish_emotion_lexicon import SPANISH_EMOTION_LEXICON
 
@@ -79,3 +81,47 @@ def test_emotions():
     )
 
     assert emotions.get_tristeza() == SPANISH_EMOTION_LEXICON["alma"][0] / 6
+
+
+class SentencesDoc(list):
+    """List of tokens split in sentences."""
+
+    def __init__(self, sentences):
+        super().__init__(token for sent in sentences for token in sent)
+        self.sents = sentences
+
+
+def test_emotions_profile():
+    """Test emotions of each sentence."""
+    doc = SentencesDoc(
+        [
+            [Token("Abundancia"), Token("perro"), Token("almaa")],
+            [Token("hola")],
+            [Token("admirable"), Token("abundancia")],
+        ]
+    )
+    emotions = Emotions(doc, {"almaa": "alma"}, sentence_profile=True)
+    profile = emotions.get_sentence_profile()
+    assert profile.columns == [
+        "alegria",
+        "enojo",
+        "miedo",
+        "repulsion",
+        "sorpresa",
+        "tristeza",
+    ]
+    assert profile.counts.tolist() == [2, 0, 2]
+    matrix = profile.matrix
+    assert matrix.dtype == np.float32
+    assert matrix[0].tolist() == pytest.approx(
+        [0.83 / 2, 0, 0, 0, 0, 0.165 / 2]
+    )
+    assert np.isnan(matrix[1]).all()
+    assert matrix[2].tolist() == pytest.approx(
+        [0.83 / 2, 0, 0, 0, 0.73 / 2, 0]
+    )
+    assert profile.mean()[0] == pytest.approx(emotions.get_alegria())
+    assert profile.mean()[5] == pytest.approx(emotions.get_tristeza())
+
+    with pytest.raises(ValueError):
+        Emotions(doc).get_sentence_profile()
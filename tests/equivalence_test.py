@@ -0,0 +1,99 @@
+"""Unit tests for equivalence TRUNAJOD module."""
+import json
+import math
+import os
+
+import pytest
+from TRUNAJOD import equivalence
+from TRUNAJOD.cli import main
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+RECORDED = os.path.join(FIXTURES, "reference_outputs.json")
+
+
+def test_fixtures_equivalence():
+    """Test optimized implementations match the references on fixtures."""
+    docs = equivalence.load_fixtures(FIXTURES)
+    assert [len(list(doc.sents)) for doc in docs] == [5, 1, 2, 1]
+
+    recorded = equivalence.load_recorded(RECORDED)
+    comparisons = equivalence.run(docs, recorded=recorded)
+    names = [comparison.name for comparison in comparisons]
+    for name in equivalence.ENGINES:
+        assert "{} (recorded)".format(name) in names
+    assert "graph.mu_legibility" in names
+    for comparison in comparisons:
+        assert comparison.documents == 4
+        assert comparison.mismatches == 0, comparison.name
+        assert comparison.max_rel_error < 1e-5, comparison.name
+
+    with pytest.raises(ValueError):
+        equivalence.run(docs[1:], recorded=recorded)
+
+
+def test_compare():
+    """Test errors, mismatches and speedups of a comparison."""
+    docs = [[1.0, 2.0], [], [0.0]]
+
+    def reference(doc):
+        if not doc:
+            raise RuntimeError("Empty")
+        return [1 / value for value in doc]
+
+    def candidate(doc):
+        return [1 / value if value else math.nan for value in doc] or 0.0
+
+    comparison = equivalence.compare("inverse", reference, candidate, docs)
+    # A different output for the empty document, and NaN against error
+    assert comparison.mismatches == 1 + 1
+    assert comparison.max_abs_error == 0
+    assert comparison.reference_time > 0
+
+    comparison = equivalence.compare(
+        "inverse", reference, lambda doc: [1.001 / v for v in doc], docs[:1]
+    )
+    assert comparison.mismatches == 2
+    assert comparison.max_abs_error == pytest.approx(0.001)
+    assert comparison.max_rel_error == pytest.approx(0.001)
+    assert comparison.speedup > 0
+    assert comparison.to_dict()["mismatches"] == 2
+
+    # An error against values is a single mismatch
+    comparison = equivalence.compare(
+        "inverse", reference, lambda doc: reference([]), [[1.0] * 3]
+    )
+    assert comparison.mismatches == 1
+    json.dumps(comparison.to_dict())
+
+    recorded = [
+        {"shape": [2], "values": [1.0, 0.5]},
+        {"error": "RuntimeError"},
+    ]
+    comparison = equivalence.compare("inverse", reference, recorded, docs[:2])
+    assert comparison.mismatches == 0
+    assert math.isnan(comparison.speedup)
+    assert "inverse" in equivalence.format_report([comparison])
+    with pytest.raises(ValueError):
+        equivalence.compare("inverse", reference, recorded, docs)
+
+
+def test_cli(tmp_path, capsys):
+    """Test recording outputs and comparing from the command line."""
+    path = str(tmp_path / "outputs.json")
+    engines = "graph.word_count,entity_grid.get_local_coherence"
+    main(["equivalence", FIXTURES, "--engines", engines, "--record", path])
+    with open(path) as recorded:
+        outputs = json.load(recorded)
+    assert list(outputs["outputs"]) == engines.split(",")
+    assert outputs["outputs"]["entity_grid.get_local_coherence"][1] == {
+        "error": "RuntimeError"
+    }
+
+    main(["equivalence", FIXTURES, "--engines", engines, "--recorded", path])
+    assert "graph.word_count (recorded)" in capsys.readouterr().out
+
+    outputs["outputs"]["graph.word_count"][0]["values"] = [0]
+    with open(path, "w") as recorded:
+        json.dump(outputs, recorded)
+    with pytest.raises(SystemExit):
+        main(["equivalence", FIXTURES, "--recorded", path, "--repeat", "2"])
@@ -0,0 +1,47 @@
+"""Unit tests for features TRUNAJOD module."""
+import math
+
+import pytest
+import spacy
+from TRUNAJOD import features
+from TRUNAJOD import surface_proxies
+
+nlp = spacy.blank("es")
+nlp.add_pipe("sentencizer")
+
+
+def test_extract_features():
+    """Test extraction of selected and all features."""
+    doc = nlp("El perro ladra. El gato duerme siempre.")
+    result = features.extract_features(doc, ["word_count", "sentence_count"])
+    assert result == {"word_count": 9.0, "sentence_count": 2.0}
+
+    result = features.extract_features(doc)
+    assert sorted(result) == features.available_features()
+    assert result["average_sentence_length"] == 4.5
+
+
+def test_undefined_features():
+    """Test features undefined for an empty text are NaN."""
+    result = features.extract_features(nlp(""))
+    assert result["word_count"] == 0
+    assert result["max_dependency_depth"] == 0
+    assert math.isnan(result["lexical_density"])
+
+
+def test_register_feature():
+    """Test registering custom features."""
+
+    @features.register_feature("test_noun_count")
+    def noun_count(doc):
+        return surface_proxies.noun_count(doc)
+
+    try:
+        assert "test_noun_count" in features.available_features()
+        result = features.extract_features(nlp("Hola"), ["test_noun_count"])
+        assert result == {"test_noun_count": 0.0}
+    finally:
+        del features.FEATURES["test_noun_count"]
+
+    with pytest.raises(KeyError):
+        features.extract_features(nlp("Hola"), ["test_noun_count"])
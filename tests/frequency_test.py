@@ -0,0 +1,94 @@
+"""Unit tests for frequency TRUNAJOD module."""
+from math import log
+
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.frequency import FrequencyStore
+from TRUNAJOD.frequency import sentence_frequency_indices
+
+FREQUENCIES = {
+    "el": 1000000,
+    "perro": 5000,
+    "ladra": 100,
+    "gato": 2000,
+    "duerme": 300,
+    "siempre": 80000,
+    "nunca": 0,
+}
+
+
+def _doc():
+    words = ["El", "perro", "ladra", ".", "Gato", "duerme", ".", "Xyz", "!"]
+    pos = ["DET", "NOUN", "VERB", "PUNCT", "NOUN", "VERB", "PUNCT", "X"]
+    pos.append("PUNCT")
+    sent_starts = [True, False, False, False, True, False, False, True, False]
+    return Doc(
+        spacy.blank("es").vocab, words=words, pos=pos, sent_starts=sent_starts
+    )
+
+
+def test_from_dict():
+    """Test building a store and looking up words."""
+    store = FrequencyStore.from_dict(FREQUENCIES)
+    assert len(store) == 6
+    assert "perro" in store
+    assert "nunca" not in store
+    assert "xyz" not in store
+    assert store.log_frequency("ladra") == pytest.approx(2)
+    assert np.all(np.diff(store.keys.astype(np.float64)) > 0)
+
+
+def test_save_load(tmp_path):
+    """Test that a saved store can be memory-mapped."""
+    store = FrequencyStore.from_dict(FREQUENCIES)
+    store.save(str(tmp_path / "store"))
+    loaded = FrequencyStore.load(str(tmp_path / "store"))
+    assert isinstance(loaded.keys, np.memmap)
+    assert np.array_equal(loaded.keys, store.keys)
+    assert loaded.log_frequency("gato") == store.log_frequency("gato")
+
+    loaded = FrequencyStore.load(str(tmp_path / "store"), mmap=False)
+    assert not isinstance(loaded.keys, np.memmap)
+    assert len(loaded) == len(store)
+
+
+def test_invalid_store():
+    """Test arrays of different length are rejected."""
+    with pytest.raises(ValueError):
+        FrequencyStore(np.zeros(2, dtype=np.uint64), np.zeros(1))
+    empty = FrequencyStore.from_dict({})
+    assert np.isnan(empty.log_frequency("perro"))
+
+
+def test_sentence_frequency_indices():
+    """Test per-sentence statistics."""
+    store = FrequencyStore.from_dict(FREQUENCIES)
+    doc = _doc()
+    minimums = sentence_frequency_indices(doc, store)
+    assert minimums[:2] == pytest.approx([2, log(300, 10)])
+    assert np.isnan(minimums[2])
+
+    means = sentence_frequency_indices(doc, store, "mean")
+    assert means[0] == pytest.approx((6 + log(5000, 10) + 2) / 3)
+    assert np.isnan(means[2])
+
+    medians = sentence_frequency_indices(doc, store, "median")
+    assert medians[0] == pytest.approx(log(5000, 10))
+    maximums = sentence_frequency_indices(doc, store, 100)
+    assert maximums[1] == pytest.approx(log(2000, 10))
+
+    with pytest.raises(ValueError):
+        sentence_frequency_indices(doc, store, "mode")
+
+
+def test_frequency_index():
+    """Test store and dict frequency indices agree."""
+    doc = _doc()
+    store = FrequencyStore.from_dict(FREQUENCIES)
+    expected = surface_proxies.frequency_index(doc, FREQUENCIES)
+    assert surface_proxies.frequency_index(doc, store) == pytest.approx(
+        expected
+    )
@@ -0,0 +1,116 @@
+"""Unit tests for graph TRUNAJOD module."""
+import math
+
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import features
+from TRUNAJOD import readability
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.graph import DOC
+from TRUNAJOD.graph import FeatureGraph
+from TRUNAJOD.graph import GRAPH
+
+
+def _doc():
+    return Doc(
+        spacy.blank("es").vocab,
+        words=["Yo", "no", "como", "pan", "y", "fruta", ".", "Llueve", "."],
+        pos=["PRON", "ADV", "VERB", "NOUN", "CCONJ", "NOUN", "PUNCT"]
+        + ["VERB", "PUNCT"],
+        lemmas=["yo", "no", "comer", "pan", "y", "fruta", ".", "llover", "."],
+        morphs=["Person=1", "", "Person=1|VerbForm=Fin", "", "", "", ""]
+        + ["VerbForm=Fin", ""],
+        heads=[2, 2, 2, 2, 5, 3, 2, 7, 7],
+        deps=["nsubj", "advmod", "ROOT", "obj", "cc", "conj", "punct"]
+        + ["ROOT", "punct"],
+    )
+
+
+def test_feature_nodes():
+    """Test feature nodes match the metrics they implement."""
+    doc = _doc()
+    names = [
+        name
+        for name, node in GRAPH.nodes.items()
+        if node.implements is not None
+    ]
+    assert "verb_noun_ratio" in names
+    values = GRAPH.evaluate(doc, names)
+    for name in names:
+        expected = GRAPH.nodes[name].implements(doc)
+        assert values[name] == pytest.approx(expected), name
+        assert GRAPH.implements(name, features.FEATURES[name]), name
+
+    # µ legibility is not defined for a single word, the other indices are
+    one_word = Doc(
+        spacy.blank("es").vocab,
+        words=["Llueve", "."],
+        pos=["VERB", "PUNCT"],
+        sent_starts=[True, False],
+    )
+    values = GRAPH.evaluate(one_word, ["mu_legibility", "fernandez_huerta"])
+    assert math.isnan(values["mu_legibility"])
+    assert values["fernandez_huerta"] == pytest.approx(
+        readability.fernandez_huerta(one_word)
+    )
+
+
+def test_evaluate_once():
+    """Test each intermediate is computed once, and memoized."""
+    calls = []
+    graph = FeatureGraph()
+
+    @graph.add("words")
+    def words(doc):
+        calls.append("words")
+        return len(doc)
+
+    graph.add("double", ["words"])(lambda n: 2 * n)
+    graph.add("half", ["words"])(lambda n: n / 2)
+    graph.add("ratio", ["double", "half", "words"])(lambda d, h, n: d / h / n)
+    graph.add("empty", [DOC])(lambda doc: 1 / 0)
+
+    assert graph.order(["ratio"]) == ["words", "double", "half", "ratio"]
+    memo = {}
+    assert graph.evaluate(["a", "b"], ["ratio", "half"], memo) == {
+        "ratio": 2.0,
+        "half": 1.0,
+    }
+    assert calls == ["words"]
+    assert memo["double"] == 4
+    graph.evaluate(["a", "b"], ["double"], memo)
+    assert calls == ["words"]
+    assert math.isnan(graph.evaluate([], ["empty"])["empty"])
+
+    with pytest.raises(KeyError):
+        graph.order(["nope"])
+    graph.add("a", ["b"])(lambda b: b)
+    graph.add("b", ["a"])(lambda a: a)
+    with pytest.raises(ValueError):
+        graph.order(["a"])
+
+
+def test_extract_features_memo():
+    """Test features share the memo, and replaced features bypass it."""
+    doc = _doc()
+    memo = {}
+    result = features.extract_features(
+        doc, ["word_count", "lexical_density"], memo
+    )
+    assert result == {
+        "word_count": surface_proxies.word_count(doc),
+        "lexical_density": surface_proxies.lexical_density(doc),
+    }
+    assert memo["token_counts"]["pos"]["NOUN"] == 2
+
+    features.register_feature("word_count", lambda doc: len(doc))
+    try:
+        assert not GRAPH.implements(
+            "word_count", features.FEATURES["word_count"]
+        )
+        assert features.extract_features(doc, ["word_count"], memo) == {
+            "word_count": 9
+        }
+    finally:
+        features.register_feature("word_count", surface_proxies.word_count)
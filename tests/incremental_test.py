@@ -0,0 +1,134 @@
+"""Unit tests for incremental TRUNAJOD module."""
+import math
+
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.entity_grid import EntityGrid
+from TRUNAJOD.incremental import IncrementalDocument
+
+VOCAB = spacy.blank("es").vocab
+
+# Sentence: (words, pos, heads, deps)
+SENTENCES = {
+    "El perro ladra.": (
+        ["El", "perro", "ladra", "."],
+        ["DET", "NOUN", "VERB", "PUNCT"],
+        [1, 2, 2, 2],
+        ["det", "nsubj", "ROOT", "punct"],
+    ),
+    "El gato duerme.": (
+        ["El", "gato", "duerme", "."],
+        ["DET", "NOUN", "VERB", "PUNCT"],
+        [1, 2, 2, 2],
+        ["det", "nsubj", "ROOT", "punct"],
+    ),
+    "María come pan.": (
+        ["María", "come", "pan", "."],
+        ["PROPN", "VERB", "NOUN", "PUNCT"],
+        [1, 1, 1, 1],
+        ["nsubj", "ROOT", "obj", "punct"],
+    ),
+    "El perro come pan rápido.": (
+        ["El", "perro", "come", "pan", "rápido", "."],
+        ["DET", "NOUN", "VERB", "NOUN", "ADV", "PUNCT"],
+        [1, 2, 2, 2, 2, 2],
+        ["det", "nsubj", "ROOT", "obj", "advmod", "punct"],
+    ),
+    "Hoy llueve.": (
+        ["Hoy", "llueve", "."],
+        ["ADV", "VERB", "PUNCT"],
+        [1, 1, 1],
+        ["advmod", "ROOT", "punct"],
+    ),
+}
+
+
+class FakeNLP(object):
+    """Pipeline returning pre-annotated sentences."""
+
+    def __init__(self):
+        self.parsed = []
+
+    def pipe(self, texts):
+        for text in texts:
+            self.parsed.append(text)
+            yield parse(text)
+
+
+def parse(text):
+    """Build the annotated Doc of a sentence."""
+    words, pos, heads, deps = SENTENCES[text]
+    return Doc(VOCAB, words=words, pos=pos, heads=heads, deps=deps)
+
+
+def check_features(document, texts):
+    """Compare incremental features with the ones of the whole text."""
+    doc = Doc.from_docs([parse(text) for text in texts])
+    features = document.features()
+    assert document.sentences == texts
+    assert features["word_count"] == surface_proxies.word_count(doc)
+    assert features["sentence_count"] == len(texts)
+    for name in (
+        "average_sentence_length",
+        "average_word_length",
+        "lexical_density",
+        "pos_dissimilarity",
+        "syntactic_similarity",
+        "verb_noun_ratio",
+    ):
+        expected = getattr(surface_proxies, name)(doc)
+        assert features[name] == pytest.approx(expected), name
+
+    egrid = EntityGrid(doc)
+    transitions = document.entity_grid_transitions()
+    for transition, probability in transitions.items():
+        getter = "get_{}_transitions".format(
+            transition.lower().replace("-", "n")
+        )
+        assert probability == pytest.approx(getattr(egrid, getter)())
+
+
+def test_incremental_updates():
+    """Test only edited sentences are parsed and features match."""
+    nlp = FakeNLP()
+    texts = ["El perro ladra.", "El gato duerme.", "María come pan."]
+    document = IncrementalDocument(nlp, " ".join(texts))
+    assert nlp.parsed == texts
+    check_features(document, texts)
+
+    nlp.parsed = []
+    texts = [
+        "El perro ladra.",
+        "El perro come pan rápido.",
+        "María come pan.",
+        "Hoy llueve.",
+    ]
+    assert document.update(" ".join(texts)) == 2
+    assert nlp.parsed == ["El perro come pan rápido.", "Hoy llueve."]
+    check_features(document, texts)
+
+    nlp.parsed = []
+    texts = ["El perro come pan rápido.", "Hoy llueve."]
+    assert document.update("\n".join(texts)) == 0
+    assert nlp.parsed == []
+    check_features(document, texts)
+
+    texts = ["Hoy llueve.", "El perro ladra.", "El perro ladra."]
+    assert document.update(" ".join(texts)) == 2
+    check_features(document, texts)
+
+
+def test_undefined_features():
+    """Test features of texts with less than two sentences."""
+    document = IncrementalDocument(FakeNLP(), "Hoy llueve.")
+    features = document.features()
+    assert features["word_count"] == 2
+    assert math.isnan(features["syntactic_similarity"])
+    assert set(document.entity_grid_transitions().values()) == {0.0}
+
+    document.update("")
+    features = document.features()
+    assert features["sentence_count"] == 0
+    assert math.isnan(features["lexical_density"])
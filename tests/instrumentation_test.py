@@ -0,0 +1,87 @@
+"""Unit tests for instrumentation TRUNAJOD module."""
+import io
+import json
+from collections import namedtuple
+
+from TRUNAJOD import instrumentation
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.emotions import Emotions
+
+Token = namedtuple("Token", ["text", "pos_", "lower_", "lemma_", "tag_"])
+doc = [
+    Token("El", "DET", "el", "el", "tag"),
+    Token("perro", "NOUN", "perro", "perro", "tag"),
+    Token("ladra", "VERB", "ladra", "ladrar", "tag"),
+    Token(".", "PUNCT", ".", ".", "tag"),
+]
+
+
+def test_disabled_by_default():
+    """Test that nothing is recorded if instrumentation is disabled."""
+    instrumentation.REGISTRY.reset()
+    assert not instrumentation.is_enabled()
+    surface_proxies.word_count(doc)
+    assert instrumentation.REGISTRY.metrics() == []
+
+
+def test_instrumented():
+    """Test calls, timings and token counts are recorded."""
+    with instrumentation.instrumented() as registry:
+        assert instrumentation.is_enabled()
+        surface_proxies.average_word_length(doc)
+        Emotions(doc)
+
+    assert not instrumentation.is_enabled()
+    assert registry.metrics() == [
+        "emotions.Emotions",
+        "surface_proxies.average_word_length",
+        "surface_proxies.char_count",
+        "surface_proxies.word_count",
+    ]
+    stats = registry.get("surface_proxies.average_word_length")
+    assert stats.calls == 1
+    assert stats.tokens == 4
+    assert stats.total_time >= stats.max_time >= stats.min_time >= 0
+    assert stats.mean_time == stats.total_time
+    assert stats.peak_memory is None
+    assert registry.get("emotions.Emotions").tokens == 4
+    assert registry.get("surface_proxies.noun_count") is None
+
+
+def test_trace_memory():
+    """Test that allocation peaks are recorded, including nested calls."""
+
+    @instrumentation.instrument(name="test.allocate")
+    def allocate(size):
+        data = [0] * size
+        return len(data)
+
+    @instrumentation.instrument(name="test.outer")
+    def outer(size):
+        return allocate(size)
+
+    with instrumentation.instrumented(trace_memory=True) as registry:
+        outer(100000)
+
+    inner_peak = registry.get("test.allocate").peak_memory
+    assert inner_peak >= 100000 * 8
+    assert registry.get("test.outer").peak_memory >= inner_peak
+    assert registry.get("test.allocate").tokens == 0
+
+
+def test_dump():
+    """Test statistics serialization."""
+    with instrumentation.instrumented() as registry:
+        surface_proxies.word_count(doc)
+        surface_proxies.word_count(doc)
+
+    result = json.loads(registry.to_json())
+    assert result["surface_proxies.word_count"]["calls"] == 2
+    assert result["surface_proxies.word_count"]["tokens"] == 8
+
+    fp = io.StringIO()
+    registry.dump(fp)
+    assert json.loads(fp.getvalue()) == result
+
+    registry.reset()
+    assert registry.to_dict() == {}
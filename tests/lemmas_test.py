@@ -0,0 +1,58 @@
+"""Unit tests for lemmas TRUNAJOD module."""
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import utils
+from TRUNAJOD.lemmas import LemmaCategory
+from TRUNAJOD.lemmas import sentence_lemma_table
+from TRUNAJOD.lexicon import LemmaDictionary
+from TRUNAJOD.lexicon import Lexicon
+
+LEMMA_DICT = {"perros": "perro", "corren": "correr", "corre": "correr"}
+STOPWORDS = ["los", "el", "y"]
+
+
+def _doc():
+    return Doc(
+        spacy.blank("es").vocab,
+        words=["Los", "perros", "corren", ".", "Él", "corre", "y", "salta"],
+        pos=["DET", "NOUN", "VERB", "PUNCT", "PRON", "VERB", "CCONJ", "VERB"],
+        sent_starts=[True, False, False, False, True, False, False, False],
+    )
+
+
+def test_sentence_lemma_table():
+    """Test table matches get_sentences_lemmas."""
+    doc = _doc()
+    table = sentence_lemma_table(doc.sents, LEMMA_DICT, STOPWORDS)
+    expected = utils.get_sentences_lemmas(doc.sents, LEMMA_DICT, STOPWORDS)
+    assert table.to_lists() == expected
+    assert table.n_sentences == 2
+    assert len(table) == 12
+
+    assert table.lemmas(LemmaCategory.VERB, 1) == ["correr", "salta"]
+    codes = table.sentence_codes(LemmaCategory.VERB, 1)
+    assert codes.base is not None
+    assert table.vocabulary[codes[0]] == "correr"
+    assert table.lemmas(LemmaCategory.FUNCTION, 0) == ["los"]
+    assert table.lemmas(LemmaCategory.CONTENT, 0) == ["perro", "correr"]
+
+    codes, sentences, offsets = table.category(LemmaCategory.CONTENT)
+    assert sentences.tolist() == [0, 0, 1, 1, 1]
+    assert offsets.tolist() == [0, 2, 5]
+    assert [table.vocabulary[code] for code in codes[2:]] == [
+        "él",
+        "correr",
+        "salta",
+    ]
+
+    hashed = sentence_lemma_table(
+        doc.sents, LemmaDictionary(LEMMA_DICT), Lexicon(STOPWORDS)
+    )
+    assert hashed.to_lists() == expected
+
+
+def test_empty_table():
+    """Test table of a text without sentences."""
+    table = sentence_lemma_table([], LEMMA_DICT)
+    assert len(table) == 0
+    assert table.to_lists() == ([],) * len(LemmaCategory)
@@ -1,9 +1,14 @@
 """Unit tests for emotions TRUNAJOD module."""
+import random
 from collections import namedtuple
 
 import mock
+import numpy as np
+import pytest
 from TRUNAJOD.lexico_semantic_norms import get_conc_imag_familiarity
 from TRUNAJOD.lexico_semantic_norms import LexicoSemanticNorm
+from TRUNAJOD.lexico_semantic_norms import NORMS
+from TRUNAJOD.lexico_semantic_norms import NormTable
 
 # Use this to avoid spacy Doc dependency on testing
 Token = namedtuple("Token", "text lemma_")
@@ -97,3 +102,88 @@ def test_get_conc_imag_familiarity():
     ]
     result = get_conc_imag_familiarity(doc)
     assert tuple(result) == (1, 2, 3)
+
+    with pytest.raises(ZeroDivisionError):
+        get_conc_imag_familiarity([Token("perro", "perro", "NOUN")])
+
+
+def test_norms_profile():
+    """Test lexico semantic norms of each sentence."""
+
+    class SentencesDoc(list):
+        def __init__(self, sentences):
+            super().__init__(token for sent in sentences for token in sent)
+            self.sents = sentences
+
+    norms = {
+        "abundancia": _init_lexical_dict(1),
+        "alma": dict(_init_lexical_dict(6), valence=2),
+    }
+    doc = SentencesDoc(
+        [
+            [Token("Abundancia", ""), Token("almaa", "")],
+            [Token("perro", "")],
+            [Token("alma", "")],
+        ]
+    )
+    calculator = LexicoSemanticNorm(
+        doc, norms, {"almaa": "alma"}, sentence_profile=True
+    )
+    profile = calculator.get_sentence_profile()
+    assert profile.columns[0] == "arousal"
+    assert profile.columns[-1] == "valence"
+    assert profile.matrix[0].tolist() == [3.5] * 5 + [1.5]
+    assert profile.matrix[2].tolist() == [6] * 5 + [2]
+    assert profile.mean()[-1] == calculator.get_valence()
+    assert profile.window(2).matrix[:, 0].tolist() == [3.5, 6]
+
+
+def test_norm_table():
+    """Test compiling norm dicts into tables."""
+    norms = {
+        "abundancia": _init_lexical_dict(1),
+        "alma": dict(_init_lexical_dict(6), valence=2),
+    }
+    table = NormTable.from_dict(norms)
+    assert len(table) == 2
+    assert "alma" in table
+    assert table.columns == NORMS
+    assert table.matrix.dtype == np.float32
+    assert table.row("alma").tolist() == [6] * 5 + [2]
+
+    doc = [Token("Alma", ""), Token("perro", ""), Token("abundanciaa", "")]
+    means, count = table.score(doc, {"abundanciaa": "abundancia"})
+    assert count == 2
+    assert means.tolist() == [3.5] * 5 + [1.5]
+    assert table.score([Token("perro", "")])[1] == 0
+
+    table = NormTable.from_dict({"alma": [1, 2], "abundancia": [3, 4]}, "xy")
+    assert table.columns == ["x", "y"]
+    assert table.indices(doc).tolist() == [0]
+
+    custom = NormTable.from_dict({"alma": {"edad": 3.0}})
+    assert custom.columns == ["edad"]
+    calculator = LexicoSemanticNorm(doc, custom)
+    assert calculator.get_norms() == {"edad": 3.0}
+
+
+def test_lexico_semantic_norm_table():
+    """Test dict and table scoring agree with a token by token average."""
+    rng = random.Random(0)
+    words = ["w%d" % i for i in range(50)]
+    norms = {
+        word: {norm: rng.uniform(1, 7) for norm in NORMS}
+        for word in words[:30]
+    }
+    doc = [Token(rng.choice(words).upper(), "") for _ in range(200)]
+    found = [norms[t.text.lower()] for t in doc if t.text.lower() in norms]
+
+    table = NormTable.from_dict(norms)
+    for calculator in (
+        LexicoSemanticNorm(doc, norms),
+        LexicoSemanticNorm(doc, table),
+    ):
+        for norm in NORMS:
+            expected = sum(values[norm] for values in found) / len(found)
+            value = getattr(calculator, "get_" + norm)()
+            assert value == pytest.approx(expected, rel=1e-6)
@@ -0,0 +1,92 @@
+"""Unit tests for lexicon TRUNAJOD module."""
+from collections import namedtuple
+
+import spacy
+from spacy.strings import hash_string
+from spacy.tokens import Doc
+from TRUNAJOD import surface_proxies
+from TRUNAJOD import utils
+from TRUNAJOD.lexicon import LemmaDictionary
+from TRUNAJOD.lexicon import Lexicon
+
+Token = namedtuple("Token", ["pos_", "lower_", "lemma_"])
+
+
+def _doc():
+    return Doc(
+        spacy.blank("es").vocab,
+        words=["No", "corre", "NUNCA", ",", "y", "Juan", "salta", "."],
+        pos=["ADV", "VERB", "ADV", "PUNCT", "CCONJ", "PROPN", "VERB", "PUNCT"],
+        lemmas=["No", "correr", "NUNCA", ",", "y", "Juan", "saltar", "."],
+    )
+
+
+def test_lexicon():
+    """Test membership of words and hashes."""
+    lexicon = Lexicon(["No", "nunca"])
+    assert len(lexicon) == 2
+    assert sorted(lexicon) == ["no", "nunca"]
+    assert "NO" in lexicon and "nunca" in lexicon
+    assert hash_string("Nunca") in lexicon
+    assert hash_string("no") in lexicon
+    assert hash_string("jamás") not in lexicon
+
+    doc = _doc()
+    assert doc[0].lower in lexicon
+    assert lexicon.mask(doc).tolist() == [1, 0, 1, 0, 0, 0, 0, 0]
+    assert lexicon.count(doc, attr="lemma") == 2
+    assert Lexicon([","]).count(doc) == 0
+    assert Lexicon([","]).count(doc, words_only=False) == 1
+
+
+def test_lexicon_fake_tokens():
+    """Test tokens that are not spaCy tokens are looked up as strings."""
+    tokens = [
+        Token("ADV", "no", "No"),
+        Token("PUNCT", "no", "no"),
+        Token("VERB", "come", "comer"),
+    ]
+    assert Lexicon(["no"]).count(tokens, attr="lemma") == 1
+
+
+def test_surface_proxies():
+    """Test negation and connection words are matched on lemma hashes."""
+    doc = _doc()
+    words = surface_proxies.word_count(doc)
+    assert surface_proxies.negation_density(doc) == 2 / words
+    assert surface_proxies.connection_words_ratio(doc) == 2 / words
+
+
+def test_lemma_dictionary():
+    """Test lemmatization from hashes."""
+    lemmatizer = LemmaDictionary({"corre": "correr", "salta": "saltar"})
+    assert len(lemmatizer) == 2
+    assert "corre" in lemmatizer
+    assert hash_string("salta") in lemmatizer
+    assert utils.lemmatize(lemmatizer, "corre") == "correr"
+    assert utils.lemmatize(lemmatizer, "come") == "come"
+
+    doc = _doc()
+    assert [lemmatizer.lemma(token) for token in doc[:3]] == [
+        "no",
+        "correr",
+        "nunca",
+    ]
+    lemmas = lemmatizer.lemma_hashes(doc)
+    assert [doc.vocab.strings[h] for h in lemmas.tolist()] == [
+        "no",
+        "correr",
+        "nunca",
+        ",",
+        "y",
+        "juan",
+        "saltar",
+        ".",
+    ]
+
+    stopwords = Lexicon(["y", "no"])
+    assert utils.get_token_lemmas(
+        doc, lemmatizer, stopwords
+    ) == utils.get_token_lemmas(
+        doc, {"corre": "correr", "salta": "saltar"}, {"y", "no"}
+    )
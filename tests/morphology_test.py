@@ -0,0 +1,68 @@
+"""Unit tests for morphology TRUNAJOD module."""
+from collections import namedtuple
+
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import givenness
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.morphology import decode_flags
+from TRUNAJOD.morphology import doc_flags
+from TRUNAJOD.morphology import MorphFlag
+from TRUNAJOD.morphology import token_flags
+
+Token = namedtuple("Token", "pos_ tag_")
+
+
+def _docs():
+    words = ["Yo", "como", "y", "él", "duerme", "."]
+    pos = ["PRON", "VERB", "CCONJ", "PRON", "VERB", "PUNCT"]
+    features = ["Person=1", "Person=1|VerbForm=Fin", "", "Person=3"]
+    features += ["Person=3|VerbForm=Fin", ""]
+    vocab = spacy.blank("es").vocab
+    # spaCy 3 style (morphological analysis) and spaCy 2 style (tags)
+    return (
+        Doc(vocab, words=words, pos=pos, morphs=features),
+        Doc(
+            vocab,
+            words=words,
+            pos=pos,
+            tags=["{}__{}".format(p, f) for p, f in zip(pos, features)],
+        ),
+    )
+
+
+def test_decode_flags():
+    """Test decoding of features into flags."""
+    assert decode_flags("VERB__Mood=Ind|Person=3|VerbForm=Fin") == (
+        MorphFlag.THIRD_PERSON | MorphFlag.FINITE
+    )
+    assert decode_flags("Person=1,2") == (
+        MorphFlag.FIRST_PERSON | MorphFlag.SECOND_PERSON
+    )
+    assert decode_flags("VERB__VerbForm=Inf|Perif|Perif") == (
+        MorphFlag.INFINITIVE | MorphFlag.PERIPHRASIS
+    )
+    assert decode_flags("") == decode_flags("_") == 0
+
+
+def test_doc_flags():
+    """Test flags are read from morphological analyses and tags."""
+    expected = [
+        MorphFlag.FIRST_PERSON,
+        MorphFlag.FIRST_PERSON | MorphFlag.FINITE,
+        0,
+        MorphFlag.THIRD_PERSON,
+        MorphFlag.THIRD_PERSON | MorphFlag.FINITE,
+        0,
+    ]
+    for doc in _docs():
+        assert doc_flags(doc).tolist() == expected
+        assert [token_flags(token) for token in doc] == expected
+        assert doc_flags(list(doc)).tolist() == expected
+
+        assert surface_proxies.first_second_person_count(doc) == 2
+        assert surface_proxies.clause_count(doc, {}) == 2
+        assert givenness.pronoun_density(doc) == 1 / 5
+
+    assert token_flags(Token("PRON", ["Person=3"])) == MorphFlag.THIRD_PERSON
+    assert doc_flags(Doc(spacy.blank("es").vocab)).tolist() == []
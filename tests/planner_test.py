@@ -0,0 +1,81 @@
+"""Unit tests for planner TRUNAJOD module."""
+import pytest
+import spacy
+from spacy.language import Language
+from TRUNAJOD.features import available_features
+from TRUNAJOD.planner import FEATURE_ANNOTATIONS
+from TRUNAJOD.planner import plan_pipeline
+from TRUNAJOD.planner import required_annotations
+
+
+def _component(doc):
+    return doc
+
+
+Language.component(
+    "planner_test_tagger", assigns=["token.pos", "token.morph"]
+)(_component)
+Language.component(
+    "planner_test_lemmatizer", assigns=["token.lemma"], requires=["token.pos"]
+)(_component)
+Language.component(
+    "planner_test_parser",
+    assigns=["token.dep", "token.head", "token.is_sent_start", "doc.sents"],
+)(_component)
+Language.component(
+    "planner_test_ner", assigns=["doc.ents", "token.ent_iob"]
+)(_component)
+Language.component("planner_test_ruler")(_component)
+
+
+def _nlp(sentencizer=False):
+    nlp = spacy.blank("es")
+    for name in ("tagger", "ruler", "lemmatizer", "parser", "ner"):
+        nlp.add_pipe("planner_test_" + name, name=name)
+    if sentencizer:
+        nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def test_required_annotations():
+    """Test annotations needed by features."""
+    assert set(available_features()) <= set(FEATURE_ANNOTATIONS)
+    assert required_annotations(["lexical_density", "yule_k"]) == {
+        "pos",
+        "lemma",
+    }
+    with pytest.raises(KeyError):
+        required_annotations(["nope"])
+
+
+def test_plan_pipeline():
+    """Test unneeded components are disabled."""
+    nlp = _nlp()
+    plan = plan_pipeline(nlp, ["lexical_density"])
+    assert plan.enable == ["tagger", "ruler"]
+    assert plan.disable == ["lemmatizer", "parser", "ner"]
+    with plan.select_pipes(nlp):
+        assert nlp.pipe_names == ["tagger", "ruler"]
+    assert len(nlp.pipe_names) == 5
+
+    # The lemmatizer requires PoS tags
+    plan = plan_pipeline(nlp, ["negation_density"])
+    assert plan.enable == ["tagger", "ruler", "lemmatizer"]
+
+    # Sentences come from the parser, unless a cheaper component exists
+    plan = plan_pipeline(nlp, ["sentence_count"])
+    assert plan.enable == ["ruler", "parser"]
+    plan = plan_pipeline(_nlp(sentencizer=True), ["sentence_count"])
+    assert plan.enable == ["ruler", "sentencizer"]
+    plan = plan_pipeline(_nlp(sentencizer=True), ["words_before_root"])
+    assert plan.disable == ["lemmatizer", "ner", "sentencizer"]
+    assert "PipelinePlan" in repr(plan)
+
+
+def test_missing_annotations():
+    """Test planning fails if the pipeline lacks annotations."""
+    nlp = spacy.blank("es")
+    with pytest.raises(ValueError, match="pos"):
+        plan_pipeline(nlp, ["lexical_density"])
+    with pytest.raises(ValueError, match="vectors"):
+        plan_pipeline(_nlp(), ["avg_w2v_semantic_similarity"])
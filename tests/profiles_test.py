@@ -0,0 +1,50 @@
+"""Unit tests for profiles TRUNAJOD module."""
+import numpy as np
+import pytest
+from TRUNAJOD.profiles import SentenceProfile
+
+
+@pytest.fixture
+def profile():
+    """Profile of 4 sentences, the third without lexicon words."""
+    sums = np.array([[1.0, 4.0], [4.0, 4.0], [0.0, 0.0], [9.0, 1.0]])
+    counts = np.array([1, 2, 0, 3])
+    return SentenceProfile(sums, counts, ["a", "b"])
+
+
+def test_matrix(profile):
+    """Test sentence averages."""
+    matrix = profile.matrix
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (4, 2)
+    assert np.allclose(matrix[[0, 1, 3]], [[1, 4], [2, 2], [3, 1 / 3]])
+    assert np.isnan(matrix[2]).all()
+    assert profile.mean().tolist() == pytest.approx([14 / 6, 9 / 6])
+    assert profile.to_dict()["a"][:2] == [1, 2]
+
+
+def test_window(profile):
+    """Test sliding window profiles."""
+    window = profile.window(2)
+    assert len(window) == 3
+    assert window.counts.tolist() == [3, 2, 3]
+    assert window.matrix[:, 0].tolist() == pytest.approx([5 / 3, 2, 3])
+    assert len(profile.window(10)) == 1
+    assert profile.window(10).matrix[0].tolist() == pytest.approx(
+        profile.mean().tolist()
+    )
+    with pytest.raises(ValueError):
+        profile.window(0)
+
+
+def test_reductions(profile):
+    """Test reductions over sentences ignore sentences without words."""
+    assert profile.max().tolist() == pytest.approx([3, 4])
+    assert profile.variance()[0] == pytest.approx(np.var([1, 2, 3]))
+    expected = np.polyfit([0, 1, 3], [1, 2, 3], 1)[0]
+    assert profile.trend()[0] == pytest.approx(expected)
+
+    single = SentenceProfile(np.array([[1.0]]), np.array([1]), ["a"])
+    assert np.isnan(single.trend()[0])
+    empty = SentenceProfile(np.array([[0.0]]), np.array([0]), ["a"])
+    assert np.isnan(empty.max()[0])
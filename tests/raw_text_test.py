@@ -0,0 +1,85 @@
+"""Unit tests for raw_text TRUNAJOD module."""
+import math
+
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import discourse_markers
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.raw_text import raw_text_features
+from TRUNAJOD.raw_text import RawText
+from TRUNAJOD.raw_text import split_sentences
+from TRUNAJOD.raw_text import tokenize
+
+TEXT = (
+    "Hola, ¿cómo estás? El perro come 3,5 kilos de pan porque tiene "
+    "hambre. Sin embargo, no engorda… ¡Qué suerte!"
+)
+
+
+def test_split_sentences():
+    """Test heuristic sentence splitting."""
+    text = "Hola. ¿Cómo estás? Bien!\nSin punto\n\n«Cita.» Fin...  Y más"
+    assert split_sentences(text) == [
+        "Hola.",
+        "¿Cómo estás?",
+        "Bien!",
+        "Sin punto",
+        "«Cita.»",
+        "Fin...",
+        "Y más",
+    ]
+    assert split_sentences("  \n ") == []
+
+
+def test_tokenize():
+    """Test words are found and punctuation ignored."""
+    assert tokenize("¡Hola! El 3,5% de l'eau, auto-stop...") == [
+        "Hola",
+        "El",
+        "3,5",
+        "de",
+        "l'eau",
+        "auto-stop",
+    ]
+
+
+def test_raw_text_matches_doc():
+    """Test raw text measurements match the ones of a spaCy Doc."""
+    nlp = spacy.blank("es")
+    tokens = nlp(TEXT)
+    doc = Doc(
+        nlp.vocab,
+        words=[token.text for token in tokens],
+        spaces=[bool(token.whitespace_) for token in tokens],
+        pos=["PUNCT" if token.is_punct else "X" for token in tokens],
+    )
+    raw = RawText(TEXT)
+    assert raw.word_count() == surface_proxies.word_count(doc)
+    assert raw.char_count() == surface_proxies.char_count(doc)
+    assert raw.syllable_count() == surface_proxies.syllable_count(doc)
+    assert raw.sentence_count() == 4
+    assert raw.average_sentence_length() == raw.word_count() / 4
+    assert raw.syllable_word_ratio() == pytest.approx(
+        surface_proxies.syllable_word_ratio(doc)
+    )
+    assert raw.average_word_length() == pytest.approx(
+        surface_proxies.average_word_length(doc)
+    )
+    assert discourse_markers.get_cause_dm_count(raw) == 1 / 4
+
+
+def test_raw_text_features():
+    """Test raw text feature extraction."""
+    features = raw_text_features(TEXT)
+    assert features["word_count"] == 19
+    assert features["revision_dm_count"] == 1 / 4
+
+    assert raw_text_features(TEXT, ["char_count"]) == {
+        "char_count": RawText(TEXT).char_count()
+    }
+    empty = raw_text_features("", ["word_count", "average_word_length"])
+    assert empty["word_count"] == 0
+    assert math.isnan(empty["average_word_length"])
+    with pytest.raises(KeyError):
+        raw_text_features(TEXT, ["lexical_density"])
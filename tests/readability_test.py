@@ -0,0 +1,104 @@
+"""Unit tests for readability TRUNAJOD module."""
+import math
+
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import readability
+from TRUNAJOD.features import extract_features
+
+
+def _doc():
+    # Words: el (1 syllable, 2 letters), perro (2, 5), come (2, 4),
+    # sol (1, 3), ¡ and ! are punctuation
+    return Doc(
+        spacy.blank("es").vocab,
+        words=["El", "perro", "come", ".", "¡", "Sol", "!"],
+        pos=["DET", "NOUN", "VERB", "PUNCT", "PUNCT", "NOUN", "PUNCT"],
+        sent_starts=[True, False, False, False, True, False, False],
+    )
+
+
+def test_readability_counts():
+    """Test words, syllables and letters are counted per sentence."""
+    counts = readability.readability_counts(_doc())
+    assert len(counts) == 2
+    assert counts.words.tolist() == [3, 1]
+    assert counts.syllables.tolist() == [5, 1]
+    assert counts.letters.tolist() == [11, 3]
+    assert counts.squared_letters.tolist() == [45, 9]
+    assert counts.totals() == {
+        "words": 4,
+        "syllables": 6,
+        "letters": 14,
+        "squared_letters": 54,
+        "sentences": 2,
+    }
+
+
+def test_indices():
+    """Test indices against the formulas applied by hand."""
+    doc = _doc()
+    assert readability.fernandez_huerta(doc) == pytest.approx(
+        206.84 - 60 * 6 / 4 - 102 * 2 / 4
+    )
+    assert readability.szigriszt_pazos(doc) == pytest.approx(
+        206.835 - 62.3 * 6 / 4 - 4 / 2
+    )
+    assert readability.gutierrez_de_polini(doc) == pytest.approx(
+        95.2 - 9.7 * 14 / 4 - 0.35 * 4 / 2
+    )
+    assert readability.crawford(doc) == pytest.approx(
+        -20.5 * 2 / 4 + 4.9 * 6 / 4 - 3.407
+    )
+    letters = [2, 5, 4, 3]
+    assert readability.mu_legibility(doc) == pytest.approx(
+        4 / 3 * np.mean(letters) / np.var(letters) * 100
+    )
+
+    indices = readability.readability(doc)
+    assert indices == {
+        "fernandez_huerta": readability.fernandez_huerta(doc),
+        "szigriszt_pazos": readability.szigriszt_pazos(doc),
+        "gutierrez_de_polini": readability.gutierrez_de_polini(doc),
+        "crawford": readability.crawford(doc),
+        "mu_legibility": readability.mu_legibility(doc),
+    }
+    assert extract_features(doc, list(indices)) == pytest.approx(indices)
+
+
+def test_sentence_readability():
+    """Test indices of each sentence."""
+    doc = _doc()
+    sentence = Doc(
+        doc.vocab,
+        words=["El", "perro", "come", "."],
+        pos=["DET", "NOUN", "VERB", "PUNCT"],
+        sent_starts=[True, False, False, False],
+    )
+    indices = readability.sentence_readability(doc)
+    for name, values in indices.items():
+        assert values.shape == (2,)
+        assert values[0] == pytest.approx(
+            getattr(readability, name)(sentence)
+        )
+    assert indices["crawford"][1] == pytest.approx(-20.5 + 4.9 - 3.407)
+    # Variance of a single word is not defined
+    assert math.isnan(indices["mu_legibility"][1])
+
+    with pytest.raises(ZeroDivisionError):
+        readability.mu_legibility(
+            Doc(doc.vocab, words=["Sol"], pos=["NOUN"], sent_starts=[True])
+        )
+
+
+def test_inflesz_level():
+    """Test INFLESZ scale boundaries."""
+    assert readability.inflesz_level(95) == "muy fácil"
+    assert readability.inflesz_level(80) == "muy fácil"
+    assert readability.inflesz_level(79.9) == "bastante fácil"
+    assert readability.inflesz_level(60) == "normal"
+    assert readability.inflesz_level(40) == "algo difícil"
+    assert readability.inflesz_level(39.9) == "muy difícil"
+    assert readability.inflesz_level(-10) == "muy difícil"
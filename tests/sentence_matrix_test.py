@@ -0,0 +1,74 @@
+"""Unit tests for sentence_matrix TRUNAJOD module."""
+import numpy as np
+import pytest
+import spacy
+from spacy.tokens import Doc
+from TRUNAJOD import features
+from TRUNAJOD import surface_proxies
+from TRUNAJOD.sentence_matrix import sentence_feature_matrix
+from TRUNAJOD.sentence_matrix import SENTENCE_FEATURES
+
+
+def _doc():
+    return Doc(
+        spacy.blank("es").vocab,
+        words=["Él", "no", "come", "pan", "y", "fruta", "."]
+        + ["¡", "Ellos", "corren", "!"]
+        + ["Nunca", "duermo", "bien", "en", "mi", "cama", "grande", "."],
+        pos=["PRON", "ADV", "VERB", "NOUN", "CCONJ", "NOUN", "PUNCT"]
+        + ["PUNCT", "PRON", "VERB", "PUNCT"]
+        + ["ADV", "VERB", "ADV", "ADP", "DET", "NOUN", "ADJ", "PUNCT"],
+        lemmas=["él", "no", "comer", "pan", "y", "fruta", "."]
+        + ["¡", "él", "correr", "!"]
+        + ["nunca", "dormir", "bien", "en", "mi", "cama", "grande", "."],
+        morphs=["Person=3", "", "Person=3|VerbForm=Fin", "", "", "", ""]
+        + ["", "Person=3", "Person=3|VerbForm=Fin", ""]
+        + ["", "Person=1|VerbForm=Fin", "", "", "Person=1", "", "", ""],
+        heads=[2, 2, 2, 2, 5, 3, 2]
+        + [9, 9, 9, 9]
+        + [12, 12, 12, 16, 16, 12, 16, 12],
+        deps=["nsubj", "advmod", "ROOT", "obj", "cc", "conj", "punct"]
+        + ["punct", "nsubj", "ROOT", "punct"]
+        + ["advmod", "ROOT", "advmod", "case", "det", "obl", "amod"]
+        + ["punct"],
+    )
+
+
+def test_sentence_feature_matrix():
+    """Test matrix matches the features of each sentence."""
+    doc = _doc()
+    matrix, columns = sentence_feature_matrix(doc)
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (3, len(features.available_features()))
+    assert columns == features.available_features()
+
+    for row, sent in enumerate(doc.sents):
+        expected = features.extract_features(sent)
+        for column, name in enumerate(columns):
+            assert matrix[row, column] == pytest.approx(
+                expected[name], rel=1e-5, nan_ok=True
+            ), name
+
+    # Counted features are all computed from the accumulators
+    assert set(SENTENCE_FEATURES) <= set(columns)
+    matrix, columns = sentence_feature_matrix(
+        doc, ["word_count", "pronoun_noun_ratio"]
+    )
+    assert columns == ["word_count", "pronoun_noun_ratio"]
+    assert matrix[:, 0].tolist() == [6, 2, 7]
+    assert matrix[0, 1] == 0.5
+    assert np.isnan(matrix[1, 1])
+
+
+def test_registered_features():
+    """Test registered features are computed on each sentence."""
+
+    @features.register_feature("word_count")
+    def token_count(doc):
+        return len(doc)
+
+    try:
+        matrix, _ = sentence_feature_matrix(_doc(), ["word_count"])
+        assert matrix[:, 0].tolist() == [7, 4, 8]
+    finally:
+        features.register_feature("word_count", surface_proxies.word_count)
@@ -0,0 +1,169 @@
+"""Unit tests for server TRUNAJOD module."""
+import asyncio
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import spacy
+from spacy.language import Language
+from TRUNAJOD.cli import build_parser
+from TRUNAJOD.server import FeatureServer
+
+FEATURES = ["word_count", "sentence_count", "lexical_density"]
+
+
+@pytest.fixture
+def server():
+    """Run a feature server on localhost in a background thread."""
+    nlp = spacy.blank("es")
+    nlp.add_pipe("sentencizer")
+    feature_server = FeatureServer(
+        nlp, features=FEATURES, max_batch_size=4, max_latency=0.5, workers=2
+    )
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(feature_server.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    yield feature_server
+    asyncio.run_coroutine_threadsafe(feature_server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def request(server, method, path, body=None):
+    """Send a request to the server and decode its JSON response."""
+    connection = http.client.HTTPConnection("127.0.0.1", server.port)
+    payload = None if body is None else json.dumps(body)
+    connection.request(method, path, payload)
+    response = connection.getresponse()
+    result = json.loads(response.read())
+    connection.close()
+    return response.status, result
+
+
+def test_health(server):
+    """Test health and feature listing endpoints."""
+    assert request(server, "GET", "/health") == (200, {"status": "ok"})
+    status, result = request(server, "GET", "/features")
+    assert status == 200
+    assert "lexical_density" in result["features"]
+
+
+def test_features(server):
+    """Test feature extraction of one and several texts."""
+    status, result = request(
+        server, "POST", "/features", {"text": "El perro ladra. Hola."}
+    )
+    assert status == 200
+    # A blank pipeline has no tagger, so punctuation counts as words
+    assert result["features"]["word_count"] == 6
+    assert result["features"]["sentence_count"] == 2
+
+    status, result = request(
+        server,
+        "POST",
+        "/features",
+        {"texts": ["Uno dos.", ""], "features": ["lexical_density"]},
+    )
+    assert status == 200
+    assert result["results"] == [
+        {"lexical_density": 0.0},
+        {"lexical_density": None},
+    ]
+
+
+def test_micro_batching(server):
+    """Test concurrent requests are parsed in the same batch."""
+    texts = ["Texto número {}.".format(i) for i in range(4)]
+    with ThreadPoolExecutor(4) as pool:
+        responses = list(
+            pool.map(
+                lambda text: request(
+                    server, "POST", "/features", {"text": text}
+                ),
+                texts,
+            )
+        )
+    assert all(status == 200 for status, _ in responses)
+    assert [result["features"]["word_count"] for _, result in responses] == [
+        4
+    ] * 4
+
+    status, stats = request(server, "GET", "/stats")
+    assert status == 200
+    assert stats["documents"] == 4
+    assert stats["batches"] == 1
+    assert stats["max_batch_size_seen"] == 4
+    assert stats["mean_batch_size"] == 4
+    assert stats["throughput"] > 0
+    assert 0 <= stats["latency"]["p50"] <= stats["latency"]["max"]
+
+
+def test_errors(server):
+    """Test error responses."""
+    assert request(server, "GET", "/unknown")[0] == 404
+    assert request(server, "DELETE", "/features")[0] == 405
+    assert request(server, "POST", "/features", {"txt": "Hola"})[0] == 400
+    status, result = request(
+        server, "POST", "/features", {"text": "Hola", "features": ["nope"]}
+    )
+    assert status == 400
+    assert "nope" in result["error"]
+
+
+def test_invalid_configuration():
+    """Test invalid server settings are rejected."""
+    nlp = spacy.blank("es")
+    with pytest.raises(ValueError):
+        FeatureServer(nlp, max_batch_size=0)
+    with pytest.raises(ValueError):
+        FeatureServer(nlp, max_latency=-1)
+    with pytest.raises(KeyError):
+        FeatureServer(nlp, features=["nope"])
+
+
+def test_cli_parser():
+    """Test serve command arguments."""
+    args = build_parser().parse_args(
+        ["serve", "--features", "word_count, yule_k", "--max-latency", "5"]
+    )
+    assert args.command == "serve"
+    assert args.features == ["word_count", "yule_k"]
+    assert args.max_latency == 5.0
+    assert args.disable == ["ner", "textcat"]
+    assert not args.plan_pipeline
+
+
+def test_close_in_flight():
+    """Test texts being processed when the server closes are failed."""
+
+    def slow_component(doc):
+        time.sleep(2)
+        return doc
+
+    nlp = spacy.blank("es")
+    Language.component("trunajod_test_slow", func=slow_component)
+    nlp.add_pipe("trunajod_test_slow")
+    feature_server = FeatureServer(
+        nlp, features=FEATURES, max_latency=0, workers=1
+    )
+
+    async def scenario():
+        await feature_server.start("127.0.0.1", 0)
+        task = asyncio.ensure_future(
+            feature_server.extract_many(["Hola.", "Chao."])
+        )
+        await asyncio.sleep(0.5)
+        await feature_server.close()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(task, 1)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
@@ -1,6 +1,11 @@
 """Unit tests for surface_proxies module."""
+import random
+import re
 from collections import namedtuple
 
+import pytest
+from spacy.tokens import Doc as SpacyDoc
+from spacy.vocab import Vocab
 from TRUNAJOD import surface_proxies
 
 Token = namedtuple("Token", ["word", "pos_", "lower_", "lemma_", "tag_"])
@@ -49,3 +54,265 @@ def test_infinitive():
     assert (
         surface_proxies.infinitve("comiendo", {"comiendo": "comer"}) == "comer"
     )
+
+
+class Node(object):
+    """Parse tree node mock for spacy.tokens.Token."""
+
+    def __init__(self, pos_, children=()):
+        """Create node with POS tag and children."""
+        self.pos_ = pos_
+        self.children = list(children)
+
+
+class Sentence(object):
+    """Sentence mock for spacy.tokens.Span."""
+
+    def __init__(self, root, length):
+        """Create sentence from its root node."""
+        self.root = root
+        self.length = length
+
+    def __len__(self):
+        """Return sentence length."""
+        return self.length
+
+
+def _recursive_node_similarity(node1, node2, is_central_node=False):
+    """Reference (recursive) implementation of node_similarity."""
+    similarity = 0
+    common_childs_node1 = set()
+    common_childs_node2 = set()
+    if is_central_node:
+        if node1.pos_ == node2.pos_:
+            similarity += 1
+        else:
+            return 0
+
+    for child1 in node1.children:
+        for child2 in node2.children:
+            child_not_seen = (
+                child1 not in common_childs_node1
+                and child2 not in common_childs_node2
+            )
+            if child1.pos_ == child2.pos_ and child_not_seen:
+                similarity += 1
+                common_childs_node1.add(child1)
+                common_childs_node2.add(child2)
+                similarity += _recursive_node_similarity(child1, child2)
+
+    return similarity
+
+
+def _random_tree(rng, depth):
+    children = []
+    if depth > 0:
+        children = [
+            _random_tree(rng, depth - 1) for _ in range(rng.randint(0, 4))
+        ]
+    return Node(rng.choice(["NOUN", "VERB", "ADJ", "DET"]), children)
+
+
+def test_node_similarity():
+    """Test node_similarity matches the recursive definition."""
+    rng = random.Random(0)
+    for _ in range(200):
+        node1 = _random_tree(rng, 4)
+        node2 = _random_tree(rng, 4)
+        for is_central_node in (True, False):
+            assert surface_proxies.node_similarity(
+                node1, node2, is_central_node
+            ) == _recursive_node_similarity(node1, node2, is_central_node)
+
+
+def test_node_similarity_deep_tree():
+    """Test node_similarity does not recurse on deep trees."""
+    node = Node("NOUN")
+    for _ in range(5000):
+        node = Node("NOUN", [node])
+    assert surface_proxies.node_similarity(node, node, True) == 5001
+
+
+def test_syntactic_similarity():
+    """Test syntactic_similarity."""
+    Doc = namedtuple("Doc", "sents")
+    sent1 = Sentence(Node("VERB", [Node("NOUN"), Node("PUNCT")]), 3)
+    sent2 = Sentence(Node("VERB", [Node("NOUN"), Node("ADV")]), 3)
+    sent3 = Sentence(Node("NOUN"), 1)
+    result = surface_proxies.syntactic_similarity(Doc([sent1, sent2, sent3]))
+    assert result == (2 / 4 + 0 / 4) / 2
+
+
+def _parsed_doc():
+    """Create a small parsed spaCy Doc without loading a model."""
+    return SpacyDoc(
+        Vocab(),
+        words=["El", "perro", "que", "ladra", "no", "muerde", "."]
+        + ["Una", "casa", "grande", "para", "vivir", "."],
+        pos=["DET", "NOUN", "PRON", "VERB", "ADV", "VERB", "PUNCT"]
+        + ["DET", "NOUN", "ADJ", "ADP", "VERB", "PUNCT"],
+        heads=[1, 5, 3, 1, 5, 5, 5] + [8, 8, 8, 11, 8, 8],
+        deps=["det", "nsubj", "nsubj", "acl", "advmod", "ROOT", "punct"]
+        + ["det", "ROOT", "amod", "mark", "acl", "punct"],
+    )
+
+
+def test_dependency_depths():
+    """Test dependency_depths matches get_word_depth."""
+    parsed_doc = _parsed_doc()
+    depths = surface_proxies.dependency_depths(parsed_doc)
+    assert depths.tolist() == [
+        surface_proxies.get_word_depth(token.i, parsed_doc)
+        for token in parsed_doc
+    ]
+    assert depths.tolist() == [3, 2, 4, 3, 2, 1, 2, 2, 1, 2, 3, 2, 2]
+
+    sent = list(parsed_doc.sents)[1]
+    assert (
+        surface_proxies.dependency_depths(sent).tolist() == depths[7:].tolist()
+    )
+
+
+def test_dependency_aggregates():
+    """Test dependency depth and distance aggregates."""
+    parsed_doc = _parsed_doc()
+    assert surface_proxies.average_dependency_depth(parsed_doc) == 25 / 11
+    assert surface_proxies.max_dependency_depth(parsed_doc) == 4
+    assert surface_proxies.max_dependency_depth(SpacyDoc(Vocab(), [])) == 0
+    assert surface_proxies.average_dependency_distance(parsed_doc) == 15 / 9
+
+
+def test_words_before_root():
+    """Test words_before_root."""
+    assert surface_proxies.words_before_root(_parsed_doc()) == 4.5
+    assert surface_proxies.words_before_root(_parsed_doc(), 3) == 4.5
+    assert surface_proxies.words_before_root(_parsed_doc(), 2) == 5
+
+
+def _dict_pos_dissimilarity(sentences):
+    """Reference (dict based) implementation of pos_dissimilarity."""
+    sent_pos_dist = [
+        surface_proxies.pos_distribution(sent) for sent in sentences
+    ]
+    disimilarity = 0
+    for i in range(len(sent_pos_dist) - 1):
+        common_adj_tags = set(sent_pos_dist[i].keys()) | set(
+            sent_pos_dist[i + 1].keys()
+        )
+        difference = 0
+        totals = 0
+        for pos in common_adj_tags:
+            pos_dist_value = sent_pos_dist[i].get(pos, 0)
+            pos_dist_value_next = sent_pos_dist[i + 1].get(pos, 0)
+            difference += abs(pos_dist_value - pos_dist_value_next)
+            totals += pos_dist_value + pos_dist_value_next
+        disimilarity += difference / totals
+    return disimilarity / (len(sent_pos_dist) - 1)
+
+
+def test_pos_count_matrix():
+    """Test pos_count_matrix."""
+    Doc = namedtuple("Doc", "sents")
+    sents = [
+        [Token("", "NOUN", "", "", ""), Token("", "VERB", "", "", "")],
+        [Token("", "VERB", "", "", ""), Token("", "VERB", "", "", "")],
+        [Token("", "ADJ", "", "", "")],
+    ]
+    counts, tags = surface_proxies.pos_count_matrix(Doc(sents))
+    assert tags == ["NOUN", "VERB", "ADJ"]
+    assert counts.tolist() == [[1, 1, 0], [0, 2, 0], [0, 0, 1]]
+
+
+def test_pos_dissimilarity():
+    """Test pos_dissimilarity and its windowed variants."""
+    Doc = namedtuple("Doc", "sents")
+    rng = random.Random(0)
+    for _ in range(50):
+        sents = [
+            [
+                Token("", rng.choice(["NOUN", "VERB", "ADJ"]), "", "", "")
+                for _ in range(rng.randint(1, 8))
+            ]
+            for _ in range(rng.randint(2, 10))
+        ]
+        assert surface_proxies.pos_dissimilarity(
+            Doc(sents)
+        ) == _dict_pos_dissimilarity(sents)
+
+    sents = [
+        [Token("", "NOUN", "", "", "")],
+        [Token("", "VERB", "", "", "")],
+        [Token("", "NOUN", "", "", "")],
+    ]
+    assert surface_proxies.pos_dissimilarity(Doc(sents)) == 1
+    assert surface_proxies.pos_dissimilarity(Doc(sents), window=2) == 2 / 3
+    assert surface_proxies.pos_dissimilarity(Doc(sents), window=None) == 2 / 3
+    with pytest.raises(ZeroDivisionError):
+        surface_proxies.pos_dissimilarity(Doc(sents[:1]))
+    with pytest.raises(ValueError):
+        surface_proxies.pos_dissimilarity(Doc(sents), window=0)
+
+
+def _regex_add_periphrasis(doc, periphrasis_type, periphrasis_list):
+    """Previous add_periphrasis, matching each periphrasis with tag regexes."""
+    regexp = re.compile(periphrasis_type)
+    for token in doc:
+        if regexp.search(token.tag_):
+            for periphrasis in periphrasis_list:
+                words = periphrasis.split()
+                pos = token.i - len(words)
+                if pos >= 0 and all(
+                    word.lower() == doc[pos + k].lemma_
+                    for k, word in enumerate(words)
+                ):
+                    for k in range(pos + 1, token.i + 1):
+                        doc[k].tag_ = doc[k].tag_ + "|Perif"
+    return doc
+
+
+def _periphrasis_doc(morphology=False):
+    words = ["Voy", "a", "comer", "y", "sigo", "trabajando", "."]
+    lemmas = ["ir", "a", "comer", "y", "seguir", "trabajar", "."]
+    pos = ["AUX", "ADP", "VERB", "CCONJ", "VERB", "VERB", "PUNCT"]
+    features = ["VerbForm=Fin", "", "VerbForm=Inf", "", "VerbForm=Fin"]
+    features += ["VerbForm=Ger", ""]
+    kwargs = {"lemmas": lemmas, "pos": pos}
+    if morphology:
+        kwargs["morphs"] = features
+    else:
+        kwargs["tags"] = [
+            "{}__{}".format(tag, feat) for tag, feat in zip(pos, features)
+        ]
+    return SpacyDoc(Vocab(), words=words, **kwargs)
+
+
+def test_fix_parse_tree():
+    """Test periphrases of all verb forms are found in a single scan."""
+    fixed = surface_proxies.fix_parse_tree(_periphrasis_doc(), {})
+    expected = _periphrasis_doc()
+    for periphrasis_type, periphrasis_list in (
+        (surface_proxies.PERIPHRASIS_INF, surface_proxies.INFINITIVE_VERBS),
+        (surface_proxies.PERIPHRASIS_GER, surface_proxies.GERUND_VERBS),
+        (surface_proxies.PERIPHRASIS_PAR, surface_proxies.PAST_TENSE_VERBS),
+    ):
+        _regex_add_periphrasis(expected, periphrasis_type, periphrasis_list)
+    assert [t.tag_ for t in fixed] == [t.tag_ for t in expected]
+    assert [t.tag_.endswith("|Perif") for t in fixed] == [
+        False,
+        True,
+        True,
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert surface_proxies.clause_count(_periphrasis_doc(), {}) == 2
+
+    # Verb forms are read from the morphological analysis, if available
+    fixed = surface_proxies.fix_parse_tree(_periphrasis_doc(True), {})
+    assert [t.tag_ for t in fixed][:3] == ["", "|Perif", "|Perif"]
+
+    doc = surface_proxies.add_periphrasis(
+        _periphrasis_doc(), surface_proxies.PERIPHRASIS_INF, ["ir a", "a"]
+    )
+    assert [t.tag_.count("|Perif") for t in doc][:3] == [0, 1, 2]
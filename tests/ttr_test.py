@@ -1,6 +1,8 @@
 """TRUNAJOD ttr tests."""
+import random
 import string
 from collections import namedtuple
+from math import factorial
 
 import numpy as np
 import pytest
@@ -101,3 +103,88 @@ def test_word_variation_index():
     ]
     expected = np.log(3) / np.log(2 - np.log(2) / np.log(3))
     assert ttr.word_variation_index(doc) == expected
+
+
+def random_doc(n_words, n_lemmas, seed):
+    """Build a random doc with punctuation tokens in between."""
+    rng = random.Random(seed)
+    doc = []
+    for _ in range(n_words):
+        doc.append(Token(lemma_="w%d" % rng.randrange(n_lemmas), pos_="NOUN"))
+        if rng.random() < 0.2:
+            doc.append(Token(lemma_=".", pos_="PUNCT"))
+    return doc
+
+
+def comb(n, k):
+    """Binomial coefficient."""
+    return factorial(n) // (factorial(k) * factorial(n - k))
+
+
+def lemmas(doc):
+    """Lemmas of the words of a doc."""
+    return [token.lemma_ for token in doc if token.pos_ != "PUNCT"]
+
+
+@pytest.mark.parametrize("n_words,window", [(200, 50), (30, 50), (7, 3)])
+def test_moving_average_ttr(n_words, window):
+    """Test MATTR against a window by window computation."""
+    doc = random_doc(n_words, 40, n_words)
+    words = lemmas(doc)
+    if len(words) <= window:
+        expected = ttr.type_token_ratio(words)
+    else:
+        ttrs = [
+            ttr.type_token_ratio(words[i : i + window])
+            for i in range(len(words) - window + 1)
+        ]
+        expected = sum(ttrs) / len(ttrs)
+    assert ttr.moving_average_ttr(doc, window) == pytest.approx(expected)
+
+
+def test_mean_segmental_ttr():
+    """Test MSTTR against a segment by segment computation."""
+    doc = random_doc(230, 60, 1)
+    words = lemmas(doc)
+    ttrs = [ttr.type_token_ratio(words[i : i + 50]) for i in range(0, 200, 50)]
+    assert ttr.mean_segmental_ttr(doc) == pytest.approx(sum(ttrs) / 4)
+    assert ttr.mean_segmental_ttr(doc[:10], 50) == ttr.type_token_ratio(
+        lemmas(doc[:10])
+    )
+
+
+def test_hdd():
+    """Test HD-D against the hypergeometric probabilities."""
+    doc = random_doc(300, 80, 2)
+    words = lemmas(doc)
+    n = len(words)
+    expected = (
+        sum(
+            1 - comb(n - words.count(lemma), 42) / comb(n, 42)
+            for lemma in set(words)
+        )
+        / 42
+    )
+    assert ttr.hdd(doc) == pytest.approx(expected)
+    short = doc[:20]
+    assert ttr.hdd(short) == pytest.approx(ttr.type_token_ratio(lemmas(short)))
+
+
+def test_moving_window_diversity(test_doc):
+    """Test all the measures are computed together."""
+    doc = random_doc(120, 30, 3)
+    assert ttr.moving_window_diversity(doc, 20, 30, 10) == {
+        "mattr": ttr.moving_average_ttr(doc, 20),
+        "msttr": ttr.mean_segmental_ttr(doc, 30),
+        "hdd": ttr.hdd(doc, 10),
+    }
+    with pytest.raises(ZeroDivisionError):
+        ttr.moving_window_diversity([])
+    with pytest.raises(ValueError):
+        ttr.moving_average_ttr(doc, 0)
+    with pytest.raises(ValueError):
+        ttr.mean_segmental_ttr(doc, 0)
+    with pytest.raises(ValueError):
+        ttr.hdd(doc, -1)
+    with pytest.raises(ValueError):
+        ttr.moving_window_diversity(doc, sample_size=0)
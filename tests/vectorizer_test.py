@@ -0,0 +1,99 @@
+"""Unit tests for vectorizer TRUNAJOD module."""
+import math
+
+import numpy as np
+import pytest
+import spacy
+from TRUNAJOD import features
+from TRUNAJOD.vectorizer import TrunajodVectorizer
+
+nlp = spacy.blank("es")
+nlp.add_pipe("sentencizer")
+
+TEXTS = ["El perro ladra. El gato duerme.", "Hola", ""]
+NAMES = ["word_count", "sentence_count", "average_word_length"]
+
+
+def test_transform():
+    """Test features of texts and docs, in column order."""
+    vectorizer = TrunajodVectorizer(nlp, features=NAMES)
+    matrix = vectorizer.fit_transform(TEXTS)
+    assert matrix.shape == (3, 3)
+    assert vectorizer.feature_names_ == NAMES
+    assert vectorizer.get_feature_names_out().tolist() == NAMES
+    for row, text in zip(matrix, TEXTS):
+        expected = features.extract_features(nlp(text), NAMES)
+        assert row.tolist() == pytest.approx(
+            [expected[name] for name in NAMES], nan_ok=True
+        )
+    assert math.isnan(matrix[2, 2])
+
+    docs = [nlp(text) for text in TEXTS]
+    vectorizer = TrunajodVectorizer(features=NAMES, n_jobs=2)
+    np.testing.assert_array_equal(vectorizer.transform(docs), matrix)
+    with pytest.raises(ValueError):
+        vectorizer.transform(TEXTS)
+
+    vectorizer = TrunajodVectorizer(nlp, features=NAMES, n_jobs=2)
+    np.testing.assert_array_equal(vectorizer.transform(TEXTS), matrix)
+    # The pipeline is not modified
+    assert nlp.pipe_names == ["sentencizer"]
+    matrix = TrunajodVectorizer(nlp).fit_transform(TEXTS[:1])
+    assert matrix.shape == (1, len(features.available_features()))
+    assert nlp.pipe_names == ["sentencizer"]
+
+
+def test_params():
+    """Test scikit-learn parameter interface."""
+    vectorizer = TrunajodVectorizer(nlp, n_jobs=2)
+    params = vectorizer.get_params()
+    assert params["n_jobs"] == 2
+    assert TrunajodVectorizer(**params).get_params() == params
+    assert vectorizer.set_params(features=["word_count"]) is vectorizer
+    assert vectorizer.features == ["word_count"]
+    with pytest.raises(ValueError):
+        vectorizer.set_params(model=None)
+    with pytest.raises(ValueError):
+        TrunajodVectorizer(nlp, output="list").fit(TEXTS)
+    with pytest.raises(KeyError):
+        TrunajodVectorizer(nlp, features=["unknown"]).fit(TEXTS)
+
+
+def test_memory(tmp_path):
+    """Test cached features are not computed again."""
+    calls = []
+
+    @features.register_feature("test_length")
+    def length(doc):
+        calls.append(doc.text)
+        return len(doc)
+
+    try:
+        vectorizer = TrunajodVectorizer(
+            nlp, features=["test_length"], memory=str(tmp_path)
+        )
+        first = vectorizer.transform(TEXTS)
+        assert len(calls) == 3
+        assert len(list(tmp_path.iterdir())) == 3
+
+        calls.clear()
+        np.testing.assert_array_equal(vectorizer.transform(TEXTS), first)
+        assert calls == []
+
+        # New features of cached texts are added to their entries
+        vectorizer.set_params(features=["test_length", "word_count"])
+        matrix = vectorizer.transform(TEXTS[:1] + ["Otro texto."])
+        assert calls == [TEXTS[0], "Otro texto."]
+        assert matrix[:, 1].tolist() == [8, 3]
+        assert len(list(tmp_path.iterdir())) == 4
+    finally:
+        del features.FEATURES["test_length"]
+
+
+def test_pandas_output():
+    """Test DataFrame output."""
+    pytest.importorskip("pandas")
+    frame = TrunajodVectorizer(nlp, features=NAMES, output="pandas")
+    frame = frame.fit_transform(TEXTS)
+    assert list(frame.columns) == NAMES
+    assert frame.shape == (3, 3)